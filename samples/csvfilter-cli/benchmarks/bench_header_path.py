@@ -0,0 +1,114 @@
+"""ヘッダーありモードの before/after ベンチマーク。
+
+DictReader/DictWriter で 1 行ごとに dict を組み立てていた旧実装と、
+列インデックスを一度だけ解決して list のまま処理する現行実装を比較する。
+
+実行例（samples/csvfilter-cli/ で）:
+    PYTHONPATH=src python benchmarks/bench_header_path.py --rows 5000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from csvfilter_cli.filters import build_condition
+from csvfilter_cli.io import FilterBinding, FilterStats, filter_csv
+
+STATUSES = ["active", "inactive", "pending", "paused"]
+CITIES = ["Tokyo", "Osaka", "Nagoya", "Sapporo", "Fukuoka", "Kyoto", "Sendai"]
+
+
+def generate(path: Path, rows: int, seed: int = 0) -> None:
+    rng = random.Random(seed)
+    with path.open("w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(["id", "name", "status", "score", "city"])
+        for i in range(rows):
+            writer.writerow(
+                [
+                    i,
+                    f"user{rng.randrange(100000)}",
+                    rng.choice(STATUSES),
+                    rng.randrange(100),
+                    rng.choice(CITIES),
+                ]
+            )
+
+
+def legacy_filter(
+    input_path: Path, output_path: Path, filters: list[FilterBinding]
+) -> FilterStats:
+    """DictReader/DictWriter による旧実装（比較用）。"""
+
+    stats = FilterStats()
+    with (
+        input_path.open("r", encoding="utf-8", newline="") as infile,
+        output_path.open("w", encoding="utf-8", newline="") as outfile,
+    ):
+        reader = csv.DictReader(infile)
+        assert reader.fieldnames is not None
+        writer = csv.DictWriter(
+            outfile, fieldnames=reader.fieldnames, lineterminator="\n"
+        )
+        writer.writeheader()
+        for row in reader:
+            stats.processed += 1
+            for binding in filters:
+                value = row.get(binding.column)  # type: ignore[arg-type]
+                if value is None:
+                    stats.skipped += 1
+                    break
+                if not binding.condition.matches(value):
+                    break
+            else:
+                writer.writerow(row)
+                stats.matched += 1
+    return stats
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--rows", type=int, default=5_000_000)
+    args = ap.parse_args()
+
+    filters = [
+        FilterBinding(column="status", condition=build_condition("regex", "^active$")),
+        FilterBinding(column="city", condition=build_condition("contains", "o")),
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src = Path(tmp) / "input.csv"
+        generate(src, args.rows)
+        print(f"rows={args.rows} size={src.stat().st_size / 1e6:.1f}MB")
+
+        before_out = Path(tmp) / "before.csv"
+        start = time.perf_counter()
+        before = legacy_filter(src, before_out, filters)
+        before_sec = time.perf_counter() - start
+
+        after_out = Path(tmp) / "after.csv"
+        start = time.perf_counter()
+        after = filter_csv(
+            input_path=src,
+            output_path=after_out,
+            filters=filters,
+            delimiter=",",
+            quotechar='"',
+            no_header=False,
+        )
+        after_sec = time.perf_counter() - start
+
+        assert before == after
+        assert before_out.read_bytes() == after_out.read_bytes()
+
+    print(f"before (DictReader): {before_sec:.2f}s")
+    print(f"after  (list)      : {after_sec:.2f}s ({before_sec / after_sec:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
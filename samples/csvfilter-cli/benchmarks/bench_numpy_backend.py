@@ -0,0 +1,75 @@
+"""`--numpy`（NumPy によるチャンク単位の評価）と通常の行単位の評価の比較。
+
+数値比較（decimal 型）と部分一致の条件それぞれについて、両方の経路の所要時間を
+表示し、出力が一致することを確認する。NumPy が無い環境では両方とも行単位になる。
+
+実行例（samples/csvfilter-cli/ で）:
+    PYTHONPATH=src python benchmarks/bench_numpy_backend.py --rows 10000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from bench_header_path import generate
+
+from csvfilter_cli import vectorized
+from csvfilter_cli.filters import build_condition
+from csvfilter_cli.io import FilterBinding, filter_csv
+
+CASES = {
+    "numeric": [("score", "ge", "90")],
+    "numeric-and": [("score", "ge", "50"), ("id", "lt", "500000")],
+    "substring": [("name", "contains", "999")],
+    "mixed": [("city", "contains", "o"), ("score", "between", "10,20")],
+}
+
+
+def run(src: Path, out: Path, filters: list[FilterBinding], vectorize: bool) -> float:
+    start = time.perf_counter()
+    filter_csv(
+        input_path=src,
+        output_path=out,
+        filters=filters,
+        delimiter=",",
+        quotechar='"',
+        no_header=False,
+        vectorize=vectorize,
+    )
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--rows", type=int, default=10_000_000)
+    args = ap.parse_args()
+
+    if not vectorized.available():
+        print("NumPy が見つからないため、--numpy も行単位の評価になります")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src = Path(tmp) / "input.csv"
+        generate(src, args.rows)
+        print(f"rows={args.rows} size={src.stat().st_size / 1e6:.1f}MB")
+
+        for name, spec in CASES.items():
+            filters = [
+                FilterBinding(column=col, condition=build_condition(op, val))
+                for col, op, val in spec
+            ]
+            rows_out = Path(tmp) / "rows.csv"
+            numpy_out = Path(tmp) / "numpy.csv"
+            rows_sec = run(src, rows_out, filters, vectorize=False)
+            numpy_sec = run(src, numpy_out, filters, vectorize=True)
+            assert rows_out.read_bytes() == numpy_out.read_bytes()
+            print(
+                f"{name:12s} rows: {rows_sec:.2f}s  numpy: {numpy_sec:.2f}s "
+                f"({rows_sec / numpy_sec:.2f}x)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""標準入力（パイプ）経由のスループットとメモリ使用量のベンチマーク。
+
+`cat input.csv | python -m csvfilter_cli --input - ... > /dev/null` と同等の
+パイプラインを組み、MB/s と子プロセスの最大 RSS を表示する。入力サイズを
+変えても最大 RSS がほぼ一定であれば、メモリ使用量が有界であることを確認できる。
+
+実行例（samples/csvfilter-cli/ で）:
+    PYTHONPATH=src python benchmarks/bench_stdin_pipe.py --rows 1000000 --rows 4000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from bench_header_path import generate
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+
+
+def run_pipe(src: Path) -> tuple[float, int]:
+    """パイプで入力を流し込み、(経過秒, 子プロセスの最大 RSS[KB]) を返す。"""
+
+    env = {**os.environ, "PYTHONPATH": str(SRC_DIR)}
+    cmd = [
+        sys.executable,
+        "-m",
+        "csvfilter_cli",
+        "--input",
+        "-",
+        "--and",
+        "status:contains:active",
+        "-v",
+    ]
+    start = time.perf_counter()
+    with subprocess.Popen(
+        cmd,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        env=env,
+    ) as proc:
+        assert proc.stdin is not None and proc.stderr is not None
+
+        def feed() -> None:
+            with src.open("rb") as f, proc.stdin:  # type: ignore[union-attr]
+                shutil.copyfileobj(f, proc.stdin)  # type: ignore[arg-type]
+
+        feeder = threading.Thread(target=feed)
+        feeder.start()
+        report = proc.stderr.read().decode("utf-8").strip()
+        feeder.join()
+    elapsed = time.perf_counter() - start
+    print(f"  {report}")
+    return elapsed, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument(
+        "--rows",
+        type=int,
+        action="append",
+        help="生成する行数（複数指定可。デフォルト: 1000000）",
+    )
+    args = ap.parse_args()
+
+    for rows in args.rows or [1_000_000]:
+        with tempfile.TemporaryDirectory() as tmp:
+            src = Path(tmp) / "input.csv"
+            generate(src, rows)
+            size_mb = src.stat().st_size / 1e6
+            elapsed, max_rss = run_pipe(src)
+        print(
+            f"rows={rows} size={size_mb:.1f}MB elapsed={elapsed:.2f}s "
+            f"throughput={size_mb / elapsed:.1f}MB/s max_rss={max_rss / 1024:.1f}MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
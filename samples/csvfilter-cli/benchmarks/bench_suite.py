@@ -0,0 +1,244 @@
+"""合成データによる再現可能なベンチマーク一式と、結果の比較。
+
+datasets.py の形（narrow / wide / quoted / unicode）ごとに、ヘッダーあり・なしの入力を
+生成し、contains と regex それぞれでタグ列のマーカーを検索する（選択率 0.1% 〜 90%）。
+各シナリオを --repeat 回実行した最小の所要時間を JSON に書き出す。
+
+`compare` は 2 つの結果ファイルを比べ、所要時間が --threshold を超えて増えたシナリオが
+あれば終了コード 1 を返す。生成データのハッシュが異なるシナリオは比較しない。
+
+実行例（samples/csvfilter-cli/ で）:
+    PYTHONPATH=src python benchmarks/bench_suite.py run --rows 200000 --output base.json
+    （変更後）
+    PYTHONPATH=src python benchmarks/bench_suite.py run --rows 200000 --output new.json \\
+        --baseline base.json
+    PYTHONPATH=src python benchmarks/bench_suite.py compare base.json new.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from datasets import (
+    SELECTIVITIES,
+    SHAPES,
+    TAG_COLUMN,
+    TAG_INDEX,
+    digest,
+    generate,
+    marker,
+)
+
+from csvfilter_cli.filters import build_condition
+from csvfilter_cli.io import FilterBinding, FilterStats, filter_csv
+
+FORMAT = 1
+DEFAULT_THRESHOLD = 0.10  # 10% 以上遅くなったら回帰とみなす
+
+
+def scenarios(header: bool) -> list[tuple[str, str, str, FilterBinding]]:
+    """(演算子, 選択率の表記, シナリオ名の一部, 条件) の一覧。"""
+
+    column: str | int = TAG_COLUMN if header else TAG_INDEX
+    result = []
+    for label, fraction in SELECTIVITIES.items():
+        needle = marker(fraction)
+        for op, operand in (("contains", needle), ("regex", rf"{needle}\b")):
+            binding = FilterBinding(
+                column=column, condition=build_condition(op, operand)
+            )
+            result.append((op, label, f"{op}/{label}", binding))
+    return result
+
+
+def time_filter(
+    src: Path, out: Path, binding: FilterBinding, header: bool, repeat: int
+) -> tuple[float, FilterStats]:
+    best = float("inf")
+    stats = FilterStats()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        stats = filter_csv(
+            input_path=src,
+            output_path=out,
+            filters=[binding],
+            delimiter=",",
+            quotechar='"',
+            no_header=not header,
+        )
+        best = min(best, time.perf_counter() - start)
+    return best, stats
+
+
+def run_suite(rows: int, shapes: list[str], repeat: int, seed: int) -> dict[str, Any]:
+    results: list[dict[str, Any]] = []
+    datasets: dict[str, dict[str, Any]] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        out = Path(tmp) / "out.csv"
+        for shape in shapes:
+            for header in (True, False):
+                dataset = f"{shape}/{'header' if header else 'no-header'}"
+                src = Path(tmp) / "input.csv"
+                generate(src, shape, rows, header=header, seed=seed)
+                size = src.stat().st_size
+                datasets[dataset] = {"bytes": size, "blake2b": digest(src)}
+
+                expected: dict[str, int] = {}
+                for op, label, name, binding in scenarios(header):
+                    seconds, stats = time_filter(src, out, binding, header, repeat)
+                    # contains と regex は同じ行に一致するはず（生成データの確認）
+                    if expected.setdefault(label, stats.matched) != stats.matched:
+                        raise SystemExit(
+                            f"{dataset}/{name}: 一致件数が contains と異なります"
+                        )
+                    results.append(
+                        {
+                            "name": f"{dataset}/{name}",
+                            "dataset": dataset,
+                            "op": op,
+                            "selectivity": label,
+                            "processed": stats.processed,
+                            "matched": stats.matched,
+                            "seconds": seconds,
+                            "rows_per_second": stats.processed / seconds,
+                            "mb_per_second": size / seconds / 1e6,
+                        }
+                    )
+                    print(
+                        f"{dataset + '/' + name:36s} {seconds:8.3f}s "
+                        f"{stats.processed / seconds:12,.0f} rows/s "
+                        f"matched={stats.matched}",
+                        flush=True,
+                    )
+
+    return {
+        "format": FORMAT,
+        "meta": {
+            "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "rows": rows,
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "datasets": datasets,
+        "results": results,
+    }
+
+
+def compare(
+    baseline: dict[str, Any], current: dict[str, Any], threshold: float
+) -> list[str]:
+    """baseline から threshold を超えて遅くなったシナリオ名の一覧を返す（表も表示する）。"""
+
+    old = {r["name"]: r for r in baseline["results"]}
+    regressions = []
+    for r in current["results"]:
+        base = old.get(r["name"])
+        if base is None:
+            continue
+        dataset = r["dataset"]
+        if baseline["datasets"].get(dataset) != current["datasets"].get(dataset):
+            print(f"{r['name']:36s} skipped (generated data differs)")
+            continue
+        ratio = r["seconds"] / base["seconds"]
+        regressed = ratio > 1 + threshold
+        if regressed:
+            regressions.append(r["name"])
+        print(
+            f"{r['name']:36s} {base['seconds']:8.3f}s -> {r['seconds']:8.3f}s "
+            f"({ratio - 1:+7.1%}){'  REGRESSION' if regressed else ''}"
+        )
+    return regressions
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _load(path: Path) -> dict[str, Any]:
+    data = json.loads(path.read_text(encoding="utf-8"))
+    if data.get("format") != FORMAT:
+        sys.exit(f"{path}: 結果ファイルの形式が異なります")
+    return data
+
+
+def _report_regressions(regressions: list[str], threshold: float) -> int:
+    if regressions:
+        print(f"{len(regressions)} scenario(s) slower than threshold {threshold:.0%}")
+        return 1
+    print("no regressions")
+    return 0
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="ベンチマークを実行して JSON に書き出す")
+    run.add_argument("--rows", type=int, default=200_000)
+    run.add_argument(
+        "--shapes",
+        default=",".join(SHAPES),
+        help=f"カンマ区切りの形（{', '.join(SHAPES)}）",
+    )
+    run.add_argument(
+        "--repeat", type=int, default=3, help="各シナリオの実行回数（最小値を採用）"
+    )
+    run.add_argument("--seed", type=int, default=0)
+    run.add_argument("--output", type=Path, required=True)
+    run.add_argument("--baseline", type=Path, help="比較する過去の結果ファイル")
+    run.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+
+    cmp = sub.add_parser("compare", help="2 つの結果ファイルを比較する")
+    cmp.add_argument("baseline", type=Path)
+    cmp.add_argument("current", type=Path)
+    cmp.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+
+    args = ap.parse_args()
+
+    if args.command == "compare":
+        regressions = compare(_load(args.baseline), _load(args.current), args.threshold)
+        return _report_regressions(regressions, args.threshold)
+
+    shapes = [s for s in re.split(r"\s*,\s*", args.shapes) if s]
+    unknown = [s for s in shapes if s not in SHAPES]
+    if unknown:
+        ap.error(f"unknown shape: {', '.join(unknown)}")
+    baseline = _load(args.baseline) if args.baseline else None
+
+    data = run_suite(args.rows, shapes, args.repeat, args.seed)
+    args.output.write_text(
+        json.dumps(data, ensure_ascii=False, indent=2) + "\n", "utf-8"
+    )
+    print(f"wrote {args.output}")
+
+    if baseline is None:
+        return 0
+    regressions = compare(baseline, data, args.threshold)
+    return _report_regressions(regressions, args.threshold)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""ベンチマーク用の合成 CSV の生成（bench_suite.py から使う）。
+
+同じ形・行数・シードからは常に同じバイト列を生成する。どの形も 2 列目（0 始まりで 1）に
+選択率を調べるためのタグ列 `tag` を持ち、各行は一様乱数 u に対して u < p となる
+選択率 p ごとのマーカー（`sel0001` = 0.1%, `sel0010` = 1%, ... `sel0900` = 90%）を含む。
+そのため 1 つのファイルで、マーカーを検索する条件の一致率を選べる。
+
+- narrow: 3 列の短い行
+- wide: 50 列の行
+- quoted: 区切り文字・クオート文字・改行を含み、ほとんどのフィールドがクオートされる行
+- unicode: 日本語や絵文字を多く含む行（タグ列も非 ASCII の区切りで連結する）
+"""
+
+from __future__ import annotations
+
+import csv
+import hashlib
+import random
+from collections.abc import Callable
+from pathlib import Path
+
+SELECTIVITIES = {"0.1%": 0.001, "1%": 0.01, "10%": 0.1, "50%": 0.5, "90%": 0.9}
+TAG_COLUMN = "tag"
+TAG_INDEX = 1
+
+_WIDE_COLUMNS = 50
+_WORDS = ["alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel"]
+_KANJI = ["東京", "大阪", "名古屋", "札幌", "福岡", "京都", "仙台", "横浜"]
+_KANA = ["たなか", "すずき", "さとう", "たかはし", "いとう", "わたなべ", "やまもと"]
+_EMOJI = ["🍣", "🗼", "🌸", "🎌", "🍜", "🚄"]
+
+_Row = Callable[[int, random.Random, list[str]], list[str]]
+
+
+def marker(fraction: float) -> str:
+    """選択率 fraction の行だけが含むマーカー。"""
+    return f"sel{round(fraction * 1000):04d}"
+
+
+def _tags(rng: random.Random) -> list[str]:
+    u = rng.random()
+    return [marker(p) for p in SELECTIVITIES.values() if u < p]
+
+
+def _narrow(i: int, rng: random.Random, tags: list[str]) -> list[str]:
+    return [str(i), " ".join(tags) or "none", str(rng.randrange(100000))]
+
+
+def _wide(i: int, rng: random.Random, tags: list[str]) -> list[str]:
+    row = [str(i), " ".join(tags) or "none"]
+    for c in range(2, _WIDE_COLUMNS):
+        if c % 3:
+            row.append(str(rng.randrange(1000000)))
+        else:
+            row.append(f"{rng.choice(_WORDS)}{rng.randrange(1000)}")
+    return row
+
+
+def _quoted(i: int, rng: random.Random, tags: list[str]) -> list[str]:
+    word = rng.choice(_WORDS)
+    note = f'{word} said "{rng.choice(_WORDS)}", then left'
+    if rng.random() < 0.1:
+        note += "\nsecond line"
+    return [
+        str(i),
+        ", ".join(tags) or "none, none",  # 区切り文字を含むので常にクオートされる
+        f"{word}, {rng.randrange(1000)}",
+        note,
+    ]
+
+
+def _unicode(i: int, rng: random.Random, tags: list[str]) -> list[str]:
+    return [
+        str(i),
+        "・".join(f"区分{tag}" for tag in tags) or "区分なし",
+        f"{rng.choice(_KANA)}{rng.choice(_KANA)}{rng.choice(_EMOJI)}",
+        f"{rng.choice(_KANJI)}市{rng.randrange(100)}丁目",
+        "".join(rng.choices(_EMOJI, k=3)),
+    ]
+
+
+SHAPES: dict[str, tuple[list[str], _Row]] = {
+    "narrow": (["id", TAG_COLUMN, "value"], _narrow),
+    "wide": (
+        ["id", TAG_COLUMN, *(f"c{c}" for c in range(2, _WIDE_COLUMNS))],
+        _wide,
+    ),
+    "quoted": (["id", TAG_COLUMN, "name", "note"], _quoted),
+    "unicode": (["id", TAG_COLUMN, "name", "address", "emoji"], _unicode),
+}
+
+
+def generate(
+    path: Path, shape: str, rows: int, *, header: bool = True, seed: int = 0
+) -> None:
+    """shape の形の CSV を rows 行（ヘッダー行を除く）書き出す。"""
+
+    fieldnames, make_row = SHAPES[shape]
+    rng = random.Random(f"{shape}:{seed}")
+    with path.open("w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        if header:
+            writer.writerow(fieldnames)
+        for i in range(rows):
+            writer.writerow(make_row(i, rng, _tags(rng)))
+
+
+def digest(path: Path) -> str:
+    """生成したファイルの内容のハッシュ（結果を比べるときに同じデータかを確かめる）。"""
+
+    h = hashlib.blake2b(digest_size=16)
+    with path.open("rb") as f:
+        while chunk := f.read(1 << 20):
+            h.update(chunk)
+    return h.hexdigest()
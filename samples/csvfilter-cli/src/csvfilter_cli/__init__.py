@@ -1 +1,25 @@
-__all__ = []
+"""指定条件に一致する CSV 行を取り出す CLI とライブラリ。
+
+ライブラリとして使う場合は filter_rows()（一致した行を遅延イテレーターで返す）か
+filter_csv()（一致した行をファイル・標準出力へ書き出す）を使う。
+"""
+
+from .filters import build_condition
+from .io import (
+    CsvFilterError,
+    FilterBinding,
+    FilteredRows,
+    FilterStats,
+    filter_csv,
+    filter_rows,
+)
+
+__all__ = [
+    "CsvFilterError",
+    "FilterBinding",
+    "FilterStats",
+    "FilteredRows",
+    "build_condition",
+    "filter_csv",
+    "filter_rows",
+]
@@ -0,0 +1,160 @@
+"""複数のクエリ（フィルター集合と出力先の組）を 1 回の走査でまとめて処理するモジュール。
+
+入力の各行は 1 回だけパースし、一致したすべてのクエリの出力へ振り分ける。
+クエリをまたいで共通する条件は 1 行につき 1 回だけ評価する。
+"""
+
+from __future__ import annotations
+
+import csv
+import time
+from collections.abc import Callable, Iterable, Sequence
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .compressed import CompressionError
+from .expr import Expr
+from .io import (
+    CsvFilterError,
+    FilterBinding,
+    FilterStats,
+    _fit_row,
+    _open_input,
+    _open_output,
+    _projector,
+    compile_filter_sets,
+    project,
+    select_columns,
+)
+
+
+@dataclass(frozen=True)
+class Query:
+    name: str
+    output_path: Path | None  # None なら標準出力
+    filters: list[FilterBinding] = field(default_factory=list)
+    where: Expr[FilterBinding] | None = None
+    select: list[str | int] | None = None
+
+
+def filter_csv_multi(
+    *,
+    input_path: Path | None,
+    queries: list[Query],
+    delimiter: str,
+    quotechar: str,
+    no_header: bool,
+) -> dict[str, FilterStats]:
+    """入力を 1 回だけ読み、各クエリに一致した行をそれぞれの出力先へ書き出す。
+
+    戻り値はクエリ名ごとの FilterStats（クエリの定義順）。
+    """
+
+    names = [query.name for query in queries]
+    duplicated = sorted({name for name in names if names.count(name) > 1})
+    if duplicated:
+        raise CsvFilterError(f"クエリ名が重複しています: {', '.join(duplicated)}")
+    # 同じ出力先を 2 回開くと、互いの行を上書きしたり混ぜたりしてしまう
+    outputs = [_output_key(query.output_path) for query in queries]
+    duplicated = sorted({out for out in outputs if outputs.count(out) > 1})
+    if duplicated:
+        raise CsvFilterError(f"出力先が重複しています: {', '.join(duplicated)}")
+
+    results = {query.name: FilterStats() for query in queries}
+    start = time.perf_counter()
+    # 展開時間などの入力側の計測値は共通なので、まとめて記録して最後に各クエリへ写す
+    shared = FilterStats()
+
+    infile, should_close_input = _open_input(input_path, shared)
+    try:
+        with ExitStack() as outputs:
+            reader = csv.reader(infile, delimiter=delimiter, quotechar=quotechar)
+            fieldnames: list[str] | None = None
+            if not no_header:
+                fieldnames = next(reader, None)
+                if fieldnames is None:
+                    raise CsvFilterError(
+                        "ヘッダー行が存在しません。`--no-header` を指定してください。"
+                    )
+
+            # 出力先を開く前にすべてのクエリを検証する
+            predicates = compile_filter_sets(
+                [(query.filters, query.where) for query in queries], fieldnames
+            )
+            selections = [select_columns(q.select, fieldnames) for q in queries]
+
+            routes: list[_Route] = []
+            for query, predicate, columns in zip(queries, predicates, selections):
+                outfile, should_close = _open_output(query.output_path)
+                if should_close:
+                    outputs.callback(outfile.close)
+                writer = csv.writer(
+                    outfile,
+                    delimiter=delimiter,
+                    quotechar=quotechar,
+                    lineterminator="\n",
+                )
+                if fieldnames is not None:
+                    writer.writerow(
+                        fieldnames if columns is None else project(fieldnames, columns)
+                    )
+                shape = _shaper(
+                    columns, None if fieldnames is None else len(fieldnames)
+                )
+                routes.append((predicate, writer.writerow, shape, results[query.name]))
+
+            _route_rows(reader, routes, skip_blank=fieldnames is not None)
+    except CompressionError as exc:
+        raise CsvFilterError(str(exc)) from exc
+    finally:
+        if should_close_input:
+            infile.close()
+
+    elapsed = time.perf_counter() - start
+    for stats in results.values():
+        stats.elapsed_seconds = elapsed
+        stats.decompress_seconds = shared.decompress_seconds
+        stats.input_wait_seconds = shared.input_wait_seconds
+    return results
+
+
+_Route = tuple[
+    Callable[[list[str]], bool | None],
+    Callable[[Sequence[str]], object],
+    Callable[[list[str]], Sequence[str]],
+    FilterStats,
+]
+
+
+def _route_rows(
+    rows: Iterable[list[str]], routes: list[_Route], *, skip_blank: bool
+) -> None:
+    """各行を全クエリの述語に渡し、一致したクエリの出力へ書き出す。"""
+    for row in rows:
+        if skip_blank and not row:
+            continue  # 空行はデータ行として数えない（filter_csv と同じ）
+        for predicate, write, shape, stats in routes:
+            stats.processed += 1
+            result = predicate(row)
+            if result is None:
+                stats.skipped += 1
+            elif result:
+                stats.matched += 1
+                write(shape(row))
+
+
+def _output_key(path: Path | None) -> str:
+    """出力先の比較用の文字列。標準出力は `-`、ファイルは絶対パス。"""
+    return "-" if path is None else str(path.resolve())
+
+
+def _shaper(
+    columns: list[int] | None, width: int | None
+) -> Callable[[list[str]], Sequence[str]]:
+    """出力行の整形（列の選択、またはヘッダーの列数への調整）を行う関数を返す。"""
+    if columns is not None:
+        return _projector(columns, "")
+    if width is None:
+        return lambda row: row
+    return lambda row: _fit_row(row, width)
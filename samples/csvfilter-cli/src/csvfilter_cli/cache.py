@@ -0,0 +1,394 @@
+"""同じ CSV を繰り返しフィルターするための列指向バイナリキャッシュ。
+
+`--cache-dir` を指定すると、初回の読み込み時に入力を列ごとのファイルへ変換する。
+
+- `c<列>.data`: 列の値を連結した UTF-8 テキスト
+- `c<列>.offsets`: 各行の値の開始位置（data 上のバイト位置, int64, 行数 + 1 要素）
+- `lengths`: 各行の列数（uint32）。短い行のスキップ判定と出力に使う
+- `meta.json`: 入力ファイルのサイズ・更新時刻・ハッシュ、区切り文字など
+
+2 回目以降は列ファイルを mmap したまま、MATCH_ROWS 行ずつ条件を列ごとに評価する。
+contains はその範囲の data のバイト列を直接検索し、その他の条件はまだ残っている行の
+値だけを切り出してデコードし判定する。一致した行はその範囲ごとに組み立てて返すので、
+列全体をデコードしたり一致した行を溜めたりはしない。キャッシュ全体が上限サイズを
+超えたら、最後に使った時刻の古いエントリから削除する（LRU）。
+"""
+
+from __future__ import annotations
+
+import bisect
+import hashlib
+import itertools
+import json
+import mmap
+import os
+import shutil
+import sys
+import tempfile
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+from pathlib import Path
+
+from .filters import (
+    Condition,
+    ContainsCondition,
+    RowPredicate,
+    condition_cost,
+    value_check,
+)
+from .index import content_hash, is_fresh
+
+DEFAULT_CACHE_SIZE = 1 << 30
+FLUSH_ROWS = 1 << 16  # 変換時にまとめて転置・書き出しする行数
+MATCH_ROWS = 1 << 16  # 評価時にまとめて列ごとに評価する行数
+_META = "meta.json"
+_FORMAT = 1
+
+
+class CacheError(Exception):
+    """キャッシュの作成や読み込みに関する例外"""
+
+
+def entry_key(path: Path, delimiter: str, quotechar: str, no_header: bool) -> str:
+    """入力ファイルと CSV の形式からキャッシュエントリ名を決める。"""
+    source = f"{path.resolve()}\0{delimiter}\0{quotechar}\0{no_header}"
+    return hashlib.blake2b(source.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def open_entry(
+    cache_dir: Path, path: Path, *, delimiter: str, quotechar: str, no_header: bool
+) -> CacheEntry | None:
+    """新しいキャッシュエントリがあれば開く。無い・古い場合は None（古いものは削除）。"""
+
+    directory = cache_dir / entry_key(path, delimiter, quotechar, no_header)
+    try:
+        meta = json.loads((directory / _META).read_text(encoding="utf-8"))
+        fresh = meta.get("format") == _FORMAT and is_fresh(path, meta["source"])
+    except (OSError, ValueError, KeyError):
+        fresh = False
+        meta = None
+    if not fresh:
+        if meta is not None:
+            shutil.rmtree(directory, ignore_errors=True)
+        return None
+
+    try:
+        entry = CacheEntry(directory, meta)
+        os.utime(directory / _META)  # LRU 用に最後に使った時刻を更新する
+    except (OSError, CacheError):  # 壊れたエントリは作り直す
+        shutil.rmtree(directory, ignore_errors=True)
+        return None
+    return entry
+
+
+def build_entry(
+    cache_dir: Path,
+    path: Path,
+    rows: Iterable[list[str]],
+    fieldnames: list[str] | None,
+    *,
+    delimiter: str,
+    quotechar: str,
+    no_header: bool,
+) -> CacheEntry:
+    """rows（ヘッダー行を除くデータ行）を列ごとのファイルに書き出してエントリを作る。
+
+    ヘッダーありの場合、空行は数えず、ヘッダーの列数より後ろの値は保存しない
+    （出力でも切り捨てられるため）。同じエントリを別のプロセスが先に作成した場合は、
+    そのエントリを開いて返す。
+    """
+
+    key = entry_key(path, delimiter, quotechar, no_header)
+    directory = cache_dir / key
+    try:
+        stat = path.stat()
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = Path(tempfile.mkdtemp(prefix=f"{key}.tmp-", dir=cache_dir))
+    except OSError as exc:
+        message = f"キャッシュを作成できません: {directory} ({exc})"
+        raise CacheError(message) from exc
+    try:
+        width = None if fieldnames is None else len(fieldnames)
+        count = _write_columns(tmp, rows, width)
+        meta = {
+            "format": _FORMAT,
+            "source": {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "blake2b": content_hash(path),
+            },
+            "byteorder": sys.byteorder,
+            "fieldnames": fieldnames,
+            "rows": count,
+            "columns": len(list(tmp.glob("c*.data"))),
+        }
+        (tmp / _META).write_text(json.dumps(meta, ensure_ascii=False), "utf-8")
+        # 読み手が作成途中のエントリを見ないよう、名前の変更で公開する
+        tmp.rename(directory)
+    except OSError as exc:
+        # 同時に作成していた別のプロセスが先に公開していれば、そのエントリを使う
+        # （古いエントリは open_entry が削除済みなので、ここにあるのはそのプロセスのもの）
+        winner = None
+        if (directory / _META).is_file():
+            winner = open_entry(
+                cache_dir,
+                path,
+                delimiter=delimiter,
+                quotechar=quotechar,
+                no_header=no_header,
+            )
+        if winner is None:
+            message = f"キャッシュを作成できません: {directory} ({exc})"
+            raise CacheError(message) from exc
+        return winner
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return CacheEntry(directory, meta)
+
+
+def evict(cache_dir: Path, limit: int) -> None:
+    """キャッシュ全体が limit バイト以下になるまで、使われていない順に削除する。"""
+
+    entries = []
+    for directory in cache_dir.iterdir():
+        meta = directory / _META
+        if not meta.is_file():
+            continue
+        size = sum(f.stat().st_size for f in directory.iterdir())
+        entries.append((meta.stat().st_mtime_ns, size, directory))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, directory in sorted(entries):
+        if total <= limit:
+            break
+        shutil.rmtree(directory, ignore_errors=True)
+        total -= size
+
+
+class CacheEntry:
+    """開いたキャッシュエントリ。with 文で使い、終わったら mmap した列を閉じる。"""
+
+    def __init__(self, directory: Path, meta: dict) -> None:
+        if meta.get("byteorder") != sys.byteorder:
+            raise CacheError("キャッシュのバイト順が異なります")
+        self.directory = directory
+        self.fieldnames: list[str] | None = meta["fieldnames"]
+        self.rows: int = meta["rows"]
+        self.width: int = meta["columns"]
+        self._lengths = _MappedFile(directory / "lengths", "I")
+        if len(self._lengths.view) != self.rows:
+            self._lengths.close()
+            raise CacheError("キャッシュの lengths が壊れています")
+        self.lengths = self._lengths.view
+        self._columns: dict[int, _Column] = {}
+
+    def __enter__(self) -> CacheEntry:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for column in self._columns.values():
+            column.close()
+        self._columns.clear()
+        self._lengths.close()
+
+    def column(self, index: int) -> _Column:
+        column = self._columns.get(index)
+        if column is None:
+            column = _Column(self.directory, index, self.rows)
+            self._columns[index] = column
+        return column
+
+    def row(self, r: int, columns: Sequence[int] | None = None) -> list[str]:
+        """r 行目を組み立てる。columns が None なら保存されている全列。
+
+        ヘッダーありでは列数をヘッダーに揃えた行（欠けた列は空文字）を返す。
+        ヘッダーなしでは元の列数の行を返す。
+        """
+        return list(self.take([r], columns)[0])
+
+    def take(
+        self, rs: Sequence[int], columns: Sequence[int] | None = None
+    ) -> list[tuple[str, ...]]:
+        """rs の各行をまとめて組み立てる。列の扱いは row と同じ。
+
+        列ごとに rs の値をまとめて切り出してから行に並べ替える。
+        """
+        picked = range(self.width) if columns is None else columns
+        values = [
+            self.column(c).values(rs) if c < self.width else [""] * len(rs)
+            for c in picked
+        ]
+        if not values:
+            return [() for _ in rs]
+        rows = list(zip(*values))
+        if columns is None and self.fieldnames is None:
+            lengths = self.lengths
+            rows = [row[: lengths[r]] for r, row in zip(rs, rows)]
+        return rows
+
+    def match(
+        self, indexed: Sequence[tuple[int, Condition]], predicate: RowPredicate
+    ) -> Iterator[list[tuple[int, bool | None]]]:
+        """MATCH_ROWS 行ごとに、一致またはスキップした行の (行番号, 結果) のリストを返す。
+
+        リストは行番号順。参照する列がすべてある行は列ごとに評価する。短い行は
+        行を組み立てて predicate で評価する（条件の指定順でスキップか不一致かが
+        決まるため）。途中でやめた場合、残りの行は評価しない。
+        """
+
+        need = max((index for index, _ in indexed), default=-1) + 1
+        ordered = sorted(indexed, key=lambda b: condition_cost(b[1]))
+        lengths = self.lengths
+        for start in range(0, self.rows, MATCH_ROWS):
+            stop = min(start + MATCH_ROWS, self.rows)
+            alive = [r for r in range(start, stop) if lengths[r] >= need]
+            short = [r for r in range(start, stop) if lengths[r] < need]
+
+            for index, condition in ordered:
+                if not alive:
+                    break
+                column = self.column(index)
+                if type(condition) is ContainsCondition and condition.needle:
+                    needle = condition.needle.encode("utf-8")
+                    hits = column.rows_containing(needle, start, stop)
+                    alive = [r for r in alive if r in hits]
+                else:
+                    check = value_check(condition)
+                    values = column.values(alive)
+                    alive = [r for r, value in zip(alive, values) if check(value)]
+
+            results: list[tuple[int, bool | None]] = [(r, True) for r in alive]
+            for r in short:
+                result = predicate(self.row(r, range(lengths[r])))
+                if result is None or result:
+                    results.append((r, result))
+            results.sort()
+            yield results
+
+
+class _Column:
+    """1 列分の値。data と offsets を mmap したまま、バイト位置で切り出す。"""
+
+    def __init__(self, directory: Path, index: int, rows: int) -> None:
+        self._offsets = _MappedFile(directory / f"c{index}.offsets", "q")
+        try:
+            self._data = _MappedFile(directory / f"c{index}.data")
+        except (OSError, CacheError):
+            self._offsets.close()
+            raise
+        self.offsets = self._offsets.view
+        if len(self.offsets) != rows + 1 or self.offsets[rows] != len(self._data.mm):
+            self.close()
+            raise CacheError(f"キャッシュの列ファイルが壊れています: c{index}")
+
+    def close(self) -> None:
+        self._data.close()
+        self._offsets.close()
+
+    def values(self, rows: Iterable[int]) -> list[str]:
+        data, offsets = self._data.mm, self.offsets
+        return [data[offsets[r] : offsets[r + 1]].decode("utf-8") for r in rows]
+
+    def rows_containing(self, needle: bytes, start: int, stop: int) -> set[int]:
+        """[start, stop) 行のうち、値に needle を含む行番号の集合。
+
+        その範囲の data のバイト列を直接検索する。UTF-8 のバイト列の一致は
+        文字の境界でしか起きないので、デコードした文字列の検索と結果は同じ。
+        """
+        rows: set[int] = set()
+        data, offsets = self._data.mm, self.offsets
+        limit = offsets[stop]
+        pos = data.find(needle, offsets[start], limit)
+        while pos != -1:
+            r = bisect.bisect_right(offsets, pos, start, stop) - 1
+            end = offsets[r + 1]
+            if pos + len(needle) <= end:
+                rows.add(r)
+                pos = data.find(needle, end, limit)  # この行の残りは調べなくてよい
+            else:  # 値の境界をまたいだ一致
+                pos = data.find(needle, pos + 1, limit)
+        return rows
+
+
+class _MappedFile:
+    """読み取り専用で mmap したファイル。view は typecode で見た memoryview。"""
+
+    def __init__(self, path: Path, typecode: str = "B") -> None:
+        with path.open("rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size % array(typecode).itemsize:
+                raise CacheError(f"キャッシュのファイルが壊れています: {path.name}")
+            # 空のファイルは mmap できないので空のバイト列で代用する
+            self.mm: mmap.mmap | bytes = (
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+            )
+        self.view = memoryview(self.mm).cast(typecode)
+
+    def close(self) -> None:
+        self.view.release()  # mmap を閉じる前に参照を外す
+        if isinstance(self.mm, mmap.mmap):
+            self.mm.close()
+
+
+def _write_columns(
+    directory: Path, rows: Iterable[list[str]], width: int | None
+) -> int:
+    """rows を列ごとのファイルへ書き出し、行数を返す。
+
+    FLUSH_ROWS 行ずつまとめて転置し、列ごとに連結して書き出す。
+    """
+
+    if width is not None:
+        rows = (row for row in rows if row)  # ヘッダーありでは空行を数えない
+    writers: list[_ColumnWriter] = []
+    count = 0
+    try:
+        with (directory / "lengths").open("wb") as lengths_file:
+            if width is not None:
+                writers = [_ColumnWriter(directory, c, 0) for c in range(width)]
+            rows = iter(rows)
+            while batch := list(itertools.islice(rows, FLUSH_ROWS)):
+                lengths = array("I", map(len, batch))
+                if width is None:
+                    while len(writers) < max(lengths):
+                        # 初めて現れた列は、それまでの行を空文字にする
+                        writers.append(_ColumnWriter(directory, len(writers), count))
+                if min(lengths) >= len(writers):
+                    columns: Iterable[Sequence[str]] = zip(*batch)
+                else:
+                    columns = (
+                        [row[c] if c < len(row) else "" for row in batch]
+                        for c in range(len(writers))
+                    )
+                for writer, values in zip(writers, columns):
+                    writer.extend(values)
+                lengths.tofile(lengths_file)
+                count += len(batch)
+    finally:
+        for writer in writers:
+            writer.close()
+    return count
+
+
+class _ColumnWriter:
+    def __init__(self, directory: Path, index: int, empty_rows: int) -> None:
+        self._data = (directory / f"c{index}.data").open("wb")
+        self._offsets = (directory / f"c{index}.offsets").open("wb")
+        array("q", [0] * (empty_rows + 1)).tofile(self._offsets)
+        self._position = 0
+
+    def extend(self, values: Sequence[str]) -> None:
+        encoded = [value.encode("utf-8") for value in values]
+        self._data.write(b"".join(encoded))
+        ends = itertools.accumulate(map(len, encoded), initial=self._position)
+        next(ends)
+        offsets = array("q", ends)
+        offsets.tofile(self._offsets)
+        self._position = offsets[-1]
+
+    def close(self) -> None:
+        self._offsets.close()
+        self._data.close()
@@ -1,30 +1,55 @@
 from __future__ import annotations
 
 import argparse
+import json
 import sys
+import tomllib
 from dataclasses import dataclass
 from pathlib import Path
 
+from .batch import Query, filter_csv_multi
+from .cache import DEFAULT_CACHE_SIZE
+from .expr import Expr, parse_where
 from .filters import build_condition
-from .io import CsvFilterError, FilterBinding, filter_csv
+from .index import IndexFileError, build_index
+from .io import CsvFilterError, FilterBinding, FilterStats, filter_csv
+from .parallel import filter_csv_parallel
+from .profiling import DEFAULT_PROGRESS_INTERVAL, FilterProfile
+
+EXIT_NO_MATCH = 3  # --exists で一致する行が無かった場合の終了コード
 
 
 @dataclass(frozen=True)
 class Args:
-    input: Path
+    input: Path | None
     output: Path | None
     delimiter: str
     quotechar: str
     no_header: bool
     filters: list[str]
+    where: str | None
+    select: str | None
+    queries: Path | None
+    cache_dir: Path | None
+    cache_size_mb: int
     verbose: bool
+    jobs: int
+    mmap: bool
+    numpy: bool
+    limit: int | None
+    count_only: bool
+    exists: bool
+    stats: str | None
+    progress: bool
 
 
 def parse_args(argv: list[str]) -> Args:
     parser = argparse.ArgumentParser(
         description="指定条件に一致するCSV行のみを出力します。"
     )
-    parser.add_argument("--input", required=True, help="入力CSVファイルのパス")
+    parser.add_argument(
+        "--input", required=True, help="入力CSVファイルのパス（`-` で標準入力）"
+    )
     parser.add_argument("--output", help="出力先ファイルのパス（未指定時は標準出力）")
     parser.add_argument(
         "--delimiter",
@@ -48,6 +73,70 @@ def parse_args(argv: list[str]) -> Args:
         default=[],
         help="AND条件を指定（形式: col:op:val）。複数指定可。",
     )
+    parser.add_argument(
+        "--where",
+        help="and / or / not と括弧を使った条件式（例: 'a:eq:1 or not b:eq:2'）",
+    )
+    parser.add_argument(
+        "--select",
+        help="出力する列をカンマ区切りで指定（ヘッダーなしの場合は1始まりの列番号）",
+    )
+    parser.add_argument(
+        "--queries",
+        help="複数のクエリを定義した TOML ファイル。入力を 1 回だけ読んで各出力先へ振り分ける",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="列指向キャッシュの保存先。同じ入力を繰り返しフィルターする場合に高速化",
+    )
+    parser.add_argument(
+        "--cache-size-mb",
+        type=int,
+        default=DEFAULT_CACHE_SIZE >> 20,
+        help="キャッシュ全体の上限サイズ（MB, デフォルト: 1024）。超えたら古いものから削除",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="並列処理するプロセス数（デフォルト: 1）",
+    )
+    parser.add_argument(
+        "--mmap",
+        action="store_true",
+        help="クオートを含まない入力を mmap で高速処理（条件が contains のみの場合）",
+    )
+    parser.add_argument(
+        "--numpy",
+        action="store_true",
+        help="NumPy があれば行をまとめて評価する（--and のみの場合。無ければ通常処理）",
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        help="一致した行を N 行出力した時点で読み込みをやめる",
+    )
+    parser.add_argument(
+        "--count-only",
+        action="store_true",
+        help="行を出力せず、一致した行数だけを標準出力に表示",
+    )
+    parser.add_argument(
+        "--exists",
+        action="store_true",
+        help=f"最初に一致した行で終了し、終了コードで返す（一致なしは {EXIT_NO_MATCH}）",
+    )
+    parser.add_argument(
+        "--stats",
+        choices=["text", "json"],
+        help="終了時に段階ごと・条件ごとの所要時間と件数を stderr に出力（計測の分だけ遅くなる）",
+    )
+    parser.add_argument(
+        "--progress",
+        action="store_true",
+        help=f"{DEFAULT_PROGRESS_INTERVAL:g} 秒ごとに処理件数と行数/秒・MB/秒を stderr に出力",
+    )
     parser.add_argument(
         "-v",
         "--verbose",
@@ -57,34 +146,235 @@ def parse_args(argv: list[str]) -> Args:
 
     ns = parser.parse_args(argv)
     return Args(
-        input=Path(ns.input),
+        input=None if ns.input == "-" else Path(ns.input),
         output=Path(ns.output) if ns.output else None,
         delimiter=ns.delimiter,
         quotechar=ns.quotechar,
         no_header=ns.no_header,
         filters=ns.filters,
+        where=ns.where,
+        select=ns.select,
+        queries=Path(ns.queries) if ns.queries else None,
+        cache_dir=Path(ns.cache_dir) if ns.cache_dir else None,
+        cache_size_mb=ns.cache_size_mb,
         verbose=ns.verbose,
+        jobs=ns.jobs,
+        mmap=ns.mmap,
+        numpy=ns.numpy,
+        limit=ns.limit,
+        count_only=ns.count_only,
+        exists=ns.exists,
+        stats=ns.stats,
+        progress=ns.progress,
     )
 
 
 def main(argv: list[str] | None = None) -> int:
-    args = parse_args(argv or sys.argv[1:])
+    argv = argv or sys.argv[1:]
+    if argv[:1] == ["index"]:
+        return _index_main(argv[1:])
+    args = parse_args(argv)
+
+    if args.queries is not None:
+        return _run_queries(args, args.queries)
 
     try:
         bindings = [_parse_filter(f, args.no_header) for f in args.filters]
+        where: Expr[FilterBinding] | None = None
+        if args.where is not None:
+            where = parse_where(args.where, lambda t: _parse_filter(t, args.no_header))
+        select = None
+        if args.select is not None:
+            select = _parse_select(args.select, args.no_header)
     except ValueError as exc:
         _error(str(exc))
         return 1
 
-    if not bindings:
-        _error("フィルターを1件以上指定してください (--and col:op:val)")
+    if not bindings and where is None:
+        _error(
+            "フィルターを1件以上指定してください (--and col:op:val または --where 式)"
+        )
+        return 1
+
+    if args.jobs < 1:
+        _error("--jobs は1以上で指定してください")
+        return 1
+    if args.jobs > 1 and args.input is None:
+        _error("標準入力では --jobs を指定できません")
+        return 1
+    if args.cache_dir is not None and args.jobs > 1:
+        _error("--cache-dir と --jobs は同時に指定できません")
+        return 1
+    if args.cache_size_mb < 0:
+        _error("--cache-size-mb は0以上で指定してください")
+        return 1
+    if args.limit is not None and args.limit < 1:
+        _error("--limit は1以上で指定してください")
+        return 1
+    if args.exists and (args.count_only or args.limit is not None):
+        _error("--exists と --count-only / --limit は同時に指定できません")
+        return 1
+    if (args.count_only or args.exists) and args.output is not None:
+        _error("--count-only / --exists では --output を指定できません")
+        return 1
+    if (args.limit is not None or args.exists) and args.jobs > 1:
+        _error("--limit / --exists と --jobs は同時に指定できません")
+        return 1
+    if (args.stats is not None or args.progress) and args.jobs > 1:
+        _error("--stats / --progress と --jobs は同時に指定できません")
+        return 1
+    # --exists は最初の 1 行で打ち切る件数のみのモード
+    limit = 1 if args.exists else args.limit
+    count_only = args.count_only or args.exists
+    profile = FilterProfile() if args.stats is not None else None
+
+    try:
+        if args.jobs > 1 and args.input is not None:
+            stats = filter_csv_parallel(
+                input_path=args.input,
+                output_path=args.output,
+                filters=bindings,
+                delimiter=args.delimiter,
+                quotechar=args.quotechar,
+                no_header=args.no_header,
+                jobs=args.jobs,
+                where=where,
+                select=select,
+                vectorize=args.numpy,
+                count_only=count_only,
+            )
+        else:
+            stats = filter_csv(
+                input_path=args.input,
+                output_path=args.output,
+                filters=bindings,
+                delimiter=args.delimiter,
+                quotechar=args.quotechar,
+                no_header=args.no_header,
+                fast_path=args.mmap,
+                where=where,
+                select=select,
+                cache_dir=args.cache_dir,
+                cache_size=args.cache_size_mb << 20,
+                vectorize=args.numpy,
+                limit=limit,
+                count_only=count_only,
+                profile=profile,
+                progress_interval=DEFAULT_PROGRESS_INTERVAL if args.progress else None,
+            )
+    except CsvFilterError as exc:
+        _error(str(exc))
+        return 1
+
+    if args.count_only:
+        print(stats.matched)
+    elif stats.matched == 0 and not args.exists:
+        _error("0 rows matched")
+
+    if args.verbose:
+        _report(stats)
+    if profile is not None:
+        _report_profile(stats, profile, args.stats == "json")
+
+    if args.exists and stats.matched == 0:
+        return EXIT_NO_MATCH
+    return 0
+
+
+def _index_main(argv: list[str]) -> int:
+    """`index build` サブコマンド。入力 CSV の隣に索引ファイルを作成する。"""
+
+    parser = argparse.ArgumentParser(
+        prog="csvfilter_cli index",
+        description="列の値から行を引く索引を入力CSVの隣に作成します。",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="索引を作成（既存の索引は上書き）")
+    build.add_argument("--input", required=True, help="入力CSVファイルのパス")
+    build.add_argument(
+        "--column",
+        dest="columns",
+        action="append",
+        required=True,
+        help="索引を作る列（ヘッダーなしの場合は1始まりの列番号）。複数指定可。",
+    )
+    build.add_argument(
+        "--ngram",
+        type=int,
+        default=0,
+        help="contains 用に長さ N の部分文字列の索引も作る（デフォルト: 0 = 作らない）",
+    )
+    build.add_argument("--delimiter", default=",", help="区切り文字（デフォルト: ,）")
+    build.add_argument("--quotechar", default='"', help='クオート文字（デフォルト: "）')
+    build.add_argument(
+        "--no-header",
+        action="store_true",
+        help="先頭行をヘッダーとみなさずデータとして扱う",
+    )
+    build.add_argument(
+        "-v",
+        "--verbose",
+        action="store_true",
+        help="作成した索引のパスを stderr に出力",
+    )
+    ns = parser.parse_args(argv)
+
+    if ns.ngram < 0:
+        _error("--ngram は0以上で指定してください")
+        return 1
+    try:
+        columns = _select_keys(ns.columns, ns.no_header)
+        target = build_index(
+            Path(ns.input),
+            columns,
+            delimiter=ns.delimiter,
+            quotechar=ns.quotechar,
+            no_header=ns.no_header,
+            ngram=ns.ngram,
+        )
+    except (ValueError, IndexFileError) as exc:
+        _error(str(exc))
+        return 1
+
+    if ns.verbose:
+        _error(f"index written: {target}")
+    return 0
+
+
+def _run_queries(args: Args, queries_path: Path) -> int:
+    conflicts = [
+        option
+        for option, given in (
+            ("--and", bool(args.filters)),
+            ("--where", args.where is not None),
+            ("--select", args.select is not None),
+            ("--output", args.output is not None),
+            ("--jobs", args.jobs != 1),
+            ("--mmap", args.mmap),
+            ("--cache-dir", args.cache_dir is not None),
+            ("--numpy", args.numpy),
+            ("--limit", args.limit is not None),
+            ("--count-only", args.count_only),
+            ("--exists", args.exists),
+            ("--stats", args.stats is not None),
+            ("--progress", args.progress),
+        )
+        if given
+    ]
+    if conflicts:
+        _error(f"--queries と {', '.join(conflicts)} は同時に指定できません")
+        return 1
+
+    try:
+        queries = _load_queries(queries_path, args.no_header)
+    except ValueError as exc:
+        _error(str(exc))
         return 1
 
     try:
-        stats = filter_csv(
+        results = filter_csv_multi(
             input_path=args.input,
-            output_path=args.output,
-            filters=bindings,
+            queries=queries,
             delimiter=args.delimiter,
             quotechar=args.quotechar,
             no_header=args.no_header,
@@ -93,15 +383,80 @@ def main(argv: list[str] | None = None) -> int:
         _error(str(exc))
         return 1
 
-    if stats.matched == 0:
-        _error("0 rows matched")
+    for name, stats in results.items():
+        if stats.matched == 0:
+            _error(f"[{name}] 0 rows matched")
+        if args.verbose:
+            _report(stats, f"[{name}] ")
 
-    if args.verbose:
-        _error(
-            f"processed={stats.processed}, matched={stats.matched}, skipped={stats.skipped}"
+    return 0
+
+
+def _load_queries(path: Path, no_header: bool) -> list[Query]:
+    """TOML の [[query]] テーブルの配列を読み込む。
+
+    各テーブルは output（必須）, name, and（col:op:val の配列）, where, select を持つ。
+    output の相対パスはカレントディレクトリ基準（--output と同じ）。`-` は標準出力。
+    """
+
+    try:
+        with path.open("rb") as f:
+            document = tomllib.load(f)
+    except OSError as exc:
+        raise ValueError(f"クエリファイルを読み込めません: {path} ({exc})") from exc
+    except tomllib.TOMLDecodeError as exc:
+        raise ValueError(f"クエリファイルの形式が不正です: {path} ({exc})") from exc
+
+    tables = document.get("query")
+    if not isinstance(tables, list) or not tables:
+        raise ValueError(f"[[query]] が定義されていません: {path}")
+
+    queries: list[Query] = []
+    for number, table in enumerate(tables, start=1):
+        output = table.get("output")
+        if not isinstance(output, str) or not output:
+            raise ValueError(f"{number} 番目のクエリに output がありません")
+        name = str(table.get("name", output))
+        try:
+            filters = [_parse_filter(str(t), no_header) for t in table.get("and", [])]
+            where: Expr[FilterBinding] | None = None
+            if "where" in table:
+                where = parse_where(
+                    str(table["where"]), lambda t: _parse_filter(t, no_header)
+                )
+            select = None
+            if "select" in table:
+                names = table["select"]
+                if isinstance(names, str):
+                    names = names.split(",")
+                select = _select_keys([str(n) for n in names], no_header)
+        except ValueError as exc:
+            raise ValueError(f"[{name}] {exc}") from exc
+        if not filters and where is None:
+            raise ValueError(f"[{name}] and か where を指定してください")
+        queries.append(
+            Query(
+                name=name,
+                output_path=None if output == "-" else Path(output),
+                filters=filters,
+                where=where,
+                select=select,
+            )
         )
+    return queries
 
-    return 0
+
+def _report(stats: FilterStats, prefix: str = "") -> None:
+    _error(
+        f"{prefix}processed={stats.processed}, matched={stats.matched}, "
+        f"skipped={stats.skipped}"
+    )
+    if stats.decompress_seconds:
+        _error(
+            f"{prefix}decompress={stats.decompress_seconds:.3f}s, "
+            f"filter={stats.filter_seconds:.3f}s, "
+            f"elapsed={stats.elapsed_seconds:.3f}s"
+        )
 
 
 def _parse_filter(text: str, no_header: bool) -> FilterBinding:
@@ -130,5 +485,54 @@ def _parse_filter(text: str, no_header: bool) -> FilterBinding:
     return FilterBinding(column=column_key, condition=condition)
 
 
+def _parse_select(text: str, no_header: bool) -> list[str | int]:
+    return _select_keys(text.split(","), no_header)
+
+
+def _select_keys(names: list[str], no_header: bool) -> list[str | int]:
+    if not names or not all(names):
+        raise ValueError(f"出力する列の指定が不正です: {','.join(names)}")
+    if not no_header:
+        return list(names)
+
+    columns: list[str | int] = []
+    for name in names:
+        try:
+            col_index = int(name)
+        except ValueError as exc:
+            raise ValueError(
+                "ヘッダーなしの場合、列番号は整数で指定してください"
+            ) from exc
+        if col_index < 1:
+            raise ValueError("列番号は1以上で指定してください")
+        columns.append(col_index - 1)  # 内部では0始まり
+    return columns
+
+
+def _report_profile(stats: FilterStats, profile: FilterProfile, as_json: bool) -> None:
+    """`--stats` の計測結果を stderr に出力する。"""
+
+    summary = profile.to_dict(stats)
+    if as_json:
+        _error(json.dumps(summary, ensure_ascii=False, indent=2))
+        return
+
+    _error(
+        f"processed={stats.processed}, matched={stats.matched}, "
+        f"skipped={stats.skipped}, elapsed={stats.elapsed_seconds:.3f}s, "
+        f"rows/s={summary['rows_per_second']:.0f}, "
+        f"MB/s={summary['bytes_per_second'] / 1e6:.1f}"
+    )
+    _error(
+        "stages: "
+        + ", ".join(f"{name}={sec:.3f}s" for name, sec in summary["stages"].items())
+    )
+    for c in profile.conditions:
+        _error(
+            f"condition {c.column}:{c.condition}: evaluations={c.evaluations}, "
+            f"hits={c.hits} ({c.hit_rate:.1%}), time={c.seconds:.3f}s"
+        )
+
+
 def _error(message: str) -> None:
     print(message, file=sys.stderr)
@@ -0,0 +1,217 @@
+"""圧縮された入出力（gzip / bz2 / xz / zstd）を透過的に扱うモジュール。
+
+コーデックはファイルの拡張子、または先頭のマジックバイトから判定する。
+入力の展開はバックグラウンドスレッドで行い、展開とフィルター処理を重ねる
+（zlib / bz2 / lzma は展開中に GIL を解放するため、実際に並行して動く）。
+zstd は Python 3.14 の `compression.zstd`、または `zstandard` パッケージが
+あるときだけ利用できる。
+"""
+
+from __future__ import annotations
+
+import bz2
+import gzip
+import io
+import lzma
+import queue
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import IO, BinaryIO
+
+READ_CHUNK_SIZE = 1 << 20
+QUEUE_DEPTH = 8  # 先読みするチャンク数。メモリ使用量は最大で約 QUEUE_DEPTH MB
+
+_SUFFIXES = {
+    ".gz": "gzip",
+    ".gzip": "gzip",
+    ".bz2": "bz2",
+    ".xz": "xz",
+    ".lzma": "xz",
+    ".zst": "zstd",
+    ".zstd": "zstd",
+}
+
+_MAGIC = [
+    (b"\x1f\x8b", "gzip"),
+    (b"BZh", "bz2"),
+    (b"\xfd7zXZ\x00", "xz"),
+    (b"\x28\xb5\x2f\xfd", "zstd"),
+]
+MAGIC_SIZE = max(len(magic) for magic, _ in _MAGIC)
+
+
+class CompressionError(Exception):
+    """圧縮形式の判定や展開に関する例外"""
+
+
+def codec_for_suffix(path: Path) -> str | None:
+    """拡張子からコーデック名を返す。圧縮形式でなければ None。"""
+    return _SUFFIXES.get(path.suffix.lower())
+
+
+def codec_for_magic(head: bytes) -> str | None:
+    """先頭バイト列からコーデック名を返す。圧縮形式でなければ None。"""
+    for magic, codec in _MAGIC:
+        if head.startswith(magic):
+            return codec
+    return None
+
+
+def detect_codec(path: Path) -> str | None:
+    """拡張子、次いでマジックバイトでコーデックを判定する。"""
+    codec = codec_for_suffix(path)
+    if codec is not None:
+        return codec
+    with path.open("rb") as f:
+        return codec_for_magic(f.read(MAGIC_SIZE))
+
+
+def open_decompressed(
+    raw: BinaryIO, codec: str, on_close: Callable[[float, float], None] | None = None
+) -> BinaryIO:
+    """圧縮されたバイナリストリームを、展開済みのバイナリストリームとして開く。
+
+    展開はバックグラウンドスレッドで行う。on_close には閉じたときに
+    (展開スレッドが展開に費やした秒数, 読み手が展開待ちで止まっていた秒数) が渡される。
+    """
+
+    source = _decompressor(raw, codec)
+    reader = _ThreadedReader(source, raw, on_close)
+    return io.BufferedReader(reader, READ_CHUNK_SIZE)  # type: ignore[return-value]
+
+
+def open_compressed_output(path: Path, codec: str) -> BinaryIO:
+    """codec で圧縮して書き込むバイナリストリームを開く。"""
+
+    if codec == "gzip":
+        return gzip.open(path, "wb", compresslevel=6)  # type: ignore[return-value]
+    if codec == "bz2":
+        return bz2.open(path, "wb")  # type: ignore[return-value]
+    if codec == "xz":
+        return lzma.open(path, "wb")  # type: ignore[return-value]
+    if codec == "zstd":
+        return _zstd_open(path.open("wb"), "wb")
+    raise CompressionError(f"未対応の圧縮形式です: {codec}")
+
+
+def _decompressor(raw: BinaryIO, codec: str) -> IO[bytes]:
+    if codec == "gzip":
+        return gzip.GzipFile(fileobj=raw, mode="rb")
+    if codec == "bz2":
+        return bz2.BZ2File(raw, "rb")
+    if codec == "xz":
+        return lzma.LZMAFile(raw, "rb")
+    if codec == "zstd":
+        return _zstd_open(raw, "rb")
+    raise CompressionError(f"未対応の圧縮形式です: {codec}")
+
+
+def _zstd_open(fileobj: BinaryIO, mode: str) -> BinaryIO:
+    try:
+        from compression import zstd  # type: ignore[import-not-found]  # Python 3.14+
+
+        return zstd.ZstdFile(fileobj, mode)  # type: ignore[no-any-return]
+    except ImportError:
+        pass
+    try:
+        import zstandard  # type: ignore[import-not-found]
+    except ImportError as exc:
+        raise CompressionError(
+            "zstd を扱うには Python 3.14 以上か zstandard パッケージが必要です"
+        ) from exc
+    ctx = zstandard.ZstdDecompressor() if "r" in mode else zstandard.ZstdCompressor()
+    if "r" in mode:
+        return ctx.stream_reader(fileobj, closefd=True)  # type: ignore[no-any-return]
+    return ctx.stream_writer(fileobj, closefd=True)  # type: ignore[no-any-return]
+
+
+_EOF = object()
+
+
+class _ThreadedReader(io.RawIOBase):
+    """別スレッドで source を読み進め、チャンク単位で受け渡す読み取り専用ストリーム。
+
+    キューの長さを QUEUE_DEPTH に制限しているため、読み手が遅い場合は
+    展開スレッドが待つ（先読みしすぎてメモリを使い切ることはない）。
+    fileno() を提供しないので、mmap の高速経路は自動的に使われない。
+    """
+
+    def __init__(
+        self,
+        source: IO[bytes],
+        raw: BinaryIO,
+        on_close: Callable[[float, float], None] | None,
+    ) -> None:
+        self._source = source
+        self._raw = raw
+        self._on_close = on_close
+        self._queue: queue.Queue[object] = queue.Queue(QUEUE_DEPTH)
+        self._pending = memoryview(b"")
+        self._done = False
+        self._stop = threading.Event()
+        self._busy_seconds = 0.0
+        self._wait_seconds = 0.0
+        self._thread = threading.Thread(target=self._pump, daemon=True)
+        self._thread.start()
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:  # type: ignore[override]
+        while not self._pending:
+            if self._done:
+                return 0
+            start = time.perf_counter()
+            item = self._queue.get()
+            self._wait_seconds += time.perf_counter() - start
+            if item is _EOF:
+                self._done = True
+                return 0
+            if isinstance(item, BaseException):
+                self._done = True
+                raise CompressionError(f"入力の展開に失敗しました: {item}") from item
+            self._pending = memoryview(item)  # type: ignore[arg-type]
+        n = min(len(buffer), len(self._pending))
+        buffer[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        return n
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self._stop.set()
+        # 展開スレッドがキュー待ちで止まっていれば解放する
+        while self._thread.is_alive():
+            try:
+                self._queue.get(timeout=0.05)
+            except queue.Empty:
+                pass
+        self._source.close()
+        self._raw.close()
+        if self._on_close is not None:
+            self._on_close(self._busy_seconds, self._wait_seconds)
+        super().close()
+
+    def _pump(self) -> None:
+        try:
+            while not self._stop.is_set():
+                start = time.perf_counter()
+                chunk = self._source.read(READ_CHUNK_SIZE)
+                self._busy_seconds += time.perf_counter() - start
+                if not chunk:
+                    break
+                self._put(chunk)
+        except BaseException as exc:  # 例外は読み手側で送出し直す
+            self._put(exc)
+            return
+        self._put(_EOF)
+
+    def _put(self, item: object) -> None:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.05)
+                return
+            except queue.Full:
+                continue
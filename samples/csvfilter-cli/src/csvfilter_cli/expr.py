@@ -0,0 +1,366 @@
+"""`--where` で指定する論理式（and / or / not と括弧）の構文解析と評価。
+
+例: `(name:contains:Alice or status:eq:active) and not city:regex:"^(Osaka|Kyoto)$"`
+
+- 項は `--and` と同じ `col:op:val` 形式。空白や括弧を含む部分は `"` か `'` で囲む。
+- 優先順位は not > and > or。キーワードは大文字小文字を区別しない。
+- 評価は短絡評価で、推定コストの小さい部分式から順に評価する。
+- 式の中に同じ部分式が複数回現れる場合は、1 行につき 1 回だけ評価する。
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from typing import Generic, TypeVar, Union
+
+from .filters import (
+    CheckWrapper,
+    Condition,
+    RowPredicate,
+    compile_row_predicate,
+    condition_cost,
+)
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class Term(Generic[T]):
+    """式の末端。T は FilterBinding（解析直後）か (列インデックス, 条件)。"""
+
+    binding: T
+
+
+@dataclass(frozen=True)
+class And(Generic[T]):
+    children: tuple[Expr[T], ...]
+
+
+@dataclass(frozen=True)
+class Or(Generic[T]):
+    children: tuple[Expr[T], ...]
+
+
+@dataclass(frozen=True)
+class Not(Generic[T]):
+    child: Expr[T]
+
+
+Expr = Union[Term[T], And[T], Or[T], Not[T]]
+
+_KEYWORDS = ("and", "or", "not")
+
+
+def parse_where(text: str, parse_term: Callable[[str], T]) -> Expr[T]:
+    """論理式を構文木にする。各項は parse_term で変換する。
+
+    構文エラーや項の指定ミスは ValueError を送出する。
+    """
+
+    parser = _Parser(_tokenize(text), parse_term)
+    node = parser.parse_or()
+    if parser.peek() is not None:
+        raise ValueError(f"式の解釈に失敗しました（余分なトークン）: {parser.peek()}")
+    return node
+
+
+def map_terms(node: Expr[T], convert: Callable[[T], object]) -> Expr:
+    """各項の中身を convert で置き換えた構文木を返す。"""
+    if isinstance(node, Term):
+        return Term(convert(node.binding))
+    if isinstance(node, Not):
+        return Not(map_terms(node.child, convert))
+    children = tuple(map_terms(child, convert) for child in node.children)
+    return And(children) if isinstance(node, And) else Or(children)
+
+
+def terms(node: Expr[T]) -> list[T]:
+    """式に含まれる項を出現順に返す。"""
+    if isinstance(node, Term):
+        return [node.binding]
+    if isinstance(node, Not):
+        return terms(node.child)
+    return [t for child in node.children for t in terms(child)]
+
+
+def compile_expression(
+    node: Expr[tuple[int, Condition]], wrap: CheckWrapper | None = None
+) -> RowPredicate:
+    """列インデックス解決済みの構文木を行述語にコンパイルする。
+
+    参照する列が無い（短い）行はスキップ（None）とする。wrap は
+    compile_row_predicate と同じく条件ごとの評価関数を包む（計測用）。
+    """
+
+    return compile_expressions([node], wrap)[0]
+
+
+def compile_expressions(
+    nodes: Sequence[Expr[tuple[int, Condition]]],
+    wrap: CheckWrapper | None = None,
+    ordered: Sequence[bool] | None = None,
+) -> list[RowPredicate]:
+    """複数の構文木をまとめてコンパイルする。
+
+    木をまたいで同じ部分式が現れる場合も 1 行につき 1 回だけ評価されるよう、
+    すべての述語で評価結果を共有する（同じ行を順にすべての述語へ渡す前提）。
+    ordered[i] が真の木は --and と同じ項の AND 連鎖として扱い、短い行は
+    compile_row_predicate と同じく指定順に評価する（スキップ判定を揃える）。
+    """
+
+    flat = [_flatten(node) for node in nodes]
+    counts: Counter[Expr] = Counter()
+    for node in flat:
+        _count_subtrees(node, counts)
+    shared: dict[Expr, _Compiled | None] = {
+        subtree: None for subtree, n in counts.items() if n > 1
+    }
+    if ordered is None:
+        ordered = [False] * len(flat)
+    return [
+        _with_width(node, _compile(node, shared, wrap)[0], in_order, wrap)
+        for node, in_order in zip(flat, ordered)
+    ]
+
+
+def _with_width(
+    node: Expr, evaluate: _RowCheck, in_order: bool, wrap: CheckWrapper | None
+) -> RowPredicate:
+    bindings = terms(node)
+    width = max((index for index, _ in bindings), default=-1) + 1
+    short = compile_row_predicate(bindings, wrap) if in_order else None
+
+    def predicate(row: list[str]) -> bool | None:
+        if len(row) < width:
+            return None if short is None else short(row)
+        return evaluate(row)
+
+    return predicate
+
+
+_RowCheck = Callable[[list[str]], bool]
+_Compiled = tuple[_RowCheck, int]
+
+
+def _compile(
+    node: Expr, shared: dict[Expr, _Compiled | None], wrap: CheckWrapper | None
+) -> _Compiled:
+    """(評価関数, 推定コスト) を返す。
+
+    shared は複数回現れる部分式からコンパイル結果への辞書で、すべての出現箇所で
+    同じメモ化済みの評価関数を使うために使う。
+    """
+
+    cached = shared.get(node)
+    if cached is not None:
+        return cached
+
+    if isinstance(node, Term):
+        index, condition = node.binding
+        fused = compile_row_predicate([(index, condition)], wrap)
+        check, cost = _as_check(fused), condition_cost(condition)
+    elif isinstance(node, Not):
+        inner, cost = _compile(node.child, shared, wrap)
+        check = _negate(inner)
+    elif isinstance(node, And):
+        check, cost = _compile_and(node, shared, wrap)
+    else:
+        parts = sorted(
+            (_compile(child, shared, wrap) for child in node.children),
+            key=lambda p: p[1],
+        )
+        check, cost = _any([c for c, _ in parts]), sum(c for _, c in parts)
+
+    if node in shared:
+        shared[node] = (_memoize(check), cost)
+        return shared[node]  # type: ignore[return-value]
+    return check, cost
+
+
+def _compile_and(
+    node: And, shared: dict[Expr, _Compiled | None], wrap: CheckWrapper | None
+) -> _Compiled:
+    # 共有されない項はまとめて compile_row_predicate に渡し、同じ列の正規表現の統合や
+    # 型変換の共有を効かせる
+    plain = [
+        c.binding for c in node.children if isinstance(c, Term) and c not in shared
+    ]
+    parts = [
+        _compile(child, shared, wrap)
+        for child in node.children
+        if not (isinstance(child, Term) and child not in shared)
+    ]
+    if plain:
+        fused = compile_row_predicate(plain, wrap)
+        parts.append((_as_check(fused), sum(condition_cost(c) for _, c in plain)))
+    parts.sort(key=lambda p: p[1])
+    return _all([c for c, _ in parts]), sum(c for _, c in parts)
+
+
+def _as_check(predicate: RowPredicate) -> _RowCheck:
+    # 列数は compile_expression の入口で確認済みなので、None は返らない
+    return predicate  # type: ignore[return-value]
+
+
+def _negate(check: _RowCheck) -> _RowCheck:
+    return lambda row: not check(row)
+
+
+def _all(checks: Sequence[_RowCheck]) -> _RowCheck:
+    if len(checks) == 1:
+        return checks[0]
+
+    def check(row: list[str]) -> bool:
+        for c in checks:
+            if not c(row):
+                return False
+        return True
+
+    return check
+
+
+def _any(checks: Sequence[_RowCheck]) -> _RowCheck:
+    if len(checks) == 1:
+        return checks[0]
+
+    def check(row: list[str]) -> bool:
+        for c in checks:
+            if c(row):
+                return True
+        return False
+
+    return check
+
+
+def _memoize(check: _RowCheck) -> _RowCheck:
+    """同じ行に対する 2 回目以降の評価は前回の結果を返す。
+
+    直前に評価した行オブジェクトを保持しておき、同一（is）なら結果を使い回す。
+    """
+
+    last: list[object] = [None, False]
+
+    def memoized(row: list[str]) -> bool:
+        if last[0] is row:
+            return last[1]  # type: ignore[return-value]
+        result = bool(check(row))
+        last[0] = row
+        last[1] = result
+        return result
+
+    return memoized
+
+
+def _flatten(node: Expr) -> Expr:
+    """入れ子の and / or を平らにし、二重否定を取り除く。"""
+    if isinstance(node, Term):
+        return node
+    if isinstance(node, Not):
+        child = _flatten(node.child)
+        return child.child if isinstance(child, Not) else Not(child)
+    kind = type(node)
+    children: list[Expr] = []
+    for child in map(_flatten, node.children):
+        if type(child) is kind:
+            children.extend(child.children)  # type: ignore[union-attr]
+        else:
+            children.append(child)
+    return children[0] if len(children) == 1 else kind(tuple(children))
+
+
+def _count_subtrees(node: Expr, counts: Counter[Expr]) -> None:
+    counts[node] += 1
+    if isinstance(node, Not):
+        _count_subtrees(node.child, counts)
+    elif isinstance(node, (And, Or)):
+        for child in node.children:
+            _count_subtrees(child, counts)
+
+
+def _tokenize(text: str) -> list[str | tuple[str]]:
+    """トークン列にする。括弧は文字列 "(" / ")"、項は 1 要素のタプルで表す。"""
+
+    tokens: list[str | tuple[str]] = []
+    i = 0
+    while i < len(text):
+        ch = text[i]
+        if ch.isspace():
+            i += 1
+            continue
+        if ch in "()":
+            tokens.append(ch)
+            i += 1
+            continue
+
+        word: list[str] = []
+        quoted = False
+        while i < len(text) and not text[i].isspace() and text[i] not in "()":
+            if text[i] in "\"'":
+                quote = text[i]
+                end = text.find(quote, i + 1)
+                if end < 0:
+                    raise ValueError(f"引用符が閉じられていません: {text[i:]}")
+                word.append(text[i + 1 : end])
+                quoted = True
+                i = end + 1
+            else:
+                word.append(text[i])
+                i += 1
+        token = "".join(word)
+        if not quoted and token.lower() in _KEYWORDS:
+            tokens.append(token.lower())
+        else:
+            tokens.append((token,))
+    return tokens
+
+
+class _Parser(Generic[T]):
+    def __init__(
+        self, tokens: list[str | tuple[str]], parse_term: Callable[[str], T]
+    ) -> None:
+        self._tokens = tokens
+        self._pos = 0
+        self._parse_term = parse_term
+
+    def peek(self) -> str | tuple[str] | None:
+        return self._tokens[self._pos] if self._pos < len(self._tokens) else None
+
+    def _next(self) -> str | tuple[str]:
+        token = self.peek()
+        if token is None:
+            raise ValueError("式が途中で終わっています")
+        self._pos += 1
+        return token
+
+    def parse_or(self) -> Expr[T]:
+        children = [self._parse_and()]
+        while self.peek() == "or":
+            self._next()
+            children.append(self._parse_and())
+        return children[0] if len(children) == 1 else Or(tuple(children))
+
+    def _parse_and(self) -> Expr[T]:
+        children = [self._parse_not()]
+        while self.peek() == "and":
+            self._next()
+            children.append(self._parse_not())
+        return children[0] if len(children) == 1 else And(tuple(children))
+
+    def _parse_not(self) -> Expr[T]:
+        if self.peek() == "not":
+            self._next()
+            return Not(self._parse_not())
+        return self._parse_atom()
+
+    def _parse_atom(self) -> Expr[T]:
+        token = self._next()
+        if token == "(":
+            node = self.parse_or()
+            if self._next() != ")":
+                raise ValueError("括弧が閉じられていません")
+            return node
+        if isinstance(token, tuple):
+            return Term(self._parse_term(token[0]))
+        raise ValueError(f"式の解釈に失敗しました: {token}")
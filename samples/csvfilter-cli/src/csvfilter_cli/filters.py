@@ -1,8 +1,15 @@
 from __future__ import annotations
 
+import datetime as dt
+import decimal
 import re
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Sequence
 from dataclasses import dataclass
-from typing import Protocol
+from pathlib import Path
+from typing import Any, Protocol
+
+from .ahocorasick import AhoCorasick
 
 
 class Condition(Protocol):
@@ -24,6 +31,16 @@ class ContainsCondition:
         return self.needle in value
 
 
+@dataclass(frozen=True)
+class ContainsAnyCondition:
+    """いずれかのキーワードを含むか（Aho-Corasick で 1 回の走査で判定）。"""
+
+    automaton: AhoCorasick
+
+    def matches(self, value: str) -> bool:
+        return self.automaton.search(value)
+
+
 @dataclass(frozen=True)
 class RegexCondition:
     pattern: re.Pattern[str]
@@ -32,13 +49,153 @@ class RegexCondition:
         return bool(self.pattern.search(value))
 
 
+def _to_decimal(text: str) -> decimal.Decimal:
+    value = decimal.Decimal(text)
+    if value.is_nan():  # NaN は大小比較で例外になるため値として扱わない
+        raise ValueError(f"NaN は比較できません: {text}")
+    return value
+
+
+# 型付き比較で使う値の変換関数。変換できない値は ValueError / ArithmeticError を送出する
+VALUE_TYPES: dict[str, Callable[[str], Any]] = {
+    "int": int,
+    "float": float,
+    "decimal": _to_decimal,
+    "date": dt.date.fromisoformat,
+    "str": str,
+}
+
+_COMPARISONS: dict[str, Callable[[Any], Callable[[Any], bool]]] = {
+    "eq": lambda operand: lambda value: value == operand,
+    "ne": lambda operand: lambda value: value != operand,
+    "gt": lambda operand: lambda value: value > operand,
+    "ge": lambda operand: lambda value: value >= operand,
+    "lt": lambda operand: lambda value: value < operand,
+    "le": lambda operand: lambda value: value <= operand,
+}
+
+
+class _TypedCondition(ABC):
+    """フィールドを kind の型に変換してから比較する条件の共通実装。
+
+    変換できないフィールド（空文字や数値でない文字列など）は不一致とみなす。
+    """
+
+    kind: str
+
+    @abstractmethod
+    def test(self, parsed: Any) -> bool:
+        """変換済みの値が条件を満たすか。"""
+
+    def matches(self, value: str) -> bool:
+        try:
+            parsed = VALUE_TYPES[self.kind](value)
+        except (ValueError, ArithmeticError):
+            return False
+        return self.test(parsed)
+
+
+@dataclass(frozen=True)
+class CompareCondition(_TypedCondition):
+    kind: str
+    op: str  # eq / ne / gt / ge / lt / le
+    operand: Any
+
+    def test(self, parsed: Any) -> bool:
+        return _COMPARISONS[self.op](self.operand)(parsed)
+
+
+@dataclass(frozen=True)
+class BetweenCondition(_TypedCondition):
+    kind: str
+    low: Any
+    high: Any
+
+    def test(self, parsed: Any) -> bool:
+        return self.low <= parsed <= self.high
+
+
+@dataclass(frozen=True)
+class InCondition(_TypedCondition):
+    kind: str
+    values: frozenset[Any]
+
+    def test(self, parsed: Any) -> bool:
+        return parsed in self.values
+
+
 def build_condition(operator: str, operand: str) -> Condition:
-    op = operator.lower()
+    """演算子名とオペランド文字列から条件を組み立てる。
+
+    contains_any はキーワードを `a,b,c` または `@ファイル`（1 行 1 語）で受け取る。
+    比較演算子（eq / ne / gt / ge / lt / le / between / in）は `gt.int` のように
+    `.型名` で値の型（int / float / decimal / date / str）を指定できる。省略時は
+    オペランドから推定する（数値なら decimal、YYYY-MM-DD なら date、それ以外は str）。
+    """
+
+    op, _, kind = operator.lower().partition(".")
+    if kind and op in ("contains", "contains_any", "regex"):
+        raise ValueError(f"無効な演算子です: {operator}")
     if op == "contains":
         return ContainsCondition(operand)
+    if op == "contains_any":
+        return ContainsAnyCondition(AhoCorasick(_operand_list(operand)))
     if op == "regex":
         return RegexCondition(_compile_regex(operand))
-    raise ValueError(f"無効な演算子です: {operator}")
+    if op not in _COMPARISONS and op not in ("between", "in"):
+        raise ValueError(f"無効な演算子です: {operator}")
+    if kind and kind not in VALUE_TYPES:
+        raise ValueError(f"無効な型です: {kind}")
+
+    if op == "between":
+        parts = operand.split(",")
+        if len(parts) != 2:
+            raise ValueError("between は 'min,max' の形式で指定してください")
+        kind = kind or _infer_kind(parts[0])
+        return BetweenCondition(
+            kind, _parse_operand(kind, parts[0]), _parse_operand(kind, parts[1])
+        )
+    if op == "in":
+        texts = _operand_list(operand)
+        kind = kind or (_infer_kind(texts[0]) if texts else "str")
+        # 大きな集合でも 1 回のハッシュ探索で判定できるよう frozenset にする
+        return InCondition(kind, frozenset(_parse_operand(kind, t) for t in texts))
+
+    kind = kind or _infer_kind(operand)
+    return CompareCondition(kind, op, _parse_operand(kind, operand))
+
+
+def _infer_kind(text: str) -> str:
+    for kind in ("decimal", "date"):
+        try:
+            VALUE_TYPES[kind](text)
+        except (ValueError, ArithmeticError):
+            continue
+        return kind
+    return "str"
+
+
+def _parse_operand(kind: str, text: str) -> Any:
+    try:
+        return VALUE_TYPES[kind](text)
+    except (ValueError, ArithmeticError) as exc:
+        raise ValueError(f"値を {kind} として解釈できません: {text}") from exc
+
+
+def _operand_list(operand: str) -> list[str]:
+    """`a,b,c` または `@ファイル` 形式のオペランドを値の一覧にする。"""
+    if operand.startswith("@"):
+        return _load_list(operand[1:])
+    return operand.split(",")
+
+
+def _load_list(path: str) -> list[str]:
+    """1 行 1 値のファイルを読み込む（空行は無視）。"""
+    try:
+        with Path(path).open(encoding="utf-8") as f:
+            return [line.rstrip("\r\n") for line in f if line.rstrip("\r\n")]
+    except OSError as exc:
+        raise ValueError(f"値リストのファイルを読み込めません: {path} ({exc})") from exc
 
 
 def all_conditions_match(value: str, conditions: list[Condition]) -> bool:
@@ -46,3 +203,194 @@ def all_conditions_match(value: str, conditions: list[Condition]) -> bool:
         if not cond.matches(value):
             return False
     return True
+
+
+RowPredicate = Callable[[list[str]], bool | None]
+"""1 行を評価する関数。True: 一致 / False: 不一致 / None: カラム不足でスキップ。"""
+
+_ValueCheck = Callable[[str], object]
+
+CheckWrapper = Callable[[int, Condition, _ValueCheck], _ValueCheck]
+"""(列インデックス, 条件, 評価関数) を受け取り、包んだ評価関数を返す関数。"""
+
+# 評価コストの目安（小さいほど先に評価する）。未知の Condition は中間扱い。
+_CONDITION_COST: dict[type, int] = {
+    ContainsCondition: 1,
+    InCondition: 3,
+    CompareCondition: 3,
+    BetweenCondition: 3,
+    RegexCondition: 10,
+    ContainsAnyCondition: 15,  # 1 文字ずつ Python で遷移するため正規表現より重い
+}
+_DEFAULT_COST = 5
+
+
+def condition_cost(condition: Condition) -> int:
+    """条件の評価コストの目安を返す。"""
+    return _CONDITION_COST.get(type(condition), _DEFAULT_COST)
+
+
+def compile_row_predicate(
+    bindings: Sequence[tuple[int, Condition]], wrap: CheckWrapper | None = None
+) -> RowPredicate:
+    """(列インデックス, 条件) の AND 連鎖を 1 つの行述語にコンパイルする。
+
+    - 同じ列の正規表現は先読みの連結で 1 本の正規表現にまとめる。
+    - 安い条件（contains）から順に評価する。
+    - 行が短い場合だけ元の指定順で評価し、スキップ判定を従来と揃える。
+
+    wrap を指定した場合は条件ごとの評価関数を wrap で包む（計測用）。条件ごとに
+    計測できるよう、正規表現の統合や型変換の共有は行わない。
+    """
+
+    if wrap is None:
+        ordered = [(index, value_check(cond)) for index, cond in bindings]
+        fused = sorted(_fuse_checks(bindings), key=lambda item: item[0])
+    else:
+        ordered = [
+            (index, wrap(index, cond, value_check(cond))) for index, cond in bindings
+        ]
+        fused = sorted(
+            (
+                (condition_cost(cond), index, check)
+                for (index, check), (_, cond) in zip(ordered, bindings)
+            ),
+            key=lambda item: item[0],
+        )
+    width = max((index for index, _ in bindings), default=-1) + 1
+    checks = [(index, check) for _, index, check in fused]
+
+    def ordered_match(row: list[str]) -> bool | None:
+        for index, check in ordered:
+            if index >= len(row):
+                return None
+            if not check(row[index]):
+                return False
+        return True
+
+    if len(checks) == 1:
+        ((index0, check0),) = checks
+
+        def predicate(row: list[str]) -> bool | None:
+            if len(row) < width:
+                return ordered_match(row)
+            return bool(check0(row[index0]))
+
+    elif len(checks) == 2:
+        (index0, check0), (index1, check1) = checks
+
+        def predicate(row: list[str]) -> bool | None:
+            if len(row) < width:
+                return ordered_match(row)
+            return bool(check0(row[index0])) and bool(check1(row[index1]))
+
+    else:
+
+        def predicate(row: list[str]) -> bool | None:
+            if len(row) < width:
+                return ordered_match(row)
+            for index, check in checks:
+                if not check(row[index]):
+                    return False
+            return True
+
+    return predicate
+
+
+def value_check(condition: Condition) -> _ValueCheck:
+    """Protocol 経由の呼び出しを避け、値を直接評価する関数を返す。
+
+    列ごとに評価する経路（キャッシュ・NumPy）も、行述語と同じ判定をこの関数で行う。
+    """
+    if type(condition) is ContainsCondition:
+        needle = condition.needle
+        return lambda value: needle in value
+    if type(condition) is RegexCondition:
+        return condition.pattern.search
+    if type(condition) is ContainsAnyCondition:
+        return condition.automaton.search
+    if isinstance(condition, _TypedCondition):
+        return _typed_check(condition.kind, [_parsed_test(condition)])
+    return condition.matches
+
+
+def _parsed_test(condition: _TypedCondition) -> Callable[[Any], bool]:
+    """変換済みの値を判定する関数を返す。"""
+    if type(condition) is CompareCondition:
+        return _COMPARISONS[condition.op](condition.operand)
+    if type(condition) is InCondition:
+        return condition.values.__contains__
+    return condition.test
+
+
+def _typed_check(kind: str, tests: list[Callable[[Any], bool]]) -> _ValueCheck:
+    """フィールドを 1 回だけ kind に変換し、同じ列・同じ型の条件をまとめて判定する。"""
+
+    convert = VALUE_TYPES[kind]
+
+    def check(value: str) -> bool:
+        try:
+            parsed = convert(value)
+        except (ValueError, ArithmeticError):
+            return False
+        for test in tests:
+            if not test(parsed):
+                return False
+        return True
+
+    return check
+
+
+def _fuse_checks(
+    bindings: Sequence[tuple[int, Condition]],
+) -> list[tuple[int, int, _ValueCheck]]:
+    """(コスト, 列インデックス, 評価関数) の一覧を作る。
+
+    同じ列の正規表現は 1 本に統合し、同じ列・同じ型の型付き比較は
+    フィールドの変換を 1 回で済ませるようにまとめる。
+    """
+
+    fused: list[tuple[int, int, _ValueCheck]] = []
+    regexes: dict[int, list[re.Pattern[str]]] = {}
+    typed: dict[tuple[int, str], list[_TypedCondition]] = {}
+    for index, condition in bindings:
+        if type(condition) is RegexCondition and _is_mergeable(condition.pattern):
+            regexes.setdefault(index, []).append(condition.pattern)
+            continue
+        if isinstance(condition, _TypedCondition):
+            typed.setdefault((index, condition.kind), []).append(condition)
+            continue
+        fused.append((condition_cost(condition), index, value_check(condition)))
+
+    for (index, kind), conditions in typed.items():
+        # 集合の探索は比較より安いので先に判定する
+        conditions.sort(key=lambda c: type(c) is not InCondition)
+        check = _typed_check(kind, [_parsed_test(c) for c in conditions])
+        fused.append((max(map(condition_cost, conditions)), index, check))
+
+    regex_cost = _CONDITION_COST[RegexCondition]
+    for index, patterns in regexes.items():
+        for check in _merge_regexes(patterns):
+            fused.append((regex_cost, index, check))
+    return fused
+
+
+def _is_mergeable(pattern: re.Pattern[str]) -> bool:
+    # グローバルフラグやグループ（後方参照）を持つパターンは連結すると意味が変わる
+    return pattern.flags == re.UNICODE and pattern.groups == 0
+
+
+def _merge_regexes(patterns: list[re.Pattern[str]]) -> list[_ValueCheck]:
+    """複数の正規表現の AND を、先読みを並べた 1 本の正規表現にする。
+
+    `(?=[\\s\\S]*?(?:p))` は「どこかの位置から p が一致する」ことを表し、
+    `p.search(value)` と同じ意味になる。選択 (`|`) は使わない。
+    """
+
+    if len(patterns) == 1:
+        return [patterns[0].search]
+    combined = "".join(rf"(?=[\s\S]*?(?:{p.pattern}))" for p in patterns)
+    try:
+        return [re.compile(combined).match]
+    except re.error:
+        return [p.search for p in patterns]
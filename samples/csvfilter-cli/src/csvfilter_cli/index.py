@@ -0,0 +1,403 @@
+"""列の値からレコードのバイトオフセットを引くサイドカー索引。
+
+`index build` で CSV の隣に `<ファイル名>.cfidx` を作成する。索引には列ごとに
+値 → そのレコードの先頭オフセット一覧（任意で n-gram → オフセット一覧）と、
+全レコードの先頭オフセット一覧を持つ。
+フィルター時に索引が新しければ、候補レコードだけを seek して読み、残りは走査しない。
+
+レコード境界はクオート文字の出現回数の偶奇で判定するため、`--jobs` と同じく
+RFC 4180 形式（クオート文字は囲みとエスケープにだけ現れる）を前提とする。
+
+ファイル形式:
+    マジック行 / メタデータ JSON の長さ（8 バイト LE）/ メタデータ JSON /
+    int64 の配列（全レコードの先頭オフセット、各表の starts と postings）
+"""
+
+from __future__ import annotations
+
+import bisect
+import csv
+import hashlib
+import json
+import mmap
+import sys
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+from pathlib import Path
+from typing import BinaryIO
+
+from .compressed import detect_codec
+from .filters import CompareCondition, Condition, ContainsCondition, InCondition
+
+INDEX_SUFFIX = ".cfidx"
+HASH_BLOCK_SIZE = 1 << 20
+_MAGIC = b"CSVFILTER-INDEX 2\n"
+
+
+class IndexFileError(Exception):
+    """索引の作成や読み込みに関する例外"""
+
+
+def sidecar_path(path: Path) -> Path:
+    """path に対応する索引ファイルのパス。"""
+    return path.with_name(path.name + INDEX_SUFFIX)
+
+
+def build_index(
+    path: Path,
+    columns: list[str | int],
+    *,
+    delimiter: str,
+    quotechar: str,
+    no_header: bool,
+    ngram: int = 0,
+) -> Path:
+    """path の columns の索引を作成し、索引ファイルのパスを返す。
+
+    columns はヘッダーありならカラム名、なしなら 0 始まりの列インデックス。
+    ngram が 1 以上なら contains 用に長さ ngram の部分文字列の索引も作る。
+    既存の索引は上書きする。
+    """
+
+    quote = quotechar.encode("utf-8")
+    if len(quote) != 1:
+        raise IndexFileError("索引ではクオート文字に 1 バイト文字を指定してください")
+    try:
+        if detect_codec(path) is not None:
+            raise IndexFileError("圧縮されたファイルには索引を作成できません")
+        stat = path.stat()
+        f = path.open("rb")
+    except OSError as exc:
+        raise IndexFileError(f"入力ファイルを開けません: {path} ({exc})") from exc
+
+    hasher = hashlib.blake2b()
+    current = [0]  # csv.reader が今読んでいるレコードの先頭オフセット
+
+    def texts() -> Iterator[str]:
+        for offset, record in _iter_records(f, quote):
+            hasher.update(record)
+            current[0] = offset
+            yield record.decode("utf-8")
+
+    with f:
+        reader = csv.reader(texts(), delimiter=delimiter, quotechar=quotechar)
+        fieldnames: list[str] | None = None
+        try:
+            if not no_header:
+                fieldnames = next(reader, None)
+                if fieldnames is None:
+                    raise IndexFileError("ヘッダー行が存在しません")
+            targets = _resolve(columns, fieldnames)
+
+            values: dict[int, dict[str, list[int]]] = {c: {} for c in targets}
+            grams: dict[int, dict[str, list[int]]] = {c: {} for c in targets}
+            by_length: dict[str, list[int]] = {}
+            record_offsets = array("q")
+            for row in reader:
+                if fieldnames is not None and not row:
+                    continue  # filter_csv と同じく、ヘッダーありでは空行を数えない
+                offset = current[0]
+                record_offsets.append(offset)
+                by_length.setdefault(str(len(row)), []).append(offset)
+                for c in targets:
+                    if c >= len(row):
+                        continue
+                    value = row[c]
+                    values[c].setdefault(value, []).append(offset)
+                    if ngram:
+                        for gram in _grams(value, ngram):
+                            grams[c].setdefault(gram, []).append(offset)
+        except csv.Error as exc:
+            raise IndexFileError(f"CSV の解析に失敗しました: {exc}") from exc
+        except UnicodeDecodeError as exc:
+            raise IndexFileError(f"UTF-8 として読めません: {exc}") from exc
+
+    # 打ち切った位置までのレコード数を引くため、全レコードの先頭オフセットを先頭に置く
+    blobs: list[bytes] = [record_offsets.tobytes()]
+    position = len(record_offsets) * record_offsets.itemsize
+
+    def add_table(mapping: dict[str, list[int]]) -> dict[str, object]:
+        nonlocal position
+        keys = sorted(mapping)
+        starts = array("q", [0])
+        postings = array("q")
+        for key in keys:
+            postings.extend(mapping[key])
+            starts.append(len(postings))
+        table = {
+            "keys": keys,
+            "starts": position,
+            "postings": position + len(starts) * starts.itemsize,
+        }
+        blobs.extend([starts.tobytes(), postings.tobytes()])
+        position += (len(starts) + len(postings)) * starts.itemsize
+        return table
+
+    tables: dict[str, dict[str, dict[str, object]]] = {}
+    for c in targets:
+        tables[str(c)] = {"value": add_table(values[c])}
+        if ngram:
+            tables[str(c)]["gram"] = add_table(grams[c])
+
+    # 列数が最大でない行は、短い行のスキップ判定のためにオフセットを残す
+    max_length = max(map(int, by_length), default=0)
+    lengths = {n: len(offsets) for n, offsets in by_length.items()}
+    short = add_table({n: o for n, o in by_length.items() if int(n) < max_length})
+
+    meta = {
+        "source": {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "blake2b": hasher.hexdigest(),
+        },
+        "dialect": {
+            "delimiter": delimiter,
+            "quotechar": quotechar,
+            "no_header": no_header,
+        },
+        "byteorder": sys.byteorder,
+        "fieldnames": fieldnames,
+        "records": len(record_offsets),
+        "lengths": lengths,
+        "short": short,
+        "ngram": ngram,
+        "columns": tables,
+    }
+    encoded = json.dumps(meta, ensure_ascii=False).encode("utf-8")
+
+    target = sidecar_path(path)
+    tmp = target.with_name(target.name + ".tmp")
+    try:
+        with tmp.open("wb") as out:
+            out.write(_MAGIC)
+            out.write(len(encoded).to_bytes(8, "little"))
+            out.write(encoded)
+            for blob in blobs:
+                out.write(blob)
+        tmp.replace(target)  # 読み手が書きかけの索引を見ないよう、置き換えで公開する
+    except OSError as exc:
+        tmp.unlink(missing_ok=True)
+        raise IndexFileError(f"索引を書き込めません: {target} ({exc})") from exc
+    return target
+
+
+class ColumnIndex:
+    """読み込んだ索引。with 文で使い、終わったら mmap を閉じる。"""
+
+    def __init__(self, mm: mmap.mmap, meta: dict, base: int) -> None:
+        self._mm = mm
+        self._base = base
+        self.fieldnames: list[str] | None = meta["fieldnames"]
+        self.records: int = meta["records"]
+        self._offsets: memoryview | None = None
+        self._lengths = {int(n): count for n, count in meta["lengths"].items()}
+        self._short: dict = meta["short"]
+        self._ngram: int = meta["ngram"]
+        self._columns: dict[int, dict[str, dict]] = {
+            int(c): tables for c, tables in meta["columns"].items()
+        }
+
+    def __enter__(self) -> ColumnIndex:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._offsets is not None:
+            self._offsets.release()  # mmap を閉じる前に参照を外す
+        self._mm.close()
+
+    def records_through(self, offset: int) -> int:
+        """先頭オフセットが offset 以下のレコード数（そのレコードまでに数える行数）。"""
+        if self._offsets is None:
+            start = self._base
+            with memoryview(self._mm) as view:
+                self._offsets = view[start : start + self.records * 8].cast("q")
+        return bisect.bisect_right(self._offsets, offset)
+
+    def candidates(self, indexed: Sequence[tuple[int, Condition]]) -> list[int] | None:
+        """AND 条件の評価に読む必要があるレコードのオフセットを昇順で返す。
+
+        条件を満たしうるレコードに加え、参照する列より短いレコード（スキップか不一致かは
+        条件の評価順で決まる）も含む。索引で絞り込める条件が 1 つも無い場合や、
+        全レコードが短い場合は None（全件走査が必要）。
+        戻り値には条件を満たさないレコードも含まれるので、呼び出し側で評価し直すこと。
+        """
+
+        width = max((index for index, _ in indexed), default=-1) + 1
+        if width > max(self._lengths, default=0):
+            return None
+
+        found: set[int] | None = None
+        for index, condition in indexed:
+            tables = self._columns.get(index)
+            if tables is None:
+                continue
+            offsets = self._lookup(tables, condition)
+            if offsets is None:
+                continue
+            found = offsets if found is None else found & offsets
+        if found is None:
+            return None
+        for n in self._lengths:
+            if n < width:
+                found |= self._postings(self._short, str(n))
+        return sorted(found)
+
+    def _lookup(self, tables: dict[str, dict], condition: Condition) -> set[int] | None:
+        if isinstance(condition, CompareCondition):
+            if condition.op == "eq" and condition.kind == "str":
+                return self._postings(tables["value"], condition.operand)
+        elif isinstance(condition, InCondition):
+            if condition.kind == "str":
+                result: set[int] = set()
+                for value in condition.values:
+                    result |= self._postings(tables["value"], value)
+                return result
+        elif isinstance(condition, ContainsCondition):
+            if "gram" in tables and len(condition.needle) >= self._ngram:
+                result = set()
+                for i, gram in enumerate(_grams(condition.needle, self._ngram)):
+                    postings = self._postings(tables["gram"], gram)
+                    result = postings if i == 0 else result & postings
+                    if not result:
+                        break
+                return result
+        return None
+
+    def _postings(self, table: dict, key: str) -> set[int]:
+        keys: list[str] = table["keys"]
+        i = bisect.bisect_left(keys, key)
+        if i == len(keys) or keys[i] != key:
+            return set()
+        starts = self._array(table["starts"], i, i + 2)
+        begin, end = starts[0], starts[1]
+        return set(self._array(table["postings"], begin, end))
+
+    def _array(self, at: int, begin: int, end: int) -> array[int]:
+        """at から始まる int64 配列の [begin, end) を読み出す。"""
+        values = array("q")
+        start = self._base + at
+        size = values.itemsize
+        values.frombytes(self._mm[start + begin * size : start + end * size])
+        return values
+
+
+def load_index(
+    path: Path, *, delimiter: str, quotechar: str, no_header: bool
+) -> ColumnIndex | None:
+    """path の索引を開く。索引が無い・古い・区切り文字などが違う場合は None。
+
+    ファイルサイズと更新時刻が作成時と同じなら新しいとみなす。更新時刻だけが
+    違う場合（コピーや touch）は内容のハッシュを計算して比べる。
+    """
+
+    target = sidecar_path(path)
+    try:
+        with target.open("rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    try:
+        meta, base = _read_meta(mm)
+        if not is_fresh(path, meta["source"]) or meta["dialect"] != {
+            "delimiter": delimiter,
+            "quotechar": quotechar,
+            "no_header": no_header,
+        }:
+            mm.close()
+            return None
+    except (IndexFileError, KeyError, OSError):
+        mm.close()
+        return None
+    return ColumnIndex(mm, meta, base)
+
+
+def read_records(path: Path, offsets: Iterable[int], quotechar: str) -> Iterator[str]:
+    """offsets の各位置から 1 レコードずつ読み、テキストとして返す。"""
+    quote = quotechar.encode("utf-8")
+    with path.open("rb") as f:
+        for offset in offsets:
+            f.seek(offset)
+            yield _read_record(f, quote).decode("utf-8")
+
+
+def _read_meta(mm: mmap.mmap) -> tuple[dict, int]:
+    if mm[: len(_MAGIC)] != _MAGIC:
+        raise IndexFileError("索引ファイルの形式が不正です")
+    start = len(_MAGIC) + 8
+    length = int.from_bytes(mm[len(_MAGIC) : start], "little")
+    try:
+        meta = json.loads(mm[start : start + length].decode("utf-8"))
+    except ValueError as exc:
+        raise IndexFileError(f"索引ファイルの形式が不正です: {exc}") from exc
+    if meta.get("byteorder") != sys.byteorder:
+        raise IndexFileError("索引ファイルのバイト順が異なります")
+    return meta, start + length
+
+
+def is_fresh(path: Path, source: dict) -> bool:
+    """path が source（サイズ・更新時刻・ハッシュ）を記録した時点から変わっていないか。
+
+    サイズが同じで更新時刻だけが違う場合は、内容のハッシュで確かめる。
+    """
+    stat = path.stat()
+    if stat.st_size != source["size"]:
+        return False
+    if stat.st_mtime_ns == source["mtime_ns"]:
+        return True
+    return content_hash(path) == source["blake2b"]
+
+
+def content_hash(path: Path) -> str:
+    """path の内容の blake2b ハッシュ（16 進文字列）。"""
+    hasher = hashlib.blake2b()
+    with path.open("rb") as f:
+        while block := f.read(HASH_BLOCK_SIZE):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+def _resolve(columns: list[str | int], fieldnames: list[str] | None) -> list[int]:
+    if fieldnames is None:
+        if not all(isinstance(c, int) for c in columns):
+            raise IndexFileError("ヘッダーなしの場合、列番号で指定してください")
+        return sorted(set(columns))  # type: ignore[arg-type]
+    positions = {name: index for index, name in enumerate(fieldnames)}
+    missing = sorted(str(c) for c in columns if c not in positions)
+    if missing:
+        raise IndexFileError(f"カラムが存在しません: {', '.join(missing)}")
+    return sorted({positions[c] for c in columns})  # type: ignore[index]
+
+
+def _grams(value: str, n: int) -> set[str]:
+    return {value[i : i + n] for i in range(len(value) - n + 1)}
+
+
+def _iter_records(f: BinaryIO, quote: bytes) -> Iterator[tuple[int, bytes]]:
+    """(先頭オフセット, レコードのバイト列) を順に返す。"""
+    offset = f.tell()
+    while True:
+        record = _read_record(f, quote)
+        if not record:
+            return
+        yield offset, record
+        offset += len(record)
+
+
+def _read_record(f: BinaryIO, quote: bytes) -> bytes:
+    """クオート外の改行までを 1 レコードとして読む。"""
+    line = f.readline()
+    if not line.count(quote) & 1:
+        return line
+    parts = [line]
+    in_quote = True
+    while in_quote:
+        line = f.readline()
+        if not line:
+            break
+        parts.append(line)
+        in_quote ^= bool(line.count(quote) & 1)
+    return b"".join(parts)
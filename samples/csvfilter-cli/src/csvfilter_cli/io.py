@@ -1,12 +1,62 @@
 from __future__ import annotations
 
+import collections
+import contextlib
 import csv
+import io
+import itertools
+import mmap
+import operator
+import os
+import re
 import sys
-from dataclasses import dataclass
+import time
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import TextIO
+from typing import TYPE_CHECKING, AnyStr, BinaryIO, TextIO
 
-from .filters import Condition
+from .compressed import (
+    MAGIC_SIZE,
+    CompressionError,
+    codec_for_magic,
+    codec_for_suffix,
+    open_compressed_output,
+    open_decompressed,
+)
+from .expr import (
+    And,
+    Expr,
+    Term,
+    compile_expression,
+    compile_expressions,
+    map_terms,
+    terms,
+)
+from .cache import (
+    DEFAULT_CACHE_SIZE,
+    CacheEntry,
+    CacheError,
+    build_entry,
+    evict,
+    open_entry,
+)
+from .filters import (
+    CheckWrapper,
+    Condition,
+    ContainsCondition,
+    RowPredicate,
+    compile_row_predicate,
+)
+from .index import load_index, read_records
+from .profiling import FilterProfile, MeteredReader, ProgressReporter
+from . import vectorized
+
+if TYPE_CHECKING:
+    from _csv import _writer as CsvWriter
+
+MMAP_CHUNK_SIZE = 4 << 20
+STREAM_BUFFER_SIZE = 1 << 20
 
 
 @dataclass(frozen=True)
@@ -20,6 +70,17 @@ class FilterStats:
     processed: int = 0
     matched: int = 0
     skipped: int = 0
+    # 所要時間（秒）。件数の比較には含めない
+    elapsed_seconds: float = field(default=0.0, compare=False)
+    decompress_seconds: float = field(default=0.0, compare=False)
+    input_wait_seconds: float = field(default=0.0, compare=False)
+    # 読み込んだ入力のバイト数（展開後）。計測・進捗表示をする場合だけ数える
+    bytes_read: int = field(default=0, compare=False)
+
+    @property
+    def filter_seconds(self) -> float:
+        """展開待ちを除いた、読み込み・フィルター・書き出しに費やした秒数。"""
+        return self.elapsed_seconds - self.input_wait_seconds
 
 
 class CsvFilterError(Exception):
@@ -28,128 +89,1093 @@ class CsvFilterError(Exception):
 
 def filter_csv(
     *,
-    input_path: Path,
+    input_path: Path | None,
     output_path: Path | None,
     filters: list[FilterBinding],
     delimiter: str,
     quotechar: str,
     no_header: bool,
+    fast_path: bool = False,
+    where: Expr[FilterBinding] | None = None,
+    select: list[str | int] | None = None,
+    cache_dir: Path | None = None,
+    cache_size: int = DEFAULT_CACHE_SIZE,
+    vectorize: bool = False,
+    limit: int | None = None,
+    count_only: bool = False,
+    profile: FilterProfile | None = None,
+    progress_interval: float | None = None,
 ) -> FilterStats:
+    """CSV をフィルターし、一致した行を出力する。
+
+    input_path / output_path が None の場合は標準入力 / 標準出力を使う。
+    どちらもストリームとして逐次処理するため、入力サイズによらずメモリ使用量は一定。
+    gzip / bz2 / xz / zstd で圧縮された入力は自動で展開し、出力も拡張子に応じて圧縮する。
+    where を指定した場合は filters（AND 条件）と where の論理式の両方を満たす行を出力する。
+    select を指定した場合は、その列（ヘッダーありならカラム名、なしなら 0 始まりの
+    列インデックス）だけをその順序で出力する。
+    fast_path=True の場合、クオート文字を含まない入力なら mmap 上のバイト列を
+    直接走査する高速経路を使う（条件が contains のみのときに限る）。
+    入力ファイルに新しい索引（`index build` で作成）があり、条件のいずれかを索引で
+    絞り込める場合は、候補レコードだけを読む（where 指定時は使わない）。
+    cache_dir を指定した場合は入力を列指向のキャッシュに変換し、2 回目以降は
+    キャッシュ上で列ごとに評価する（where 指定時は使わない）。キャッシュ全体が
+    cache_size バイトを超えたら古いものから削除する。
+    vectorize=True の場合、NumPy があり decimal 型の条件を含むなら、行をチャンクに
+    まとめて条件ごとに評価する（where 指定時は使わない）。それ以外は通常の行単位の評価。
+    limit を指定した場合は、一致した行を limit 行出力した時点で読み込みをやめる。
+    count_only=True の場合は何も書き出さずに件数だけを数える（output_path は使わない）。
+    profile を渡した場合は段階ごと・条件ごとの時間を profile に記録する。計測する経路を
+    揃えるため、索引・キャッシュ・fast_path・vectorize は使わない。
+    progress_interval を指定した場合は、その秒数ごとに進捗を stderr に出力する。
+    """
+
     stats = FilterStats()
+    start = time.perf_counter()
+    if profile is not None:
+        fast_path = vectorize = False
+        cache_dir = None
 
-    infile = _open_input(input_path)
-    outfile, should_close_output = _open_output(output_path)
+    metered = profile is not None or progress_interval is not None
+    infile, should_close_input = _open_input(input_path, stats, metered, profile)
+    outfile: TextIO | None = None
+    should_close_output = False
+    if not count_only:
+        try:
+            outfile, should_close_output = _open_output(output_path)
+        except CsvFilterError:
+            if should_close_input:
+                infile.close()
+            raise
 
+    progress = (
+        contextlib.nullcontext()
+        if progress_interval is None
+        else ProgressReporter(stats, progress_interval)
+    )
     try:
-        if no_header:
-            _filter_no_header(infile, outfile, filters, delimiter, quotechar, stats)
-        else:
-            _filter_with_header(infile, outfile, filters, delimiter, quotechar, stats)
+        with progress:
+            if (
+                profile is None
+                and input_path is not None
+                and where is None
+                and _filter_indexed(
+                    input_path,
+                    outfile,
+                    filters,
+                    select,
+                    delimiter,
+                    quotechar,
+                    no_header,
+                    stats,
+                    limit,
+                )
+            ):
+                pass
+            elif (
+                cache_dir is not None
+                and input_path is not None
+                and where is None
+                and filters
+                and _filter_cached(
+                    cache_dir,
+                    cache_size,
+                    input_path,
+                    outfile,
+                    filters,
+                    select,
+                    delimiter,
+                    quotechar,
+                    no_header,
+                    stats,
+                    limit,
+                )
+            ):
+                pass
+            elif (
+                fast_path
+                and where is None
+                and _filter_unquoted(
+                    infile,
+                    outfile,
+                    filters,
+                    select,
+                    delimiter,
+                    quotechar,
+                    no_header,
+                    stats,
+                    limit,
+                )
+            ):
+                pass
+            else:
+                _filter_stream(
+                    infile,
+                    outfile,
+                    filters,
+                    where,
+                    select,
+                    delimiter,
+                    quotechar,
+                    no_header,
+                    stats,
+                    vectorize,
+                    limit,
+                    profile,
+                )
+    except CompressionError as exc:
+        raise CsvFilterError(str(exc)) from exc
     finally:
-        infile.close()
+        if should_close_input:
+            infile.close()
         if should_close_output:
-            outfile.close()
+            outfile.close()  # type: ignore[union-attr]
+        elif outfile is not None:
+            outfile.flush()
 
+    stats.elapsed_seconds = time.perf_counter() - start
     return stats
 
 
-def _open_input(path: Path) -> TextIO:
+def filter_rows(
+    source: os.PathLike[str] | Iterable[str] | Iterable[bytes],
+    *,
+    filters: Sequence[FilterBinding] = (),
+    where: Expr[FilterBinding] | None = None,
+    select: list[str | int] | None = None,
+    delimiter: str = ",",
+    quotechar: str = '"',
+    no_header: bool = False,
+    vectorize: bool = False,
+    limit: int | None = None,
+    profile: FilterProfile | None = None,
+) -> FilteredRows:
+    """CSV をフィルターし、一致した行を読み進めながら返すイテレーターを返す。
+
+    source は次のいずれか。
+    - ファイルのパス（圧縮されていれば filter_csv と同じく展開する）
+    - 行ごとの文字列の iterable（newline="" で開いたテキストファイルや、行末を含む
+      文字列のリストなど）。そのまま csv.reader に渡す
+    - バイト列の iterable（UTF-8。区切りは行や文字の境界と揃っていなくてよい）。
+      先頭のマジックバイトが gzip などなら展開する
+
+    ヘッダー行はこの関数の中で読むため、未知のカラムなどの指定の誤りはここで
+    CsvFilterError になる。一致した行は CSV に書き戻さずに返し、select があれば
+    その列だけ、ヘッダーありでは列数をヘッダーに揃える（リストまたはタプル）。
+    条件・select・limit などの意味は filter_csv と同じ。
+    """
+
+    if isinstance(source, (str, bytes)):
+        raise TypeError(
+            "source にはパスか、行またはバイト列の iterable を渡してください"
+        )
+
+    stats = FilterStats()
+    start = time.perf_counter()
+    lines, close = _open_source(source, stats, profile)
     try:
-        return path.open("r", encoding="utf-8", newline="")
-    except FileNotFoundError as exc:
-        raise CsvFilterError(f"入力ファイルが見つかりません: {path}") from exc
-    except OSError as exc:
-        raise CsvFilterError(f"入力ファイルを開けません: {path} ({exc})") from exc
+        reader = csv.reader(lines, delimiter=delimiter, quotechar=quotechar)
+        header, matches = _match_rows(
+            reader,
+            list(filters),
+            where,
+            select,
+            no_header,
+            stats,
+            vectorize,
+            limit,
+            profile,
+        )
+    except CompressionError as exc:
+        if close is not None:
+            close()
+        raise CsvFilterError(str(exc)) from exc
+    except BaseException:
+        if close is not None:
+            close()
+        raise
+    return FilteredRows(matches, header, stats, close, start)
+
+
+class FilteredRows(Iterator[Sequence[str]]):
+    """filter_rows() が返す、一致した行の遅延イテレーター。
+
+    fieldnames は出力する列のヘッダー（ヘッダーなしでは None）。stats は行を読み進める
+    たびに更新され、elapsed_seconds は最後まで読むか close() した時点で確定する。
+    途中でやめる場合は close() するか with 文で使い、filter_rows() が開いた入力
+    （パスで渡したファイルなど）を閉じる。渡された iterable 自体は閉じない。
+    """
+
+    def __init__(
+        self,
+        matches: Iterator[Sequence[str]],
+        fieldnames: list[str] | None,
+        stats: FilterStats,
+        close: Callable[[], None] | None,
+        start: float,
+    ) -> None:
+        self.fieldnames = fieldnames
+        self.stats = stats
+        self._matches = matches
+        self._close = close
+        self._start = start
+        self._closed = False
+
+    def __iter__(self) -> FilteredRows:
+        return self
+
+    def __next__(self) -> Sequence[str]:
+        try:
+            return next(self._matches)
+        except StopIteration:
+            self.close()
+            raise
+        except CompressionError as exc:
+            self.close()
+            raise CsvFilterError(str(exc)) from exc
+
+    def __enter__(self) -> FilteredRows:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._matches = iter(())
+        self.stats.elapsed_seconds = time.perf_counter() - self._start
+        if self._close is not None:
+            self._close()
+
+
+def _open_source(
+    source: os.PathLike[str] | Iterable[str] | Iterable[bytes],
+    stats: FilterStats,
+    profile: FilterProfile | None,
+) -> tuple[Iterable[str], Callable[[], None] | None]:
+    """filter_rows() の source を行の iterable にし、閉じる関数（不要なら None）と返す。"""
+
+    if isinstance(source, os.PathLike):
+        infile, _ = _open_input(Path(source), stats, profile is not None, profile)
+        return infile, infile.close
+    if isinstance(source, io.TextIOBase):
+        return source, None
+
+    chunks = iter(source)
+    first = next(chunks, None)
+    if first is None or isinstance(first, str):
+        return itertools.chain(() if first is None else [first], chunks), None  # type: ignore[arg-type]
+    if not isinstance(first, (bytes, bytearray, memoryview)):
+        raise TypeError(f"source の要素は str か bytes にしてください: {type(first)!r}")
+
+    raw = io.BufferedReader(
+        _ChunkReader(itertools.chain([first], chunks)),  # type: ignore[list-item]
+        STREAM_BUFFER_SIZE,
+    )
+    codec = codec_for_magic(raw.peek(MAGIC_SIZE)[:MAGIC_SIZE])
+    text = _decode(raw, codec, stats, profile is not None, profile)  # type: ignore[arg-type]
+    return text, text.close
+
+
+def _open_input(
+    path: Path | None,
+    stats: FilterStats | None = None,
+    metered: bool = False,
+    profile: FilterProfile | None = None,
+) -> tuple[TextIO, bool]:
+    """入力をバイナリとして開き、必要なら展開して UTF-8 のテキストストリームにする。
+
+    デコードは TextIOWrapper が逐次行い、下位のバッファは STREAM_BUFFER_SIZE で
+    固定するため、パイプの途中でもメモリ使用量は一定。標準入力のうちファイル記述子を
+    持たないもの（テスト時の差し替えなど）はそのまま使う。
+    metered=True なら読み込んだバイト数を stats に（profile があれば時間も）記録する。
+    """
+
+    raw: BinaryIO
+    if path is None:
+        try:
+            fd = sys.stdin.fileno()
+        except (AttributeError, OSError, ValueError):
+            return sys.stdin, False
+        raw = open(fd, "rb", buffering=STREAM_BUFFER_SIZE, closefd=False)
+        codec = codec_for_magic(raw.peek(MAGIC_SIZE)[:MAGIC_SIZE])  # type: ignore[attr-defined]
+    else:
+        try:
+            raw = path.open("rb", buffering=STREAM_BUFFER_SIZE)
+        except FileNotFoundError as exc:
+            raise CsvFilterError(f"入力ファイルが見つかりません: {path}") from exc
+        except OSError as exc:
+            raise CsvFilterError(f"入力ファイルを開けません: {path} ({exc})") from exc
+        codec = codec_for_suffix(path) or codec_for_magic(
+            raw.peek(MAGIC_SIZE)[:MAGIC_SIZE]  # type: ignore[attr-defined]
+        )
+
+    return _decode(raw, codec, stats, metered, profile), True
+
+
+def _decode(
+    raw: BinaryIO,
+    codec: str | None,
+    stats: FilterStats | None,
+    metered: bool = False,
+    profile: FilterProfile | None = None,
+) -> TextIO:
+    """バイナリの入力を（codec があれば展開して）UTF-8 のテキストストリームにする。"""
+
+    if codec is not None:
+        try:
+            raw = open_decompressed(raw, codec, _decompression_recorder(stats))
+        except CompressionError as exc:
+            raw.close()
+            raise CsvFilterError(str(exc)) from exc
+    if metered and stats is not None:
+        raw = MeteredReader(raw, stats, profile)  # type: ignore[assignment]
+    return io.TextIOWrapper(raw, encoding="utf-8", newline="")  # type: ignore[return-value]
+
+
+class _ChunkReader(io.RawIOBase):
+    """バイト列の iterable を、読み込み用のストリームとして読めるようにする。
+
+    チャンクの区切りは行や文字の境界と揃っていなくてよい。元の iterable は
+    呼び出し側のものなので閉じない。
+    """
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        super().__init__()
+        self._chunks = iter(chunks)
+        self._pending = memoryview(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: bytearray | memoryview) -> int:  # type: ignore[override]
+        while not self._pending:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._pending = memoryview(chunk).cast("B")
+        n = min(len(buffer), len(self._pending))
+        buffer[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        return n
+
+
+def _decompression_recorder(
+    stats: FilterStats | None,
+) -> Callable[[float, float], None] | None:
+    if stats is None:
+        return None
+
+    def record(busy: float, wait: float) -> None:
+        stats.decompress_seconds += busy
+        stats.input_wait_seconds += wait
+
+    return record
 
 
 def _open_output(path: Path | None) -> tuple[TextIO, bool]:
+    """出力先を開く。拡張子が圧縮形式（.gz など）なら圧縮して書き出す。
+
+    標準出力はバイナリとして開き直し、STREAM_BUFFER_SIZE ごとにまとめて書き出す。
+    """
+
     if path is None:
-        return sys.stdout, False
+        try:
+            fd = sys.stdout.fileno()
+        except (AttributeError, OSError, ValueError):
+            return sys.stdout, False
+        sys.stdout.flush()
+        wrapped = open(
+            fd,
+            "w",
+            encoding="utf-8",
+            newline="",
+            buffering=STREAM_BUFFER_SIZE,
+            closefd=False,
+        )
+        return wrapped, True
+
+    codec = codec_for_suffix(path)
     try:
-        return path.open("w", encoding="utf-8", newline=""), True
-    except OSError as exc:
+        if codec is None:
+            return path.open("w", encoding="utf-8", newline=""), True
+        binary = open_compressed_output(path, codec)
+        return io.TextIOWrapper(binary, encoding="utf-8", newline=""), True
+    except (OSError, CompressionError) as exc:
         raise CsvFilterError(f"出力ファイルを書き込めません: {path} ({exc})") from exc
 
 
-def _filter_no_header(
+def _filter_stream(
     infile: TextIO,
-    outfile: TextIO,
+    outfile: TextIO | None,
     filters: list[FilterBinding],
+    where: Expr[FilterBinding] | None,
+    select: list[str | int] | None,
     delimiter: str,
     quotechar: str,
+    no_header: bool,
     stats: FilterStats,
+    vectorize: bool = False,
+    limit: int | None = None,
+    profile: FilterProfile | None = None,
 ) -> None:
+    """filter_rows() と同じ行単位の評価で、一致した行を outfile へ書き出す。"""
+
     reader = csv.reader(infile, delimiter=delimiter, quotechar=quotechar)
-    writer = csv.writer(
-        outfile, delimiter=delimiter, quotechar=quotechar, lineterminator="\n"
+    header, matches = _match_rows(
+        reader, filters, where, select, no_header, stats, vectorize, limit, profile
     )
+    writer = _csv_writer(outfile, delimiter, quotechar)
+    if writer is None:
+        collections.deque(matches, maxlen=0)
+        return
+    if header is not None:
+        writer.writerow(header)
+    if profile is not None:
+        writer = profile.timed_writer(writer)  # type: ignore[assignment]
+    writer.writerows(matches)
 
-    for row in reader:
-        stats.processed += 1
-        match, skipped = _row_matches_no_header(row, filters)
-        if skipped:
-            stats.skipped += 1
-            continue
 
-        if match:
-            writer.writerow(row)
-            stats.matched += 1
+def _match_rows(
+    rows: Iterable[list[str]],
+    filters: list[FilterBinding],
+    where: Expr[FilterBinding] | None,
+    select: list[str | int] | None,
+    no_header: bool,
+    stats: FilterStats,
+    vectorize: bool = False,
+    limit: int | None = None,
+    profile: FilterProfile | None = None,
+) -> tuple[list[str] | None, Iterator[Sequence[str]]]:
+    """ヘッダー行を読んで条件をコンパイルし、(出力のヘッダー, 一致した行) を返す。
+
+    出力のヘッダーは select を適用したもの（ヘッダーなしでは None）。一致した行は
+    rows を読み進めながら 1 行ずつ返す。
+    """
+
+    rows = iter(rows)
+    fieldnames: list[str] | None = None
+    if not no_header:
+        fieldnames = next(rows, None)
+        if fieldnames is None:
+            raise CsvFilterError(
+                "ヘッダー行が存在しません。`--no-header` を指定してください。"
+            )
+
+    predicate = compile_filters(filters, fieldnames, where, profile)
+    columns = select_columns(select, fieldnames)
+    width = None if fieldnames is None else len(fieldnames)
+    bindings = (
+        _index_bindings(filters, fieldnames) if vectorize and where is None else None
+    )
+    matches = _matches(rows, predicate, stats, width, bindings, limit, profile)
+
+    header = None
+    if fieldnames is not None:
+        header = list(fieldnames if columns is None else project(fieldnames, columns))
+    return header, _shape_rows(matches, width, columns)
+
+
+def _filter_indexed(
+    input_path: Path,
+    outfile: TextIO | None,
+    filters: list[FilterBinding],
+    select: list[str | int] | None,
+    delimiter: str,
+    quotechar: str,
+    no_header: bool,
+    stats: FilterStats,
+    limit: int | None = None,
+) -> bool:
+    """索引で候補レコードを絞り込み、その行だけを読んで評価する。
+
+    索引が無い・古い、または索引で絞り込める条件が無い場合は何も書き出さずに
+    False を返す。読まなかった行は条件に一致せずスキップもされない行なので、
+    処理件数だけを索引に記録した行数で置き換える（limit に達した場合はその行まで）。
+    """
+
+    index = load_index(
+        input_path, delimiter=delimiter, quotechar=quotechar, no_header=no_header
+    )
+    if index is None:
+        return False
+
+    with index:
+        fieldnames = index.fieldnames
+        indexed = _index_bindings(filters, fieldnames)
+        offsets = index.candidates(indexed)
+        if offsets is None:
+            return False
+        columns = select_columns(select, fieldnames)
+
+        writer = _csv_writer(outfile, delimiter, quotechar)
+        if fieldnames is not None:
+            _write_header(writer, fieldnames, columns)
+        current = [-1]  # csv.reader が今読んでいるレコードの先頭オフセット
+
+        def texts() -> Iterator[str]:
+            records = read_records(input_path, offsets, quotechar)
+            for offset, text in zip(offsets, records):
+                current[0] = offset
+                yield text
+
+        rows = csv.reader(texts(), delimiter=delimiter, quotechar=quotechar)
+        width = None if fieldnames is None else len(fieldnames)
+        predicate = compile_row_predicate(indexed)
+        write_matches(rows, writer, predicate, stats, width, columns, limit=limit)
+        if limit is None or stats.matched < limit:
+            stats.processed = index.records
         else:
-            pass
+            stats.processed = index.records_through(current[0])
+    return True
 
 
-def _row_matches_no_header(
-    row: list[str], filters: list[FilterBinding]
-) -> tuple[bool, bool]:
-    """戻り値: (マッチしたか, カラム不足でスキップすべきか)"""
-    for binding in filters:
-        if not isinstance(binding.column, int):
-            raise CsvFilterError("ヘッダーなしの場合、列番号で指定してください")
+def _filter_cached(
+    cache_dir: Path,
+    cache_size: int,
+    input_path: Path,
+    outfile: TextIO | None,
+    filters: list[FilterBinding],
+    select: list[str | int] | None,
+    delimiter: str,
+    quotechar: str,
+    no_header: bool,
+    stats: FilterStats,
+    limit: int | None = None,
+) -> bool:
+    """列指向キャッシュ上で評価する。キャッシュが無ければ入力を読んで作成する。
 
-        if binding.column >= len(row):
-            # 指定列が存在しない行はスキップ
-            return False, True
+    キャッシュを作成できない場合（書き込めない・容量不足など）は何も書き出さずに
+    False を返し、呼び出し側は通常の走査に戻る。
+    """
 
-        value = row[binding.column]
-        if not binding.condition.matches(value):
-            return False, False
-    return True, False
+    dialect = dict(delimiter=delimiter, quotechar=quotechar, no_header=no_header)
+    entry = open_entry(cache_dir, input_path, **dialect)
+    if entry is None:
+        entry = _build_cache(cache_dir, input_path, filters, select, stats, **dialect)
+        if entry is None:
+            return False
 
+    try:
+        writer = _csv_writer(outfile, delimiter, quotechar)
+        _write_cached(entry, writer, filters, select, stats, limit)
+    except (CacheError, OSError) as exc:
+        raise CsvFilterError(f"キャッシュを読み込めません: {exc}") from exc
+    finally:
+        entry.close()
+    evict(cache_dir, cache_size)
+    return True
 
-def _filter_with_header(
-    infile: TextIO,
-    outfile: TextIO,
+
+def _build_cache(
+    cache_dir: Path,
+    input_path: Path,
     filters: list[FilterBinding],
+    select: list[str | int] | None,
+    stats: FilterStats,
+    *,
     delimiter: str,
     quotechar: str,
+    no_header: bool,
+) -> CacheEntry | None:
+    """入力を別に開いて読み、キャッシュを作成する。作成できなければ None。
+
+    filter_csv が開いた入力は読まずに残すので、失敗してもそのまま通常の走査に使える。
+    """
+
+    source, _ = _open_input(input_path, stats)
+    with source:
+        reader = csv.reader(source, delimiter=delimiter, quotechar=quotechar)
+        fieldnames: list[str] | None = None
+        if not no_header:
+            fieldnames = next(reader, None)
+            if fieldnames is None:
+                raise CsvFilterError(
+                    "ヘッダー行が存在しません。`--no-header` を指定してください。"
+                )
+        # 作成前に条件を検証し、エラーなら変換の手間をかけない
+        _index_bindings(filters, fieldnames)
+        select_columns(select, fieldnames)
+        try:
+            return build_entry(
+                cache_dir,
+                input_path,
+                reader,
+                fieldnames,
+                delimiter=delimiter,
+                quotechar=quotechar,
+                no_header=no_header,
+            )
+        except CacheError:
+            return None
+
+
+def _write_cached(
+    entry: CacheEntry,
+    writer: CsvWriter | None,
+    filters: list[FilterBinding],
+    select: list[str | int] | None,
     stats: FilterStats,
+    limit: int | None = None,
 ) -> None:
-    reader = csv.DictReader(infile, delimiter=delimiter, quotechar=quotechar)
-    if reader.fieldnames is None:
-        raise CsvFilterError(
-            "ヘッダー行が存在しません。`--no-header` を指定してください。"
+    """キャッシュ上で条件を列ごとに評価し、一致した行だけを組み立てて書き出す。
+
+    limit 行に達した場合の件数は、全件走査でその行まで読んだ場合と同じにする。
+    """
+
+    fieldnames = entry.fieldnames
+    indexed = _index_bindings(filters, fieldnames)
+    columns = select_columns(select, fieldnames)
+    if fieldnames is not None:
+        _write_header(writer, fieldnames, columns)
+
+    stats.processed = entry.rows
+    for block in entry.match(indexed, compile_row_predicate(indexed)):
+        matched = [r for r, result in block if result is not None]
+        if limit is not None and stats.matched < limit <= stats.matched + len(matched):
+            # limit 行目の一致までで打ち切る
+            matched = matched[: limit - stats.matched]
+            block = [(r, result) for r, result in block if r <= matched[-1]]
+        stats.matched += len(matched)
+        stats.skipped += len(block) - len(matched)
+        if writer is not None:
+            # 一致した行だけを組み立て直す
+            writer.writerows(entry.take(matched, columns))
+        if stats.matched == limit:
+            stats.processed = matched[-1] + 1
+            break
+
+
+def _filter_unquoted(
+    infile: TextIO,
+    outfile: TextIO | None,
+    filters: list[FilterBinding],
+    select: list[str | int] | None,
+    delimiter: str,
+    quotechar: str,
+    no_header: bool,
+    stats: FilterStats,
+    limit: int | None = None,
+) -> bool:
+    """クオートを含まない入力を mmap 上のバイト列のまま処理する高速経路。
+
+    入力にクオート文字や行末以外の CR が含まれる場合、または contains 以外の
+    条件がある場合は何も書き出さずに False を返し、通常経路に任せる。
+    一致した行はデコード・再エンコードせず元のバイト列をそのまま書き出す
+    （select がある場合は選択した列のバイト列をつなぎ直す）。
+    limit に達したらその行で打ち切る（処理件数も通常経路と同じくその行までを数える）。
+    """
+
+    delim = delimiter.encode("utf-8")
+    quote = quotechar.encode("utf-8")
+    if len(delim) != 1 or len(quote) != 1:
+        return False
+    if not all(type(f.condition) is ContainsCondition for f in filters):
+        return False
+
+    try:
+        mm = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):  # 空ファイルや mmap 非対応のストリーム
+        return False
+
+    with mm:
+        if mm.find(quote) != -1 or not _only_crlf(mm):
+            return False
+
+        header = b""
+        offset = 0
+        fieldnames: list[str] | None = None
+        if not no_header:
+            offset = _line_end(mm, 0)
+            header = _strip_eol(mm[:offset])
+            fieldnames = header.decode("utf-8").split(delimiter) if header else []
+        indexed = [
+            # needle を UTF-8 にしてバイト列のフィールドに対して評価する
+            (index, ContainsCondition(cond.needle.encode("utf-8")))  # type: ignore[attr-defined,arg-type]
+            for index, cond in _index_bindings(filters, fieldnames)
+        ]
+        columns = select_columns(select, fieldnames)
+        width = None if fieldnames is None else len(fieldnames)
+        scanner = _UnquotedScanner(indexed, delim, width, columns, quote)
+
+        out: BinaryIO | None = None
+        if outfile is not None:
+            outfile.flush()
+            out = outfile.buffer  # type: ignore[attr-defined]
+        if fieldnames is not None and out is not None:
+            if columns is not None:
+                header = scanner.project(header)
+            out.write(header + b"\n")
+
+        size = len(mm)
+        while offset < size:
+            if offset + MMAP_CHUNK_SIZE >= size:
+                end = size
+            else:
+                # チャンクは行の途中で切らない
+                end = mm.rfind(b"\n", offset, offset + MMAP_CHUNK_SIZE) + 1
+                if end <= offset:
+                    end = _line_end(mm, offset + MMAP_CHUNK_SIZE)
+            remaining = None if limit is None else limit - stats.matched
+            matched = scanner.scan(mm[offset:end], stats, remaining)
+            if matched and out is not None:
+                out.write(b"\n".join(matched) + b"\n")
+            offset = end
+            if stats.matched == limit:
+                break
+        if out is not None:
+            out.flush()
+    return True
+
+
+class _UnquotedScanner:
+    """クオートの無いバイト列のチャンクを行単位で評価する。"""
+
+    def __init__(
+        self,
+        indexed: list[tuple[int, Condition]],
+        delim: bytes,
+        width: int | None,
+        columns: list[int] | None = None,
+        quote: bytes = b'"',
+    ) -> None:
+        self.predicate = compile_row_predicate(indexed)
+        needles: list[bytes] = [cond.needle for _, cond in indexed]  # type: ignore[attr-defined]
+        # 候補行の絞り込みに使う needle。空の needle はどの行にも一致するので使えない
+        self.anchors = [needle for needle in needles if needle]
+        self.delim = delim
+        self.width = width
+        self.columns = columns
+        if columns is not None:
+            self._pick = _projector(columns, b"")
+            self._pick_span = max(columns) + 1
+            # csv.writer は空文字 1 列だけの行を "" と書くので合わせる
+            self._empty_row = quote * 2 if len(columns) == 1 else None
+        # 評価に必要なのは参照される最大の列まで。それ以降は分割しない
+        self.span = max((index for index, _ in indexed), default=-1) + 1
+        # span 列に満たない行（空行を含む）。前後に改行を足したチャンクに対して使う。
+        # 所有量指定子でバックトラックを抑え、チャンク全体を C の速度で 1 回走査する
+        d = re.escape(delim)
+        value = b"[^" + d + b"\\n]*+"
+        self.short_line = re.compile(
+            b"\\n" + value + b"(?:" + d + value + b"){0,%d}+\\n" % (self.span - 2)
+            if self.span >= 2
+            else b"\\n\\n"
         )
 
-    _ensure_columns_exist(reader.fieldnames, filters)
+    def scan(
+        self, chunk: bytes, stats: FilterStats, remaining: int | None = None
+    ) -> list[bytes]:
+        """チャンク内の一致行を返す。remaining 件一致したらその行で打ち切る。"""
+        if b"\r" in chunk:
+            chunk = chunk.replace(b"\r\n", b"\n")
+        if chunk.endswith(b"\n"):
+            chunk = chunk[:-1]
+
+        if not self.anchors or self.short_line.search(b"\n" + chunk + b"\n"):
+            return self._scan_lines(chunk.split(b"\n"), stats, remaining)
 
-    writer = csv.DictWriter(
-        outfile,
-        fieldnames=reader.fieldnames,
-        delimiter=delimiter,
-        quotechar=quotechar,
-        lineterminator="\n",
+        # 全行が span 列以上あるのでスキップは発生しない。
+        # チャンク内で最も出現の少ない needle を含む行だけを候補として評価する
+        anchor = min(self.anchors, key=chunk.count)
+        delim, span, predicate = self.delim, self.span, self.predicate
+        matched: list[bytes] = []
+        last = len(chunk)
+        pos = chunk.find(anchor)
+        while pos != -1:
+            start = chunk.rfind(b"\n", 0, pos) + 1
+            end = chunk.find(b"\n", pos)
+            if end == -1:
+                end = len(chunk)
+            line = chunk[start:end]
+            if predicate(line.split(delim, span)):  # type: ignore[arg-type]
+                matched.append(self._fit(line))
+                if len(matched) == remaining:
+                    last = end
+                    break
+            pos = chunk.find(anchor, end)
+        stats.processed += chunk.count(b"\n", 0, last) + 1
+        stats.matched += len(matched)
+        return matched
+
+    def _scan_lines(
+        self, lines: list[bytes], stats: FilterStats, remaining: int | None
+    ) -> list[bytes]:
+        matched = []
+        for line in lines:
+            if line:
+                row = line.split(self.delim)
+            elif self.width is None:
+                row = []  # csv.reader は空行を列の無い行 [] として返す
+            else:
+                continue  # ヘッダーありでは空行を数えない
+
+            stats.processed += 1
+            result = self.predicate(row)  # type: ignore[arg-type]
+            if result is None:
+                stats.skipped += 1
+            elif result:
+                stats.matched += 1
+                matched.append(self._fit(line))
+                if len(matched) == remaining:
+                    break
+        return matched
+
+    def project(self, line: bytes) -> bytes:
+        """選択した列だけをつなぎ直す。選択列より後ろは分割しない。"""
+        fields = line.split(self.delim, self._pick_span) if line else []
+        projected = self.delim.join(self._pick(fields))
+        if not projected and self._empty_row is not None:
+            return self._empty_row
+        return projected
+
+    def _fit(self, line: bytes) -> bytes:
+        """ヘッダーありで列数が違う行だけ、ヘッダーの列数に揃える。
+
+        select がある場合は選択列への射影がこれを兼ねる。
+        """
+        if self.columns is not None:
+            return self.project(line)
+        if self.width is None:
+            return line
+        nfields = line.count(self.delim) + 1
+        if nfields == self.width:
+            return line
+        if nfields < self.width:
+            return line + self.delim * (self.width - nfields)
+        return self.delim.join(line.split(self.delim, self.width)[: self.width])
+
+
+def _line_end(mm: mmap.mmap, offset: int) -> int:
+    """offset 以降で最初の改行の直後のオフセットを返す（改行が無ければ末尾）。"""
+    nl = mm.find(b"\n", offset)
+    return len(mm) if nl == -1 else nl + 1
+
+
+def _strip_eol(line: bytes) -> bytes:
+    if line.endswith(b"\r\n"):
+        return line[:-2]
+    if line.endswith(b"\n"):
+        return line[:-1]
+    return line
+
+
+def _only_crlf(mm: mmap.mmap) -> bool:
+    """CR が CRLF の一部としてだけ現れるか（単独 CR は csv.reader が改行とみなす）。"""
+    pos = mm.find(b"\r")
+    while pos != -1:
+        if mm[pos + 1 : pos + 2] != b"\n":
+            return False
+        pos = mm.find(b"\r", pos + 2)
+    return True
+
+
+def compile_filters(
+    filters: list[FilterBinding],
+    fieldnames: list[str] | None,
+    where: Expr[FilterBinding] | None = None,
+    profile: FilterProfile | None = None,
+) -> RowPredicate:
+    """フィルター指定を検証し、行 (list[str]) を評価する述語にコンパイルする。
+
+    fieldnames が None のときはヘッダーなしモードとして列番号を要求する。
+    where がある場合は filters の AND 連鎖と論理式を AND で結合して評価する。
+    profile を渡すと条件ごとの評価回数と時間を記録する述語になる。
+    """
+
+    wrap = None if profile is None else _tracker(profile, fieldnames)
+    if where is None:
+        return compile_row_predicate(_index_bindings(filters, fieldnames), wrap)
+    return compile_expression(_resolve_expression(filters, where, fieldnames), wrap)
+
+
+def _tracker(profile: FilterProfile, fieldnames: list[str] | None) -> CheckWrapper:
+    """条件の評価関数を、profile に回数と時間を記録する関数で包む関数を返す。"""
+
+    def wrap(
+        index: int, condition: Condition, check: Callable[[str], object]
+    ) -> Callable[[str], object]:
+        # 表示はヘッダーありならカラム名、なしなら CLI と同じ 1 始まりの列番号
+        column = index + 1 if fieldnames is None else fieldnames[index]
+        return profile.track(column, condition, check)
+
+    return wrap
+
+
+def compile_filter_sets(
+    filter_sets: list[tuple[list[FilterBinding], Expr[FilterBinding] | None]],
+    fieldnames: list[str] | None,
+) -> list[RowPredicate]:
+    """複数の (filters, where) をまとめてコンパイルする。
+
+    フィルター集合をまたいで共通する条件や部分式は、1 行につき 1 回だけ評価される。
+    返す述語には同じ行を順に渡すこと。短い行の扱いは compile_filters と同じ。
+    """
+
+    return compile_expressions(
+        [
+            _resolve_expression(filters, where, fieldnames)
+            for filters, where in filter_sets
+        ],
+        ordered=[where is None for _, where in filter_sets],
     )
-    writer.writeheader()
 
-    for row in reader:
+
+def _resolve_expression(
+    filters: list[FilterBinding],
+    where: Expr[FilterBinding] | None,
+    fieldnames: list[str] | None,
+) -> Expr[tuple[int, Condition]]:
+    """filters の AND 連鎖と where を 1 つの木にし、列をインデックスへ解決する。"""
+
+    parts: list[Expr[FilterBinding]] = [Term(binding) for binding in filters]
+    if where is not None:
+        parts.append(where)
+    if not parts:
+        raise CsvFilterError("フィルターを1件以上指定してください")
+    node: Expr[FilterBinding] = parts[0] if len(parts) == 1 else And(tuple(parts))
+    _index_bindings(terms(node), fieldnames)  # 未知のカラムなどをまとめて報告する
+    return map_terms(node, lambda b: _index_bindings([b], fieldnames)[0])
+
+
+def select_columns(
+    select: list[str | int] | None, fieldnames: list[str] | None
+) -> list[int] | None:
+    """出力する列の指定を 0 始まりの列インデックスに解決する。
+
+    fieldnames が None のときはヘッダーなしモードとして列番号を要求する。
+    同名カラムが複数ある場合は条件と同じく最後の列を採用する。
+    """
+
+    if select is None:
+        return None
+    if not select:
+        raise CsvFilterError("出力する列を1件以上指定してください")
+    if fieldnames is None:
+        if not all(isinstance(column, int) for column in select):
+            raise CsvFilterError("ヘッダーなしの場合、列番号で指定してください")
+        return list(select)  # type: ignore[arg-type]
+
+    if any(isinstance(column, int) for column in select):
+        raise CsvFilterError(
+            "ヘッダーありの場合、列番号ではなくカラム名で指定してください"
+        )
+    positions = {name: index for index, name in enumerate(fieldnames)}
+    missing = {column for column in select if column not in positions}
+    if missing:
+        names = ", ".join(sorted(missing))  # type: ignore[arg-type]
+        raise CsvFilterError(f"カラムが存在しません: {names}")
+    return [positions[column] for column in select]  # type: ignore[index]
+
+
+def project(row: list[str], columns: list[int]) -> Sequence[str]:
+    """行から columns の列だけを取り出す。列が足りない行は空文字で補う。"""
+    return _projector(columns, "")(row)
+
+
+def _index_bindings(
+    filters: list[FilterBinding], fieldnames: list[str] | None
+) -> list[tuple[int, Condition]]:
+    if fieldnames is None:
+        indexed: list[tuple[int, Condition]] = []
+        for binding in filters:
+            if not isinstance(binding.column, int):
+                raise CsvFilterError("ヘッダーなしの場合、列番号で指定してください")
+            indexed.append((binding.column, binding.condition))
+        return indexed
+
+    _ensure_columns_exist(fieldnames, filters)
+    return _resolve_columns(fieldnames, filters)
+
+
+def write_matches(
+    rows: Iterable[list[str]],
+    writer: CsvWriter | None,
+    predicate: RowPredicate,
+    stats: FilterStats,
+    width: int | None,
+    columns: list[int] | None = None,
+    bindings: list[tuple[int, Condition]] | None = None,
+    limit: int | None = None,
+    profile: FilterProfile | None = None,
+) -> None:
+    """一致した行を writer へ書き出す。
+
+    width はヘッダーの列数（ヘッダーなしモードでは None）。ヘッダーありの場合は
+    空行を数えず、出力行をヘッダーの列数に揃える。columns があればその列だけを書き出す。
+    bindings（predicate の元の AND 条件）を渡すと、NumPy で速くなる条件ならチャンク単位で評価する。
+    limit 行一致した時点で rows を読むのをやめる。writer が None なら件数だけを数える。
+    profile を渡すとパース・評価・書き出しの時間を記録する（bindings は使わない）。
+    """
+
+    matches = _matches(rows, predicate, stats, width, bindings, limit, profile)
+    if writer is None:
+        collections.deque(matches, maxlen=0)
+        return
+    if profile is not None:
+        writer = profile.timed_writer(writer)  # type: ignore[assignment]
+    writer.writerows(_shape_rows(matches, width, columns))
+
+
+def _matches(
+    rows: Iterable[list[str]],
+    predicate: RowPredicate,
+    stats: FilterStats,
+    width: int | None,
+    bindings: list[tuple[int, Condition]] | None = None,
+    limit: int | None = None,
+    profile: FilterProfile | None = None,
+) -> Iterator[list[str]]:
+    """評価の経路（計測・NumPy・行単位）を選び、一致した行を limit 行まで返す。"""
+
+    skip_blank = width is not None
+    if profile is not None:
+        matches = profile.iter_matches(rows, predicate, stats, skip_blank=skip_blank)
+    elif bindings is not None and vectorized.applicable(bindings):
+        matches = vectorized.iter_matches(
+            rows, bindings, predicate, stats, skip_blank=skip_blank
+        )
+    else:
+        matches = _iter_matches(rows, predicate, stats, skip_blank=skip_blank)
+    if limit is not None:
+        matches = itertools.islice(matches, limit)
+    return matches
+
+
+def _shape_rows(
+    matches: Iterator[list[str]], width: int | None, columns: list[int] | None
+) -> Iterator[Sequence[str]]:
+    """出力する行の形に揃える（columns があればその列だけ、なければヘッダーの列数）。"""
+    if columns is not None:
+        return map(_projector(columns, ""), matches)
+    if width is None:
+        return matches
+    return (_fit_row(row, width) for row in matches)
+
+
+def _iter_matches(
+    rows: Iterable[list[str]],
+    predicate: RowPredicate,
+    stats: FilterStats,
+    *,
+    skip_blank: bool = False,
+) -> Iterator[list[str]]:
+    """条件に一致する行だけを返しつつ stats を更新する。"""
+    for row in rows:
+        if skip_blank and not row:
+            # 空行はデータ行として数えない（DictReader と同じ挙動）
+            continue
+
         stats.processed += 1
-        try:
-            if _row_matches_with_header(row, filters):
-                writer.writerow(row)
-                stats.matched += 1
-            # スキップは _row_matches_with_header 内で判断
-        except CsvFilterError:
+        result = predicate(row)
+        if result is None:
+            # 指定列が存在しない行はスキップ
             stats.skipped += 1
+        elif result:
+            stats.matched += 1
+            yield row
 
 
 def _ensure_columns_exist(fieldnames: list[str], filters: list[FilterBinding]) -> None:
@@ -163,18 +1189,71 @@ def _ensure_columns_exist(fieldnames: list[str], filters: list[FilterBinding]) -
         raise CsvFilterError(f"カラムが存在しません: {names}")
 
 
-def _row_matches_with_header(row: dict[str, str], filters: list[FilterBinding]) -> bool:
+def _resolve_columns(
+    fieldnames: list[str], filters: list[FilterBinding]
+) -> list[tuple[int, Condition]]:
+    """カラム名を列インデックスへ一度だけ解決する。
+
+    同名カラムが複数ある場合は DictReader と同じく最後の列を採用する。
+    """
+
+    positions = {name: index for index, name in enumerate(fieldnames)}
+    resolved: list[tuple[int, Condition]] = []
     for binding in filters:
         if isinstance(binding.column, int):
             raise CsvFilterError(
                 "ヘッダーありの場合、列番号ではなくカラム名で指定してください"
             )
+        resolved.append((positions[binding.column], binding.condition))
+    return resolved
 
-        value = row.get(binding.column)
-        if value is None:
-            # カラム不足行はスキップ
-            raise CsvFilterError("カラム数が不足している行をスキップしました")
 
-        if not binding.condition.matches(value):
-            return False
-    return True
+def _csv_writer(
+    outfile: TextIO | None, delimiter: str, quotechar: str
+) -> CsvWriter | None:
+    """出力先の csv.writer を作る。件数だけを数える場合（outfile が None）は None。"""
+    if outfile is None:
+        return None
+    return csv.writer(
+        outfile, delimiter=delimiter, quotechar=quotechar, lineterminator="\n"
+    )
+
+
+def _write_header(
+    writer: CsvWriter | None, fieldnames: list[str], columns: list[int] | None
+) -> None:
+    if writer is not None:
+        writer.writerow(fieldnames if columns is None else project(fieldnames, columns))
+
+
+def _fit_row(row: list[str], width: int) -> list[str]:
+    """出力行をヘッダーの列数に揃える（不足分は空文字、超過分は切り捨て）。"""
+    if len(row) == width:
+        return row
+    if len(row) < width:
+        return row + [""] * (width - len(row))
+    return row[:width]
+
+
+def _projector(
+    columns: list[int], fill: AnyStr
+) -> Callable[[list[AnyStr]], Sequence[AnyStr]]:
+    """行から columns の列を取り出す関数を返す。列が足りない行は fill で補う。"""
+
+    getter = operator.itemgetter(*columns)
+    need = max(columns) + 1
+
+    if len(columns) == 1:
+        (only,) = columns
+
+        def pick_one(row: list[AnyStr]) -> Sequence[AnyStr]:
+            return (row[only] if len(row) > only else fill,)
+
+        return pick_one
+
+    def pick(row: list[AnyStr]) -> Sequence[AnyStr]:
+        if len(row) >= need:
+            return getter(row)  # type: ignore[no-any-return]
+        return [row[i] if i < len(row) else fill for i in columns]
+
+    return pick
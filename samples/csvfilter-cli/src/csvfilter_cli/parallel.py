@@ -0,0 +1,299 @@
+"""大きな CSV をバイト範囲に分割し、複数プロセスでフィルターするモジュール。
+
+分割位置はレコード境界（クオート外の改行の直後）に揃える。クオート文字の出現回数の
+偶奇でクオート内かどうかを判定するため、クオート文字はクオートされたフィールドの
+囲みとエスケープ（`""`）にだけ現れる前提（RFC 4180 形式）とする。
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import shutil
+import tempfile
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, TextIO
+
+from .compressed import detect_codec
+from .expr import Expr
+from .io import (
+    CsvFilterError,
+    FilterBinding,
+    FilterStats,
+    _index_bindings,
+    _open_input,
+    _open_output,
+    compile_filters,
+    project,
+    select_columns,
+    write_matches,
+)
+
+SCAN_BLOCK_SIZE = 1 << 20
+READ_BUFFER_SIZE = 1 << 20
+CHUNKS_PER_JOB = 4  # ワーカー間の負荷の偏りを減らすため、ジョブ数より細かく分割する
+
+
+@dataclass(frozen=True)
+class _RangeTask:
+    input_path: Path
+    start: int
+    end: int
+    output_path: Path
+    filters: list[FilterBinding]
+    where: Expr[FilterBinding] | None
+    fieldnames: list[str] | None
+    columns: list[int] | None
+    delimiter: str
+    quotechar: str
+    vectorize: bool = False
+    count_only: bool = False
+
+
+def filter_csv_parallel(
+    *,
+    input_path: Path,
+    output_path: Path | None,
+    filters: list[FilterBinding],
+    delimiter: str,
+    quotechar: str,
+    no_header: bool,
+    jobs: int,
+    where: Expr[FilterBinding] | None = None,
+    select: list[str | int] | None = None,
+    vectorize: bool = False,
+    count_only: bool = False,
+) -> FilterStats:
+    """`filter_csv` の並列版。出力はシリアル版とバイト単位で一致する。
+
+    count_only=True の場合は各ワーカーが件数だけを数え、何も書き出さない。
+    """
+
+    quote = _single_byte(quotechar)
+    # 存在確認とエラーメッセージをシリアル版と揃える
+    infile, _ = _open_input(input_path)
+    infile.close()
+    if detect_codec(input_path) is not None:
+        raise CsvFilterError("圧縮された入力では --jobs を指定できません")
+    size = input_path.stat().st_size
+
+    fieldnames: list[str] | None = None
+    data_start = 0
+    if not no_header:
+        fieldnames, data_start = _read_header(input_path, delimiter, quotechar)
+        # ワーカーに渡す前に検証し、エラーをシリアル版と同じ時点で報告する
+        compile_filters(filters, fieldnames, where)
+    else:
+        compile_filters(filters, None, where)
+    columns = select_columns(select, fieldnames)
+
+    boundaries = find_record_boundaries(
+        input_path, data_start, size, max(1, jobs) * CHUNKS_PER_JOB, quote
+    )
+
+    stats = FilterStats()
+    outfile: TextIO | None = None
+    should_close_output = False
+    if not count_only:
+        outfile, should_close_output = _open_output(output_path)
+    try:
+        if fieldnames is not None and outfile is not None:
+            writer = csv.writer(
+                outfile, delimiter=delimiter, quotechar=quotechar, lineterminator="\n"
+            )
+            writer.writerow(
+                fieldnames if columns is None else project(fieldnames, columns)
+            )
+
+        with tempfile.TemporaryDirectory(prefix="csvfilter-") as tmp:
+            tasks = [
+                _RangeTask(
+                    input_path=input_path,
+                    start=start,
+                    end=end,
+                    output_path=Path(tmp) / f"part-{i:05d}.csv",
+                    filters=filters,
+                    where=where,
+                    fieldnames=fieldnames,
+                    columns=columns,
+                    delimiter=delimiter,
+                    quotechar=quotechar,
+                    vectorize=vectorize,
+                    count_only=count_only,
+                )
+                for i, (start, end) in enumerate(zip(boundaries, boundaries[1:]))
+            ]
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                # map は投入順に結果を返すので、そのまま元の順序で連結できる
+                for task, part in zip(tasks, pool.map(_filter_range, tasks)):
+                    _merge_stats(stats, part)
+                    if outfile is None:
+                        continue
+                    with task.output_path.open("r", encoding="utf-8", newline="") as f:
+                        shutil.copyfileobj(f, outfile, READ_BUFFER_SIZE)
+    finally:
+        if should_close_output:
+            outfile.close()  # type: ignore[union-attr]
+        elif outfile is not None:
+            outfile.flush()
+
+    return stats
+
+
+def find_record_boundaries(
+    path: Path, start: int, end: int, parts: int, quote: bytes
+) -> list[int]:
+    """[start, end) をおよそ parts 等分するレコード境界のオフセット一覧を返す。
+
+    戻り値は start で始まり end で終わる昇順のリスト。境界が見つからない範囲は
+    隣の範囲とまとめられるため、要素数は parts + 1 以下になる。
+    """
+
+    targets = [start + (end - start) * k // parts for k in range(1, parts)]
+    boundaries = [start]
+    with path.open("rb") as f:
+        f.seek(start)
+        for boundary in _scan_boundaries(f, start, end, targets, quote):
+            if boundaries[-1] < boundary < end:
+                boundaries.append(boundary)
+    boundaries.append(end)
+    return boundaries
+
+
+def _scan_boundaries(
+    f: BinaryIO, pos: int, end: int, targets: list[int], quote: bytes
+) -> Iterator[int]:
+    """各 target 以降で最初の、クオート外の改行直後のオフセットを返す。"""
+
+    pending = iter(targets)
+    target = next(pending, None)
+    in_quote = False  # pos 時点でクオート内か
+    while target is not None and pos < end:
+        block = f.read(min(SCAN_BLOCK_SIZE, end - pos))
+        if not block:
+            return
+        block_end = pos + len(block)
+        i = 0
+        while target is not None and target < block_end:
+            t = max(target - pos, i)
+            in_quote ^= bool(block.count(quote, i, t) & 1)
+            i = t
+            found = False
+            while True:
+                nl = block.find(b"\n", i)
+                if nl < 0:
+                    break
+                in_quote ^= bool(block.count(quote, i, nl) & 1)
+                i = nl + 1
+                if not in_quote:
+                    found = True
+                    break
+            if not found:
+                # このブロックには境界が無い。次のブロック先頭から探し直す
+                target = block_end
+                break
+            boundary = pos + i
+            yield boundary
+            target = next(pending, None)
+            while target is not None and target < boundary:
+                target = next(pending, None)
+        in_quote ^= bool(block.count(quote, i) & 1)
+        pos = block_end
+
+
+def _read_header(path: Path, delimiter: str, quotechar: str) -> tuple[list[str], int]:
+    """ヘッダー行とデータ開始オフセットを返す。"""
+
+    quote = _single_byte(quotechar)
+    size = path.stat().st_size
+    with path.open("rb") as f:
+        header_end = _first_boundary(f, size, quote)
+        f.seek(0)
+        head = f.read(header_end)
+    rows = csv.reader(
+        io.StringIO(head.decode("utf-8"), newline=""),
+        delimiter=delimiter,
+        quotechar=quotechar,
+    )
+    fieldnames = next(rows, None)
+    if fieldnames is None:
+        raise CsvFilterError(
+            "ヘッダー行が存在しません。`--no-header` を指定してください。"
+        )
+    return fieldnames, header_end
+
+
+def _first_boundary(f: BinaryIO, size: int, quote: bytes) -> int:
+    f.seek(0)
+    for boundary in _scan_boundaries(f, 0, size, [0], quote):
+        return boundary
+    return size
+
+
+def _filter_range(task: _RangeTask) -> FilterStats:
+    """ワーカー: 担当範囲をフィルターし、一時ファイルへ書き出す。"""
+
+    stats = FilterStats()
+    predicate = compile_filters(task.filters, task.fieldnames, task.where)
+    width = None if task.fieldnames is None else len(task.fieldnames)
+    bindings = None
+    if task.vectorize and task.where is None:
+        bindings = _index_bindings(task.filters, task.fieldnames)
+    with task.input_path.open("rb", buffering=0) as raw:
+        ranged = io.BufferedReader(
+            _RangeReader(raw, task.start, task.end), READ_BUFFER_SIZE
+        )
+        infile = io.TextIOWrapper(ranged, encoding="utf-8", newline="")
+        reader = csv.reader(infile, delimiter=task.delimiter, quotechar=task.quotechar)
+        if task.count_only:
+            write_matches(reader, None, predicate, stats, width, task.columns, bindings)
+            return stats
+        with task.output_path.open("w", encoding="utf-8", newline="") as outfile:
+            writer = csv.writer(
+                outfile,
+                delimiter=task.delimiter,
+                quotechar=task.quotechar,
+                lineterminator="\n",
+            )
+            write_matches(
+                reader, writer, predicate, stats, width, task.columns, bindings
+            )
+    return stats
+
+
+class _RangeReader(io.RawIOBase):
+    """下位ストリームの [start, end) だけを読ませる読み取り専用ストリーム。"""
+
+    def __init__(self, raw: BinaryIO, start: int, end: int) -> None:
+        raw.seek(start)
+        self._raw = raw
+        self._remaining = end - start
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:  # type: ignore[override]
+        if self._remaining <= 0:
+            return 0
+        view = memoryview(buffer)[: self._remaining]
+        n = self._raw.readinto(view) or 0
+        self._remaining -= n
+        return n
+
+
+def _merge_stats(total: FilterStats, part: FilterStats) -> None:
+    total.processed += part.processed
+    total.matched += part.matched
+    total.skipped += part.skipped
+
+
+def _single_byte(quotechar: str) -> bytes:
+    encoded = quotechar.encode("utf-8")
+    if len(encoded) != 1:
+        raise CsvFilterError(
+            "並列処理ではクオート文字に 1 バイト文字を指定してください"
+        )
+    return encoded
@@ -0,0 +1,270 @@
+"""`--stats` / `--progress` のための計測。
+
+- FilterProfile: 読み込み・パース・条件評価・書き出しの段階ごとの所要時間と、
+  条件ごとの評価回数・一致回数・所要時間を集計する。行ごとに時刻を取るため、
+  計測しない場合より遅くなる。
+- ProgressReporter: 別スレッドから一定間隔で処理件数と読み込んだバイト数を読み、
+  行数/秒・バイト数/秒を表示する。フィルター処理側には計測のコストがかからない。
+"""
+
+from __future__ import annotations
+
+import io
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from typing import IO, TYPE_CHECKING, Any, BinaryIO, TextIO
+
+from .filters import (
+    BetweenCondition,
+    CompareCondition,
+    Condition,
+    ContainsAnyCondition,
+    ContainsCondition,
+    InCondition,
+    RegexCondition,
+    RowPredicate,
+)
+
+if TYPE_CHECKING:
+    from _csv import _writer as CsvWriter
+
+    from .io import FilterStats
+
+DEFAULT_PROGRESS_INTERVAL = 1.0  # 秒
+
+
+@dataclass
+class ConditionProfile:
+    """1 つの条件の評価回数・一致回数・累計時間。"""
+
+    column: str | int  # ヘッダーあり: カラム名, ヘッダーなし: 1 始まりの列番号
+    condition: str  # `op:val` 形式の説明
+    evaluations: int = 0
+    hits: int = 0
+    seconds: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.evaluations if self.evaluations else 0.0
+
+
+@dataclass
+class FilterProfile:
+    """段階ごとの所要時間（秒）と条件ごとの集計。
+
+    read は入力ストリームからの読み込み（展開待ちを含む）、parse は csv.reader が
+    行を組み立てる時間から read を除いたもの、evaluate は行述語、write は書き出し。
+    """
+
+    read_seconds: float = 0.0
+    parse_seconds: float = 0.0
+    evaluate_seconds: float = 0.0
+    write_seconds: float = 0.0
+    conditions: list[ConditionProfile] = field(default_factory=list)
+
+    def track(
+        self,
+        column: str | int,
+        condition: Condition,
+        check: Callable[[str], object],
+    ) -> Callable[[str], object]:
+        """条件の評価関数を、回数と時間を記録する関数で包む。"""
+
+        entry = ConditionProfile(column, describe_condition(condition))
+        self.conditions.append(entry)
+        clock = time.perf_counter
+
+        def tracked(value: str) -> object:
+            start = clock()
+            result = check(value)
+            entry.seconds += clock() - start
+            entry.evaluations += 1
+            if result:
+                entry.hits += 1
+            return result
+
+        return tracked
+
+    def iter_matches(
+        self,
+        rows: Iterable[list[str]],
+        predicate: RowPredicate,
+        stats: FilterStats,
+        *,
+        skip_blank: bool = False,
+    ) -> Iterator[list[str]]:
+        """`io._iter_matches` と同じ処理を、パースと評価の時間を測りながら行う。"""
+
+        clock = time.perf_counter
+        rows = iter(rows)
+        while True:
+            read_before = self.read_seconds
+            start = clock()
+            row = next(rows, None)
+            parsed = clock()
+            self.parse_seconds += parsed - start - (self.read_seconds - read_before)
+            if row is None:
+                return
+            if skip_blank and not row:
+                continue
+
+            stats.processed += 1
+            result = predicate(row)
+            self.evaluate_seconds += clock() - parsed
+            if result is None:
+                stats.skipped += 1
+            elif result:
+                stats.matched += 1
+                yield row
+
+    def timed_writer(self, writer: CsvWriter) -> _TimedWriter:
+        return _TimedWriter(writer, self)
+
+    def to_dict(self, stats: FilterStats) -> dict[str, Any]:
+        """件数・スループット・段階ごとの時間・条件ごとの集計を JSON 用の dict にする。"""
+
+        elapsed = stats.elapsed_seconds
+        return {
+            "processed": stats.processed,
+            "matched": stats.matched,
+            "skipped": stats.skipped,
+            "bytes_read": stats.bytes_read,
+            "elapsed_seconds": elapsed,
+            "rows_per_second": stats.processed / elapsed if elapsed else 0.0,
+            "bytes_per_second": stats.bytes_read / elapsed if elapsed else 0.0,
+            "stages": {
+                "read": self.read_seconds,
+                "parse": self.parse_seconds,
+                "evaluate": self.evaluate_seconds,
+                "write": self.write_seconds,
+            },
+            "conditions": [
+                {
+                    "column": c.column,
+                    "condition": c.condition,
+                    "evaluations": c.evaluations,
+                    "hits": c.hits,
+                    "hit_rate": c.hit_rate,
+                    "seconds": c.seconds,
+                }
+                for c in self.conditions
+            ],
+        }
+
+
+class _TimedWriter:
+    """書き出しの時間を測る csv.writer の代わり。"""
+
+    def __init__(self, writer: CsvWriter, profile: FilterProfile) -> None:
+        self._writer = writer
+        self._profile = profile
+
+    def writerow(self, row: Iterable[str]) -> None:
+        start = time.perf_counter()
+        self._writer.writerow(row)
+        self._profile.write_seconds += time.perf_counter() - start
+
+    def writerows(self, rows: Iterable[Iterable[str]]) -> None:
+        # rows の取り出し（パース・評価）は書き出しの時間に含めない
+        for row in rows:
+            self.writerow(row)
+
+
+def describe_condition(condition: Condition) -> str:
+    """条件を `op:val` 形式の短い文字列にする（計測結果の表示用）。"""
+
+    if type(condition) is ContainsCondition:
+        return f"contains:{condition.needle}"
+    if type(condition) is ContainsAnyCondition:
+        return f"contains_any:({condition.automaton.size} keywords)"
+    if type(condition) is RegexCondition:
+        return f"regex:{condition.pattern.pattern}"
+    if type(condition) is CompareCondition:
+        return f"{condition.op}.{condition.kind}:{condition.operand}"
+    if type(condition) is BetweenCondition:
+        return f"between.{condition.kind}:{condition.low},{condition.high}"
+    if type(condition) is InCondition:
+        return f"in.{condition.kind}:({len(condition.values)} values)"
+    return repr(condition)
+
+
+class MeteredReader(io.BufferedIOBase):
+    """読み込んだバイト数を stats に、読み込み時間を profile に記録するストリーム。"""
+
+    def __init__(
+        self, raw: BinaryIO, stats: FilterStats, profile: FilterProfile | None
+    ) -> None:
+        super().__init__()
+        self._raw = raw
+        self._read1 = getattr(raw, "read1", raw.read)
+        self._stats = stats
+        self._profile = profile
+
+    def readable(self) -> bool:
+        return True
+
+    def fileno(self) -> int:
+        return self._raw.fileno()
+
+    def read(self, size: int | None = -1) -> bytes:
+        return self._metered(self._raw.read, size)
+
+    def read1(self, size: int = -1) -> bytes:
+        return self._metered(self._read1, size)
+
+    def close(self) -> None:
+        if not self.closed:
+            self._raw.close()
+        super().close()
+
+    def _metered(self, read: Callable[[Any], bytes], size: int | None) -> bytes:
+        start = time.perf_counter()
+        data = read(size)
+        if self._profile is not None:
+            self._profile.read_seconds += time.perf_counter() - start
+        self._stats.bytes_read += len(data)
+        return data
+
+
+class ProgressReporter:
+    """with 文の間、interval 秒ごとに進捗を stream へ出力する。"""
+
+    def __init__(
+        self,
+        stats: FilterStats,
+        interval: float = DEFAULT_PROGRESS_INTERVAL,
+        stream: IO[str] | TextIO | None = None,
+    ) -> None:
+        self._stats = stats
+        self._interval = interval
+        self._stream = stream
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self) -> ProgressReporter:
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        start = last = time.perf_counter()
+        last_rows = last_bytes = 0
+        while not self._stop.wait(self._interval):
+            now = time.perf_counter()
+            rows, nbytes = self._stats.processed, self._stats.bytes_read
+            span = now - last
+            print(
+                f"progress: elapsed={now - start:.1f}s, processed={rows}, "
+                f"matched={self._stats.matched}, "
+                f"rows/s={(rows - last_rows) / span:.0f}, "
+                f"MB/s={(nbytes - last_bytes) / span / 1e6:.1f}",
+                file=self._stream or sys.stderr,
+                flush=True,
+            )
+            last, last_rows, last_bytes = now, rows, nbytes
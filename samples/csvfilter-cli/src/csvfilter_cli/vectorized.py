@@ -0,0 +1,189 @@
+"""NumPy を使ったチャンク単位の評価（`--numpy`）。
+
+csv.reader で読んだ行を CHUNK_ROWS 行ずつまとめ、条件ごとに行の真偽値配列（マスク）を
+作って AND する。後の条件は、それまでの条件を満たした行の値だけで評価する。
+
+- decimal 型（数値オペランドの既定の型）の比較・範囲・集合は、値を float64 の配列に
+  変換してまとめて比較する。丸めは単調なので float64 で大小が決まる値はそのまま
+  判定し、オペランドと float64 で等しくなる値だけを Decimal で判定し直す。
+- それ以外の条件は値ごとに評価する。Python の文字列から NumPy の文字列配列を作る
+  コストが `in` や `==` 自体より大きく、contains などを配列にしても速くならないため。
+
+decimal 型の条件が無ければマスクにしても速くならないので、applicable() が False を返す。
+NumPy は任意の依存で、無い環境でも applicable() は False になり、呼び出し側は
+そのまま行単位の評価を使う。
+"""
+
+from __future__ import annotations
+
+import itertools
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from typing import TYPE_CHECKING, Any
+
+from .filters import (
+    BetweenCondition,
+    CompareCondition,
+    Condition,
+    InCondition,
+    RowPredicate,
+    condition_cost,
+    value_check,
+)
+
+if TYPE_CHECKING:
+    from .io import FilterStats
+
+try:
+    import numpy as np
+except ImportError:  # NumPy は任意の依存
+    np = None  # type: ignore[assignment]
+
+# 行のリストを多く抱えるほど csv.reader の読み込みが遅くなる（GC とキャッシュ効率）ため、
+# NumPy の呼び出しのオーバーヘッドがならせる範囲で小さくする
+CHUNK_ROWS = 512
+
+_MaskFunction = Callable[[list[str]], Any]  # 値の一覧 -> bool の ndarray
+
+
+def available() -> bool:
+    """NumPy を読み込めたか。"""
+    return np is not None
+
+
+def applicable(bindings: Sequence[tuple[int, Condition]]) -> bool:
+    """bindings をチャンク単位で評価すると速くなるか（NumPy があり、decimal 型の条件を含む）。"""
+    return available() and any(_is_decimal(condition) for _, condition in bindings)
+
+
+def iter_matches(
+    rows: Iterable[list[str]],
+    bindings: Sequence[tuple[int, Condition]],
+    predicate: RowPredicate,
+    stats: FilterStats,
+    *,
+    skip_blank: bool = False,
+) -> Iterator[list[str]]:
+    """条件に一致する行を元の順序で返しつつ stats を更新する。
+
+    predicate は bindings をコンパイルした行述語。参照する列がすべてある行は
+    チャンクごとにマスクで評価し、短い行だけ predicate で評価する（条件の指定順で
+    スキップか不一致かが決まるため）。
+    """
+
+    need = max((index for index, _ in bindings), default=-1) + 1
+    checks = [
+        (index, _mask_function(condition))
+        for index, condition in sorted(bindings, key=lambda b: condition_cost(b[1]))
+    ]
+    if skip_blank:
+        rows = (row for row in rows if row)  # 空行はデータ行として数えない
+    rows = iter(rows)
+    # 件数は返す行ごとにその行までを数え、途中で読むのをやめた場合（limit）も
+    # 行単位の経路と揃える
+    while chunk := list(itertools.islice(rows, CHUNK_ROWS)):
+        full = [row for row in chunk if len(row) >= need]
+        keep = _evaluate(full, checks)
+        if len(full) == len(chunk):
+            start = stats.processed
+            for position in itertools.compress(range(len(chunk)), keep):
+                stats.processed = start + position + 1
+                stats.matched += 1
+                yield chunk[position]
+            stats.processed = start + len(chunk)
+            continue
+        kept = iter(keep)
+        for row in chunk:
+            stats.processed += 1
+            if len(row) >= need:
+                if not next(kept):
+                    continue
+            else:
+                result = predicate(row)
+                if result is None:
+                    stats.skipped += 1
+                if not result:
+                    continue
+            stats.matched += 1
+            yield row
+
+
+def _evaluate(
+    rows: list[list[str]], checks: list[tuple[int, _MaskFunction]]
+) -> list[bool]:
+    """すべての条件を満たすかを行ごとに返す。rows は参照する列がすべてある行。"""
+
+    alive = np.ones(len(rows), dtype=bool)
+    for index, mask in checks:
+        picked = np.flatnonzero(alive)
+        if not len(picked):
+            break
+        if len(picked) == len(rows):
+            values = [row[index] for row in rows]
+        else:
+            values = [rows[k][index] for k in picked.tolist()]
+        alive[picked] = mask(values)
+    return alive.tolist()
+
+
+def _is_decimal(condition: Condition) -> bool:
+    return (
+        type(condition) in (CompareCondition, BetweenCondition, InCondition)
+        and condition.kind == "decimal"  # type: ignore[attr-defined]
+    )
+
+
+def _mask_function(condition: Condition) -> _MaskFunction:
+    if _is_decimal(condition):
+        return _decimal_mask(condition)
+
+    check = value_check(condition)
+    return lambda values: np.fromiter(map(check, values), bool, len(values))
+
+
+def _decimal_mask(condition: Condition) -> _MaskFunction:
+    """decimal 型の条件を float64 で判定するマスク関数を返す。
+
+    float64 で判定できない値（オペランドと等しくなるもの）は Decimal で判定し直す。
+    float では読めない値（sNaN など）を含む場合は、その値の一覧をすべて Decimal で判定する。
+    """
+
+    exact = value_check(condition)
+    if type(condition) is CompareCondition:
+        ties = [float(condition.operand)]
+        compare = _UFUNCS[condition.op]
+        approx = lambda floats: compare(floats, ties[0])  # noqa: E731
+    elif type(condition) is BetweenCondition:
+        ties = [float(condition.low), float(condition.high)]
+        approx = lambda floats: (ties[0] <= floats) & (floats <= ties[1])  # noqa: E731
+    else:
+        # 集合に含まれうる値はすべてオペランドと等しくなるので、判定し直しに任せる
+        ties = [float(value) for value in condition.values]  # type: ignore[attr-defined]
+        approx = lambda floats: np.zeros(len(floats), dtype=bool)  # noqa: E731
+
+    def mask(values: list[str]) -> Any:
+        try:
+            # 空文字は NaN に置き換え、Decimal と同じく変換できない値として扱う
+            floats = np.array([value or "nan" for value in values], dtype=np.float64)
+        except ValueError:
+            return np.fromiter(map(exact, values), bool, len(values))
+        result = approx(floats) & ~np.isnan(floats)
+        recheck = np.flatnonzero(np.isin(floats, ties)).tolist()
+        if recheck:
+            result[recheck] = [bool(exact(values[k])) for k in recheck]
+        return result
+
+    return mask
+
+
+_UFUNCS: dict[str, Any] = (
+    {}
+    if np is None
+    else {
+        "eq": np.equal,
+        "ne": np.not_equal,
+        "gt": np.greater,
+        "ge": np.greater_equal,
+        "lt": np.less,
+        "le": np.less_equal,
+    }
+)
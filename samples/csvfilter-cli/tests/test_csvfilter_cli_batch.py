@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+
+import pytest
+
+from csvfilter_cli.batch import Query, filter_csv_multi
+from csvfilter_cli.expr import parse_where
+from csvfilter_cli.filters import build_condition
+from csvfilter_cli.io import CsvFilterError, FilterBinding, filter_csv
+
+DATA = (
+    "name,status,city,score\n"
+    "Alice,active,Tokyo,89\n"
+    "Bob,inactive,Osaka,75\n"
+    "\n"
+    "Carol,active\n"
+    "Dave,active,Tokyo,60,extra\n"
+)
+
+
+def binding(text: str) -> FilterBinding:
+    col, op, val = text.split(":", 2)
+    return FilterBinding(column=col, condition=build_condition(op, val))
+
+
+def test_filter_csv_multi_matches_individual_runs(tmp_path: Path) -> None:
+    src = tmp_path / "input.csv"
+    src.write_text(DATA, encoding="utf-8")
+    queries = [
+        Query(
+            name="active",
+            output_path=tmp_path / "a.csv",
+            filters=[binding("status:eq:active")],
+        ),
+        Query(
+            name="tokyo_or_high",
+            output_path=tmp_path / "b.csv",
+            where=parse_where("city:eq:Tokyo or score:gt:80", binding),
+            select=["name", "score"],
+        ),
+        Query(
+            name="osaka",
+            output_path=tmp_path / "c.csv",
+            filters=[binding("city:eq:Osaka")],
+        ),
+    ]
+    common = dict(delimiter=",", quotechar='"', no_header=False)
+
+    results = filter_csv_multi(input_path=src, queries=queries, **common)
+
+    assert list(results) == ["active", "tokyo_or_high", "osaka"]
+    for query in queries:
+        expected_out = tmp_path / f"expected-{query.name}.csv"
+        expected = filter_csv(
+            input_path=src,
+            output_path=expected_out,
+            filters=query.filters,
+            where=query.where,
+            select=query.select,
+            **common,
+        )
+        assert results[query.name] == expected
+        assert query.output_path.read_bytes() == expected_out.read_bytes()
+
+
+def test_filter_csv_multi_short_rows_match_individual_runs(tmp_path: Path) -> None:
+    src = tmp_path / "input.csv"
+    src.write_text("a,b,c\n2,x\n1,y,z\n", encoding="utf-8")
+    queries = [
+        Query(
+            name="and_only",
+            output_path=tmp_path / "a.csv",
+            filters=[binding("a:eq:1"), binding("c:contains:z")],
+        ),
+        Query(
+            name="where",
+            output_path=tmp_path / "b.csv",
+            where=parse_where("a:eq:1 and c:contains:z", binding),
+        ),
+    ]
+    common = dict(delimiter=",", quotechar='"', no_header=False)
+
+    results = filter_csv_multi(input_path=src, queries=queries, **common)
+
+    for query in queries:
+        expected = filter_csv(
+            input_path=src,
+            output_path=tmp_path / f"expected-{query.name}.csv",
+            filters=query.filters,
+            where=query.where,
+            **common,
+        )
+        assert results[query.name] == expected
+    assert results["and_only"].skipped == 0
+    assert results["where"].skipped == 1
+
+
+@dataclass(frozen=True)
+class CountingCondition:
+    needle: str
+    calls: list[str]
+
+    def matches(self, value: str) -> bool:
+        self.calls.append(value)
+        return self.needle in value
+
+    def __hash__(self) -> int:
+        return hash(self.needle)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, CountingCondition) and other.needle == self.needle
+
+
+def test_filter_csv_multi_evaluates_shared_conditions_once_per_row(
+    tmp_path: Path,
+) -> None:
+    src = tmp_path / "input.csv"
+    src.write_text("name,status\nAlice,active\nBob,inactive\n", encoding="utf-8")
+    calls: list[str] = []
+    shared = FilterBinding(column="status", condition=CountingCondition("act", calls))
+    queries = [
+        Query("q1", tmp_path / "1.csv", filters=[shared, binding("name:eq:Alice")]),
+        Query("q2", tmp_path / "2.csv", filters=[shared, binding("name:eq:Bob")]),
+        Query("q3", tmp_path / "3.csv", filters=[shared]),
+    ]
+
+    results = filter_csv_multi(
+        input_path=src, queries=queries, delimiter=",", quotechar='"', no_header=False
+    )
+
+    assert calls == ["active", "inactive"]
+    assert [r.matched for r in results.values()] == [1, 1, 2]
+
+
+def test_filter_csv_multi_rejects_duplicate_names(tmp_path: Path) -> None:
+    src = tmp_path / "input.csv"
+    src.write_text(DATA, encoding="utf-8")
+    queries = [
+        Query("q", tmp_path / f"{i}.csv", filters=[binding("city:eq:Tokyo")])
+        for i in range(2)
+    ]
+
+    with pytest.raises(CsvFilterError, match="重複"):
+        filter_csv_multi(
+            input_path=src,
+            queries=queries,
+            delimiter=",",
+            quotechar='"',
+            no_header=False,
+        )
+
+
+@pytest.mark.parametrize("outputs", [["a.csv", "./a.csv"], [None, None]])
+def test_filter_csv_multi_rejects_duplicate_outputs(
+    tmp_path: Path, outputs: list[str | None]
+) -> None:
+    src = tmp_path / "input.csv"
+    src.write_text(DATA, encoding="utf-8")
+    queries = [
+        Query(
+            f"q{i}",
+            None if out is None else tmp_path / out,
+            filters=[binding("city:eq:Tokyo")],
+        )
+        for i, out in enumerate(outputs)
+    ]
+
+    with pytest.raises(CsvFilterError, match="出力先が重複"):
+        filter_csv_multi(
+            input_path=src,
+            queries=queries,
+            delimiter=",",
+            quotechar='"',
+            no_header=False,
+        )
+    assert not (tmp_path / "a.csv").exists()
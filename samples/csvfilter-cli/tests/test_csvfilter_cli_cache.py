@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import csv
+import errno
+import io
+import os
+from pathlib import Path
+
+import pytest
+
+from csvfilter_cli import cache
+from csvfilter_cli.filters import build_condition
+from csvfilter_cli.io import FilterBinding, filter_csv
+
+HEADER_CSV = (
+    "id,name,city,note\n"
+    "1,Alice,Tokyo,plain\n"
+    '2,Bob,Osaka,"multi\nline, ""quoted"""\n'
+    "\n"
+    "3,Carol\n"
+    "4,Dave,Tokyo,x,extra\n"
+    "5,Eve,Kyoto,東京タワー\n"
+    "6,Frank,Tokyo\n"
+    "7,Grace,Osaka\n"
+)
+NO_HEADER_CSV = "a,b\nc\n\nb,active,x,y\nactive\n"
+
+
+@pytest.fixture
+def builds(monkeypatch: pytest.MonkeyPatch) -> list[Path]:
+    """キャッシュを作成した回数を記録する。"""
+    built: list[Path] = []
+    original = cache.build_entry
+
+    def recording(cache_dir, path, *args, **kwargs):  # type: ignore[no-untyped-def]
+        built.append(path)
+        return original(cache_dir, path, *args, **kwargs)
+
+    monkeypatch.setattr("csvfilter_cli.io.build_entry", recording)
+    return built
+
+
+@pytest.mark.parametrize(
+    ("text", "no_header", "filters", "select"),
+    [
+        (HEADER_CSV, False, [("city", "eq", "Tokyo")], None),
+        (HEADER_CSV, False, [("name", "contains", "a"), ("note", "ne", "zzz")], None),
+        (HEADER_CSV, False, [("note", "contains", "タワー")], ["note", "id"]),
+        (HEADER_CSV, False, [("id", "gt.int", "2"), ("city", "regex", "^(T|K)")], None),
+        # ヘッダーなしでは列を 0 始まりの番号で指定する
+        (NO_HEADER_CSV, True, [(1, "contains", "ct")], None),
+        (NO_HEADER_CSV, True, [(0, "contains", "")], [3, 0]),
+    ],
+)
+# 2 行ずつにすると、評価の区切りをまたぐ場合も確かめられる
+@pytest.mark.parametrize("match_rows", [cache.MATCH_ROWS, 2])
+def test_cached_filter_matches_full_scan(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    builds: list[Path],
+    match_rows: int,
+    text: str,
+    no_header: bool,
+    filters: list[tuple[str | int, str, str]],
+    select: list[str | int] | None,
+) -> None:
+    monkeypatch.setattr(cache, "MATCH_ROWS", match_rows)
+    src = tmp_path / "input.csv"
+    src.write_text(text, encoding="utf-8")
+    bindings = [
+        FilterBinding(column=col, condition=build_condition(op, val))
+        for col, op, val in filters
+    ]
+    common = dict(
+        input_path=src,
+        filters=bindings,
+        delimiter=",",
+        quotechar='"',
+        no_header=no_header,
+        select=select,
+    )
+
+    scan = filter_csv(output_path=tmp_path / "scan.csv", **common)  # type: ignore[arg-type]
+    outputs = []
+    for i in range(2):
+        out = tmp_path / f"cached-{i}.csv"
+        stats = filter_csv(
+            output_path=out, cache_dir=tmp_path / "cache", **common  # type: ignore[arg-type]
+        )
+        assert stats == scan
+        outputs.append(out.read_bytes())
+
+    assert len(builds) == 1  # 2 回目はキャッシュを使う
+    assert outputs == [(tmp_path / "scan.csv").read_bytes()] * 2
+
+
+@pytest.mark.parametrize("match_rows", [cache.MATCH_ROWS, 2])
+@pytest.mark.parametrize("limit", [1, 2, 3])
+def test_cached_filter_with_limit_matches_full_scan(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, match_rows: int, limit: int
+) -> None:
+    monkeypatch.setattr(cache, "MATCH_ROWS", match_rows)
+    src = tmp_path / "input.csv"
+    src.write_text(HEADER_CSV, encoding="utf-8")
+    common = dict(
+        input_path=src,
+        filters=[
+            FilterBinding(column="name", condition=build_condition("contains", "a")),
+            FilterBinding(column="note", condition=build_condition("ne", "zzz")),
+        ],
+        delimiter=",",
+        quotechar='"',
+        no_header=False,
+        limit=limit,
+    )
+
+    scan = filter_csv(output_path=tmp_path / "scan.csv", **common)  # type: ignore[arg-type]
+    for i in range(2):  # 作成した回とキャッシュを使う回
+        out = tmp_path / f"cached-{i}.csv"
+        stats = filter_csv(
+            output_path=out, cache_dir=tmp_path / "cache", **common  # type: ignore[arg-type]
+        )
+        assert stats == scan
+        assert out.read_bytes() == (tmp_path / "scan.csv").read_bytes()
+
+
+def test_cache_is_rebuilt_when_source_changes(
+    tmp_path: Path, builds: list[Path]
+) -> None:
+    src = tmp_path / "input.csv"
+    src.write_text(HEADER_CSV, encoding="utf-8")
+    filters = [FilterBinding(column="city", condition=build_condition("eq", "Kyoto"))]
+    common = dict(
+        input_path=src,
+        output_path=tmp_path / "out.csv",
+        filters=filters,
+        delimiter=",",
+        quotechar='"',
+        no_header=False,
+        cache_dir=tmp_path / "cache",
+    )
+
+    assert filter_csv(**common).matched == 1  # type: ignore[arg-type]
+    src.write_text(HEADER_CSV + "8,Heidi,Kyoto\n", encoding="utf-8")
+    assert filter_csv(**common).matched == 2  # type: ignore[arg-type]
+    assert len(builds) == 2
+
+
+def test_build_entry_uses_entry_published_by_concurrent_writer(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    src = tmp_path / "input.csv"
+    src.write_text(HEADER_CSV, encoding="utf-8")
+    cache_dir = tmp_path / "cache"
+    header, *rows = csv.reader(io.StringIO(HEADER_CSV))
+    dialect = dict(delimiter=",", quotechar='"', no_header=False)
+    original = cache._write_columns
+
+    def racing(directory, rows, width):  # type: ignore[no-untyped-def]
+        # 変換している間に、別のプロセスが同じエントリを作成して公開する
+        monkeypatch.setattr(cache, "_write_columns", original)
+        cache.build_entry(cache_dir, src, iter(rows), header, **dialect).close()  # type: ignore[arg-type]
+        return original(directory, rows, width)
+
+    monkeypatch.setattr(cache, "_write_columns", racing)
+    with cache.build_entry(cache_dir, src, iter(rows), header, **dialect) as entry:  # type: ignore[arg-type]
+        assert entry.rows == 7
+        assert entry.row(0) == ["1", "Alice", "Tokyo", "plain"]
+
+    assert [d.name for d in cache_dir.iterdir()] == [
+        cache.entry_key(src, ",", '"', False)
+    ]
+
+
+def test_cache_build_failure_falls_back_to_scan(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    src = tmp_path / "input.csv"
+    src.write_text(HEADER_CSV, encoding="utf-8")
+    common = dict(
+        input_path=src,
+        filters=[FilterBinding("city", build_condition("eq", "Tokyo"))],
+        delimiter=",",
+        quotechar='"',
+        no_header=False,
+    )
+    scan = filter_csv(output_path=tmp_path / "scan.csv", **common)  # type: ignore[arg-type]
+
+    def full(directory, rows, width):  # type: ignore[no-untyped-def]
+        raise OSError(errno.ENOSPC, os.strerror(errno.ENOSPC))
+
+    monkeypatch.setattr(cache, "_write_columns", full)
+    stats = filter_csv(
+        output_path=tmp_path / "out.csv", cache_dir=tmp_path / "cache", **common  # type: ignore[arg-type]
+    )
+
+    assert stats == scan
+    out = (tmp_path / "out.csv").read_bytes()
+    assert out == (tmp_path / "scan.csv").read_bytes()
+    assert list((tmp_path / "cache").iterdir()) == []
+
+
+def test_evict_removes_least_recently_used_entries(tmp_path: Path) -> None:
+    cache_dir = tmp_path / "cache"
+    sources = []
+    for i in range(3):
+        src = tmp_path / f"input{i}.csv"
+        src.write_text(HEADER_CSV, encoding="utf-8")
+        sources.append(src)
+        filter_csv(
+            input_path=src,
+            output_path=tmp_path / "out.csv",
+            filters=[FilterBinding("city", build_condition("eq", "Tokyo"))],
+            delimiter=",",
+            quotechar='"',
+            no_header=False,
+            cache_dir=cache_dir,
+        )
+    entries = {
+        src: cache_dir / cache.entry_key(src, ",", '"', False) for src in sources
+    }
+    # 0 番目を最近使ったことにする
+    for age, src in ((3, sources[1]), (2, sources[2]), (1, sources[0])):
+        meta = entries[src] / "meta.json"
+        mtime = meta.stat().st_mtime_ns - age * 10**9
+        os.utime(meta, ns=(mtime, mtime))
+    entry_size = sum(f.stat().st_size for f in entries[sources[0]].iterdir())
+
+    cache.evict(cache_dir, entry_size * 2)
+
+    assert [entries[src].exists() for src in sources] == [True, False, True]
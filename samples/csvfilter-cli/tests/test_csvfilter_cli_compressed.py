@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import bz2
+import gzip
+import lzma
+from pathlib import Path
+
+import pytest
+
+from csvfilter_cli import compressed, parallel
+from csvfilter_cli.filters import build_condition
+from csvfilter_cli.io import CsvFilterError, FilterBinding, filter_csv
+
+TEXT = "name,status\n" + "Alice,active\nBob,inactive\n" * 1000
+EXPECTED = "name,status\n" + "Alice,active\n" * 1000
+
+
+def _run(src: Path, dst: Path):
+    return filter_csv(
+        input_path=src,
+        output_path=dst,
+        filters=[
+            FilterBinding(column="status", condition=build_condition("regex", "^act"))
+        ],
+        delimiter=",",
+        quotechar='"',
+        no_header=False,
+    )
+
+
+@pytest.mark.parametrize(
+    ("suffix", "compress"),
+    [(".gz", gzip.compress), (".bz2", bz2.compress), (".xz", lzma.compress)],
+)
+def test_compressed_input_is_decompressed(
+    tmp_path: Path, suffix: str, compress
+) -> None:
+    src = tmp_path / f"input.csv{suffix}"
+    src.write_bytes(compress(TEXT.encode("utf-8")))
+    dst = tmp_path / "out.csv"
+
+    stats = _run(src, dst)
+
+    assert (stats.processed, stats.matched) == (2000, 1000)
+    assert stats.decompress_seconds > 0
+    assert dst.read_text(encoding="utf-8") == EXPECTED
+
+
+def test_codec_is_detected_from_magic_bytes(tmp_path: Path) -> None:
+    src = tmp_path / "input.csv"  # 拡張子は .csv のまま
+    src.write_bytes(gzip.compress(TEXT.encode("utf-8")))
+    dst = tmp_path / "out.csv.gz"
+
+    _run(src, dst)
+
+    assert compressed.detect_codec(src) == "gzip"
+    assert gzip.decompress(dst.read_bytes()).decode("utf-8") == EXPECTED
+
+
+def test_corrupt_input_raises_filter_error(tmp_path: Path) -> None:
+    src = tmp_path / "input.csv.gz"
+    src.write_bytes(gzip.compress(TEXT.encode("utf-8"))[:-20])
+
+    with pytest.raises(CsvFilterError):
+        _run(src, tmp_path / "out.csv")
+
+
+def test_parallel_rejects_compressed_input(tmp_path: Path) -> None:
+    src = tmp_path / "input.csv.gz"
+    src.write_bytes(gzip.compress(TEXT.encode("utf-8")))
+
+    with pytest.raises(CsvFilterError):
+        parallel.filter_csv_parallel(
+            input_path=src,
+            output_path=tmp_path / "out.csv",
+            filters=[
+                FilterBinding(column="status", condition=build_condition("regex", "a"))
+            ],
+            delimiter=",",
+            quotechar='"',
+            no_header=False,
+            jobs=2,
+        )
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import pytest
+
+from csvfilter_cli import expr, filters
+
+
+def parse(text: str) -> expr.Expr[str]:
+    return expr.parse_where(text, lambda t: t)
+
+
+def test_parse_where_precedence_not_and_or() -> None:
+    node = parse("a or not b and c")
+    assert node == expr.Or(
+        (expr.Term("a"), expr.And((expr.Not(expr.Term("b")), expr.Term("c"))))
+    )
+
+
+def test_parse_where_parentheses_and_quotes() -> None:
+    node = parse("(a OR b) and 'name:contains:x y (z)' and \"or\"")
+    assert node == expr.And(
+        (
+            expr.Or((expr.Term("a"), expr.Term("b"))),
+            expr.Term("name:contains:x y (z)"),
+            expr.Term("or"),  # 引用符で囲めばキーワードではなく項になる
+        )
+    )
+
+
+@pytest.mark.parametrize(
+    "text", ["", "a and", "(a or b", "a b", "not", "a )", "'unterminated"]
+)
+def test_parse_where_syntax_errors(text: str) -> None:
+    with pytest.raises(ValueError):
+        parse(text)
+
+
+class Recording:
+    def __init__(self, name: str, result: bool, calls: list[str], cost: int) -> None:
+        self.name = name
+        self.result = result
+        self.calls = calls
+        self.cost = cost
+
+    def matches(self, value: str) -> bool:
+        self.calls.append(self.name)
+        return self.result
+
+
+def test_compile_expression_short_circuits_in_cost_order(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(filters, "condition_cost", lambda c: c.cost)
+    monkeypatch.setattr(expr, "condition_cost", lambda c: c.cost)
+    calls: list[str] = []
+    slow = Recording("slow", True, calls, 10)
+    fast = Recording("fast", True, calls, 1)
+    node = expr.Or((expr.Term((0, slow)), expr.Term((0, fast))))
+
+    assert expr.compile_expression(node)(["v"]) is True
+    assert calls == ["fast"]
+
+
+def test_compile_expression_evaluates_shared_subexpression_once() -> None:
+    calls: list[str] = []
+    shared = expr.Term((0, Recording("shared", False, calls, 1)))
+    other = expr.Term((1, Recording("other", True, calls, 1)))
+    # (shared or other) and not shared
+    node = expr.And((expr.Or((shared, other)), expr.Not(shared)))
+
+    predicate = expr.compile_expression(node)
+    assert predicate(["a", "b"]) is True
+    assert calls.count("shared") == 1
+
+    calls.clear()
+    assert predicate(["c", "d"]) is True  # 別の行では改めて評価する
+    assert calls.count("shared") == 1
+
+
+def test_compile_expression_skips_short_rows() -> None:
+    node = expr.Or(
+        (
+            expr.Term((0, filters.ContainsCondition("a"))),
+            expr.Term((2, filters.ContainsCondition("z"))),
+        )
+    )
+    predicate = expr.compile_expression(node)
+    assert predicate(["a", "b"]) is None
+    assert predicate(["a", "b", "c"]) is True
+    assert predicate(["x", "b", "c"]) is False
+
+
+def test_flatten_removes_double_negation_and_nesting() -> None:
+    node = parse("not not (a and (b and c))")
+    assert expr._flatten(node) == expr.And(
+        (expr.Term("a"), expr.Term("b"), expr.Term("c"))
+    )
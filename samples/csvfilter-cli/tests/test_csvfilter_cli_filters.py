@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import datetime as dt
+from pathlib import Path
 
 import pytest
 
@@ -27,3 +29,135 @@ def test_build_condition_invalid_regex_error_message() -> None:
     with pytest.raises(ValueError) as excinfo:
         filters.build_condition("regex", "(")
     assert "正規表現が不正" in str(excinfo.value)
+
+
+def test_compile_row_predicate_checks_cheap_conditions_first() -> None:
+    calls: list[str] = []
+
+    class Recording:
+        def __init__(self, name: str, result: bool) -> None:
+            self.name = name
+            self.result = result
+
+        def matches(self, value: str) -> bool:
+            calls.append(self.name)
+            return self.result
+
+    predicate = filters.compile_row_predicate(
+        [
+            (0, filters.build_condition("regex", "^x")),
+            (1, Recording("custom", False)),
+            (1, filters.build_condition("contains", "b")),
+        ]
+    )
+
+    assert predicate(["xa", "b"]) is False
+    assert calls == ["custom"]  # contains (cost 1) -> custom (cost 5) で打ち切り
+
+
+def test_compile_row_predicate_merges_regexes_on_same_column() -> None:
+    predicate = filters.compile_row_predicate(
+        [
+            (0, filters.build_condition("regex", "^act")),
+            (0, filters.build_condition("regex", "ive$")),
+            (0, filters.build_condition("regex", r"(a)\1")),  # 後方参照は統合しない
+        ]
+    )
+
+    assert predicate(["active aa ive"]) is True
+    assert predicate(["inactive aa"]) is False
+    assert predicate(["active"]) is False
+
+
+def test_compile_row_predicate_short_rows_keep_declared_order() -> None:
+    predicate = filters.compile_row_predicate(
+        [
+            (2, filters.build_condition("contains", "z")),
+            (0, filters.build_condition("regex", "^a")),
+        ]
+    )
+
+    assert predicate(["a", "b"]) is None  # 先に指定された 3 列目が無いのでスキップ
+    assert predicate(["b", "b", "z"]) is False
+    assert predicate(["a", "b", "z"]) is True
+
+
+@pytest.mark.parametrize(
+    ("operator", "operand", "value", "expected"),
+    [
+        ("gt", "1000", "1000.5", True),
+        ("gt", "1000", "999", False),
+        ("le.int", "10", "10", True),
+        ("ne.float", "1.5", "2", True),
+        ("eq", "active", "active", True),
+        ("ge", "2025-01-01", "2024-12-31", False),
+        ("between", "2025-01-01,2025-01-31", "2025-01-15", True),
+        ("in", "1,2,3", "2.0", True),
+        ("gt.int", "10", "abc", False),  # 変換できない値は不一致
+        ("lt", "5", "NaN", False),
+    ],
+)
+def test_typed_conditions(
+    operator: str, operand: str, value: str, expected: bool
+) -> None:
+    assert filters.build_condition(operator, operand).matches(value) is expected
+
+
+def test_typed_condition_infers_and_validates_kind() -> None:
+    cond = filters.build_condition("between", "2025-01-01,2025-02-01")
+    assert cond == filters.BetweenCondition(
+        "date", dt.date(2025, 1, 1), dt.date(2025, 2, 1)
+    )
+    with pytest.raises(ValueError):
+        filters.build_condition("gt.int", "1.5")
+    with pytest.raises(ValueError):
+        filters.build_condition("gt.money", "1")
+    with pytest.raises(ValueError):
+        filters.build_condition("between", "1")
+
+
+def test_in_condition_loads_values_from_file(tmp_path: Path) -> None:
+    values = tmp_path / "ids.txt"
+    values.write_text("".join(f"{i}\n" for i in range(10000)), encoding="utf-8")
+
+    cond = filters.build_condition("in.int", f"@{values}")
+
+    assert isinstance(cond, filters.InCondition)
+    assert len(cond.values) == 10000
+    assert cond.matches("9999")
+    assert not cond.matches("10000")
+
+
+def test_compile_row_predicate_parses_each_typed_field_once(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    calls: list[str] = []
+
+    def counting_int(text: str) -> int:
+        calls.append(text)
+        return int(text)
+
+    bindings = [
+        (0, filters.build_condition("ge.int", "10")),
+        (0, filters.build_condition("lt.int", "20")),
+        (0, filters.build_condition("ne.int", "15")),
+    ]
+    monkeypatch.setitem(filters.VALUE_TYPES, "int", counting_int)
+    predicate = filters.compile_row_predicate(bindings)
+
+    assert predicate(["12"]) is True
+    assert predicate(["15"]) is False
+    assert calls == ["12", "15"]
+
+
+def test_contains_any_condition_loads_needles_from_file(tmp_path: Path) -> None:
+    blocklist = tmp_path / "blocklist.txt"
+    blocklist.write_text(
+        "".join(f"spam{i:05d}\n" for i in range(10000)), encoding="utf-8"
+    )
+
+    cond = filters.build_condition("contains_any", f"@{blocklist}")
+
+    assert cond.matches("from spam09999@example.com")
+    assert not cond.matches("from spam1@example.com")
+    assert filters.build_condition("contains_any", "foo,bar").matches("xbarx")
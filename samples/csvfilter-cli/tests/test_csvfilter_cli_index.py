@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+
+from csvfilter_cli import io as csv_io
+from csvfilter_cli.filters import build_condition
+from csvfilter_cli.index import IndexFileError, build_index, load_index, sidecar_path
+from csvfilter_cli.io import FilterBinding, filter_csv
+
+DATA = (
+    "id,name,city,note\n"
+    "1,Alice,Tokyo,plain\n"
+    '2,Bob,Osaka,"multi\nline, ""quoted"""\n'
+    "\n"
+    "3,Carol\n"
+    "4,Dave,Tokyo,x,extra\n"
+    "5,Eve,Kyoto,tokyo tower\n"
+    "6,Frank,Tokyo\n"
+    "7,Grace,Osaka\n"
+)
+
+
+def run(src: Path, dst: Path, filters: list[FilterBinding], **kwargs: object):
+    return filter_csv(
+        input_path=src,
+        output_path=dst,
+        filters=filters,
+        delimiter=",",
+        quotechar='"',
+        no_header=False,
+        **kwargs,  # type: ignore[arg-type]
+    )
+
+
+@pytest.fixture
+def spy_reads(monkeypatch: pytest.MonkeyPatch) -> list[int]:
+    """索引経由で読んだレコード数を記録する。"""
+    reads: list[int] = []
+    original = csv_io.read_records
+
+    def recording(path, offsets, quotechar):  # type: ignore[no-untyped-def]
+        offsets = list(offsets)
+        reads.append(len(offsets))
+        return original(path, offsets, quotechar)
+
+    monkeypatch.setattr(csv_io, "read_records", recording)
+    return reads
+
+
+@pytest.mark.parametrize(
+    ("column", "op", "value", "select"),
+    [
+        ("city", "eq", "Tokyo", None),
+        ("city", "in", "Osaka,Kyoto", ["name"]),
+        ("note", "contains", "line", None),
+        ("note", "contains", "tokyo", ["note", "id"]),
+        ("city", "eq", "Nowhere", None),
+    ],
+)
+def test_indexed_filter_matches_full_scan(
+    tmp_path: Path,
+    spy_reads: list[int],
+    column: str,
+    op: str,
+    value: str,
+    select: list[str | int] | None,
+) -> None:
+    src = tmp_path / "input.csv"
+    src.write_text(DATA, encoding="utf-8")
+    # 短い行は指定順に評価され、欠けた列より前の条件で不一致ならスキップにならない
+    filters = [
+        FilterBinding(column="id", condition=build_condition("ne", "4")),
+        FilterBinding(column=column, condition=build_condition(op, value)),
+        FilterBinding(column="note", condition=build_condition("ne", "zzz")),
+    ]
+
+    scan = run(src, tmp_path / "scan.csv", filters, select=select)
+    assert spy_reads == []
+
+    build_index(
+        src, ["city", "note"], delimiter=",", quotechar='"', no_header=False, ngram=3
+    )
+    indexed = run(src, tmp_path / "indexed.csv", filters, select=select)
+
+    assert len(spy_reads) == 1
+    assert spy_reads[0] <= 6  # 候補と短い行だけを読む
+    assert indexed == scan
+    indexed_bytes = (tmp_path / "indexed.csv").read_bytes()
+    assert indexed_bytes == (tmp_path / "scan.csv").read_bytes()
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3])
+def test_indexed_filter_with_limit_counts_like_full_scan(
+    tmp_path: Path, spy_reads: list[int], limit: int
+) -> None:
+    src = tmp_path / "input.csv"
+    src.write_text(DATA, encoding="utf-8")
+    filters = [
+        FilterBinding(column="city", condition=build_condition("in", "Kyoto,Osaka")),
+        FilterBinding(column="note", condition=build_condition("ne", "zzz")),
+    ]
+
+    scan = run(src, tmp_path / "scan.csv", filters, limit=limit)
+    build_index(src, ["city"], delimiter=",", quotechar='"', no_header=False)
+    indexed = run(src, tmp_path / "indexed.csv", filters, limit=limit)
+
+    assert len(spy_reads) == 1
+    # 打ち切った行までの行数を数える（読まなかった行も含む）
+    assert indexed == scan
+    indexed_bytes = (tmp_path / "indexed.csv").read_bytes()
+    assert indexed_bytes == (tmp_path / "scan.csv").read_bytes()
+
+
+def test_index_is_ignored_when_source_changes(
+    tmp_path: Path, spy_reads: list[int]
+) -> None:
+    src = tmp_path / "input.csv"
+    src.write_text(DATA, encoding="utf-8")
+    build_index(src, ["city"], delimiter=",", quotechar='"', no_header=False)
+    filters = [FilterBinding(column="city", condition=build_condition("eq", "Tokyo"))]
+
+    # 更新時刻だけが変わった場合は内容のハッシュで新しさを確かめて使う
+    stat = src.stat()
+    os.utime(src, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    run(src, tmp_path / "touched.csv", filters)
+    assert len(spy_reads) == 1
+
+    # 同じサイズで内容が変わった場合は使わない
+    src.write_text(DATA.replace("Alice", "Alicf"), encoding="utf-8")
+    os.utime(src, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10**9))
+    stats = run(src, tmp_path / "changed.csv", filters)
+    assert len(spy_reads) == 1
+    assert stats.matched == 3
+
+
+def test_load_index_requires_same_dialect(tmp_path: Path) -> None:
+    src = tmp_path / "input.csv"
+    src.write_text(DATA, encoding="utf-8")
+    build_index(src, ["city"], delimiter=",", quotechar='"', no_header=False)
+
+    assert sidecar_path(src).exists()
+    assert load_index(src, delimiter=";", quotechar='"', no_header=False) is None
+    with load_index(src, delimiter=",", quotechar='"', no_header=False) as index:  # type: ignore[union-attr]
+        assert index.records == 7  # 空行は数えない
+
+
+def test_build_index_unknown_column_raises(tmp_path: Path) -> None:
+    src = tmp_path / "input.csv"
+    src.write_text(DATA, encoding="utf-8")
+
+    with pytest.raises(IndexFileError, match="カラムが存在しません: nope"):
+        build_index(src, ["nope"], delimiter=",", quotechar='"', no_header=False)
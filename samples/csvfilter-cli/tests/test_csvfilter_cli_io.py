@@ -1,12 +1,16 @@
 from __future__ import annotations
 
+import gzip
+from collections.abc import Callable, Iterator
+from io import StringIO
 from pathlib import Path
 
 import pytest
 
 
+from csvfilter_cli import io
 from csvfilter_cli.filters import build_condition
-from csvfilter_cli.io import CsvFilterError, FilterBinding, filter_csv
+from csvfilter_cli.io import CsvFilterError, FilterBinding, filter_csv, filter_rows
 
 
 def test_filter_csv_with_header(tmp_path: Path) -> None:
@@ -73,3 +77,333 @@ def test_filter_csv_missing_header_column_raises(tmp_path: Path) -> None:
             quotechar='"',
             no_header=False,
         )
+
+
+def test_filter_csv_with_header_pads_short_rows_and_skips_blank_lines(
+    tmp_path: Path,
+) -> None:
+    src = tmp_path / "input.csv"
+    src.write_text("name,status,city\nAlice,active\n\nBob\n", encoding="utf-8")
+    dst = tmp_path / "out.csv"
+
+    stats = filter_csv(
+        input_path=src,
+        output_path=dst,
+        filters=[
+            FilterBinding(column="status", condition=build_condition("contains", "act"))
+        ],
+        delimiter=",",
+        quotechar='"',
+        no_header=False,
+    )
+
+    assert stats.processed == 2  # 空行は数えない
+    assert stats.matched == 1
+    assert stats.skipped == 1  # status 列がない行
+    assert dst.read_text(encoding="utf-8") == "name,status,city\nAlice,active,\n"
+
+
+@pytest.mark.parametrize(
+    ("text", "no_header", "column"),
+    [
+        ("name,status\r\nAlice,active\r\nBob,inactive\r\n", False, "status"),
+        ("name,status,city\nAlice,active\n\nBob\nCarol,active,x,y\n", False, "status"),
+        ("a,b\nc\n\nb,active", True, 1),
+        ('name,status\n"Alice",active\n', False, "status"),  # クオートあり: 通常経路
+    ],
+)
+@pytest.mark.parametrize("chunk_size", [1 << 20, 5])
+@pytest.mark.parametrize("n_select", [0, 1, 2])
+def test_filter_csv_fast_path_matches_reader_path(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    text: str,
+    no_header: bool,
+    column: str | int,
+    chunk_size: int,
+    n_select: int,
+) -> None:
+    monkeypatch.setattr(io, "MMAP_CHUNK_SIZE", chunk_size)
+    src = tmp_path / "input.csv"
+    src.write_bytes(text.encode("utf-8"))
+    filters = [
+        FilterBinding(column=column, condition=build_condition("contains", "ct"))
+    ]
+    first: str | int = 0 if no_header else "name"
+    select = [None, [column], [column, first]][n_select]
+
+    outputs = []
+    for fast_path in (False, True):
+        dst = tmp_path / f"out-{fast_path}.csv"
+        stats = filter_csv(
+            input_path=src,
+            output_path=dst,
+            filters=filters,
+            delimiter=",",
+            quotechar='"',
+            no_header=no_header,
+            fast_path=fast_path,
+            select=select,
+        )
+        outputs.append((stats, dst.read_bytes()))
+
+    assert outputs[0] == outputs[1]
+
+
+@pytest.mark.parametrize("needles", [[""], ["", "ct"]])
+def test_filter_csv_fast_path_handles_empty_needle(
+    tmp_path: Path, needles: list[str]
+) -> None:
+    src = tmp_path / "input.csv"
+    src.write_text("name,status\nact,active\nBob,inactive\n", encoding="utf-8")
+    filters = [
+        FilterBinding(column="status", condition=build_condition("contains", needle))
+        for needle in needles
+    ]
+
+    outputs = []
+    for fast_path in (False, True):
+        dst = tmp_path / f"out-{fast_path}.csv"
+        stats = filter_csv(
+            input_path=src,
+            output_path=dst,
+            filters=filters,
+            delimiter=",",
+            quotechar='"',
+            no_header=False,
+            fast_path=fast_path,
+        )
+        outputs.append((stats, dst.read_bytes()))
+
+    assert outputs[0] == outputs[1]
+
+
+@pytest.mark.parametrize("fast_path", [False, True])
+def test_filter_csv_select_projects_and_pads_columns(
+    tmp_path: Path, fast_path: bool
+) -> None:
+    src = tmp_path / "input.csv"
+    src.write_text(
+        "name,status,city,name\nAlice,active\nBob,active,Osaka,B\n", encoding="utf-8"
+    )
+    dst = tmp_path / "out.csv"
+
+    filter_csv(
+        input_path=src,
+        output_path=dst,
+        filters=[
+            FilterBinding(column="status", condition=build_condition("contains", "act"))
+        ],
+        delimiter=",",
+        quotechar='"',
+        no_header=False,
+        fast_path=fast_path,
+        select=["city", "name"],  # 同名カラムは最後の列
+    )
+
+    assert dst.read_text(encoding="utf-8") == "city,name\n,\nOsaka,B\n"
+
+
+@pytest.mark.parametrize("fast_path", [False, True])
+def test_filter_csv_select_single_empty_column_is_quoted(
+    tmp_path: Path, fast_path: bool
+) -> None:
+    src = tmp_path / "input.csv"
+    src.write_text("a,b\nx,\n", encoding="utf-8")
+    dst = tmp_path / "out.csv"
+
+    filter_csv(
+        input_path=src,
+        output_path=dst,
+        filters=[FilterBinding(column=0, condition=build_condition("contains", "x"))],
+        delimiter=",",
+        quotechar='"',
+        no_header=True,
+        fast_path=fast_path,
+        select=[1],
+    )
+
+    # csv.writer と同じく、空文字 1 列だけの行は "" と書く（空行と区別するため）
+    assert dst.read_text(encoding="utf-8") == '""\n'
+
+
+def test_filter_csv_select_unknown_column_raises(tmp_path: Path) -> None:
+    src = tmp_path / "input.csv"
+    src.write_text("name,status\nAlice,active\n", encoding="utf-8")
+
+    with pytest.raises(CsvFilterError, match="カラムが存在しません: nope"):
+        filter_csv(
+            input_path=src,
+            output_path=tmp_path / "out.csv",
+            filters=[
+                FilterBinding(column="name", condition=build_condition("contains", "A"))
+            ],
+            delimiter=",",
+            quotechar='"',
+            no_header=False,
+            select=["name", "nope"],
+        )
+
+
+LIMIT_CSV = "name,score\nAlice,90\nBob\nCarol,80\nDave,70\nEve,95\nFrank,60\n"
+
+
+@pytest.mark.parametrize(
+    "engine",
+    [{}, {"fast_path": True}, {"vectorize": True}, {"cache_dir": "cache"}],
+)
+@pytest.mark.parametrize(
+    "filters",
+    [
+        [("name", "contains", "a")],
+        [("name", "contains", "a"), ("score", "ge", "60")],
+    ],
+)
+def test_filter_csv_limit_and_count_only(
+    tmp_path: Path,
+    engine: dict[str, object],
+    filters: list[tuple[str, str, str]],
+) -> None:
+    src = tmp_path / "input.csv"
+    src.write_text(LIMIT_CSV, encoding="utf-8")
+    if "cache_dir" in engine:
+        engine = {"cache_dir": tmp_path / "cache"}
+    common = dict(
+        input_path=src,
+        filters=[
+            FilterBinding(column=col, condition=build_condition(op, val))
+            for col, op, val in filters
+        ],
+        delimiter=",",
+        quotechar='"',
+        no_header=False,
+        **engine,
+    )
+    full = tmp_path / "full.csv"
+    total = filter_csv(output_path=full, **common)  # type: ignore[arg-type]
+    lines = full.read_text(encoding="utf-8").splitlines(keepends=True)
+
+    limited = tmp_path / "limited.csv"
+    stats = filter_csv(output_path=limited, limit=2, **common)  # type: ignore[arg-type]
+    assert limited.read_text(encoding="utf-8") == "".join(lines[:3])
+    assert stats.matched == 2
+    assert stats.processed <= total.processed
+    # 処理件数・スキップ件数も通常経路と同じく limit 件目の行までを数える
+    plain = {key: value for key, value in common.items() if key not in engine}
+    serial = filter_csv(output_path=tmp_path / "serial.csv", limit=2, **plain)  # type: ignore[arg-type]
+    assert stats == serial
+
+    counted = filter_csv(
+        output_path=tmp_path / "unused.csv", count_only=True, **common  # type: ignore[arg-type]
+    )
+    assert counted == total
+    assert not (tmp_path / "unused.csv").exists()
+
+
+def test_filter_csv_limit_stops_reading_after_last_match(tmp_path: Path) -> None:
+    src = tmp_path / "input.csv"
+    src.write_text(LIMIT_CSV, encoding="utf-8")
+
+    stats = filter_csv(
+        input_path=src,
+        output_path=None,
+        filters=[
+            FilterBinding(column="name", condition=build_condition("contains", "a"))
+        ],
+        delimiter=",",
+        quotechar='"',
+        no_header=False,
+        limit=1,
+        count_only=True,
+    )
+
+    # Alice, Bob は一致せず、3 行目の Carol で 1 件目に達したら読むのをやめる
+    assert stats == io.FilterStats(processed=3, matched=1, skipped=0)
+
+
+ROWS_TEXT = (
+    'id,name,city\n1,Alice,Tokyo\n2,Bob,"Osaka,\n Japan"\n3,Carol\n4,大阪太郎,Kyoto\n'
+)
+CITY_O = [FilterBinding(column="city", condition=build_condition("contains", "o"))]
+
+
+def _chunks(data: bytes, size: int) -> Iterator[bytes]:
+    return (data[i : i + size] for i in range(0, len(data), size))
+
+
+@pytest.mark.parametrize(
+    "make_source",
+    [
+        lambda path: path,
+        lambda path: ROWS_TEXT.splitlines(keepends=True),
+        lambda path: StringIO(ROWS_TEXT, newline=""),
+        # 行・レコード・UTF-8 の文字の途中で切れたチャンク
+        lambda path: _chunks(ROWS_TEXT.encode("utf-8"), 5),
+        lambda path: _chunks(gzip.compress(ROWS_TEXT.encode("utf-8")), 3),
+    ],
+    ids=["path", "lines", "text-file", "byte-chunks", "gzip-chunks"],
+)
+def test_filter_rows_accepts_paths_lines_and_byte_chunks(
+    tmp_path: Path, make_source: Callable[[Path], object]
+) -> None:
+    src = tmp_path / "input.csv"
+    src.write_text(ROWS_TEXT, encoding="utf-8")
+
+    with filter_rows(make_source(src), filters=CITY_O) as rows:  # type: ignore[arg-type]
+        assert rows.fieldnames == ["id", "name", "city"]
+        assert list(rows) == [
+            ["1", "Alice", "Tokyo"],
+            ["4", "大阪太郎", "Kyoto"],
+        ]
+    assert (rows.stats.processed, rows.stats.matched, rows.stats.skipped) == (4, 2, 1)
+
+
+def test_filter_rows_is_lazy_and_updates_stats_while_iterating() -> None:
+    pulled = []
+
+    def lines() -> Iterator[str]:
+        for number, line in enumerate(ROWS_TEXT.splitlines(keepends=True)):
+            pulled.append(number)
+            yield line
+
+    rows = filter_rows(lines(), filters=CITY_O, select=["name"])
+    assert rows.fieldnames == ["name"]
+    assert pulled == [0]  # ヘッダー行だけを読んだ
+
+    assert tuple(next(rows)) == ("Alice",)
+    assert rows.stats.matched == 1
+    assert rows.stats.processed == 1
+    assert len(pulled) == 2
+
+    rows.close()
+    assert list(rows) == []
+    assert rows.stats.elapsed_seconds > 0
+
+
+def test_filter_rows_without_header_and_limit() -> None:
+    rows = filter_rows(
+        ["a,1\n", "b\n", "c,1\n", "d,1\n"],
+        filters=[FilterBinding(column=1, condition=build_condition("eq", "1"))],
+        no_header=True,
+        limit=2,
+    )
+
+    assert rows.fieldnames is None
+    assert list(rows) == [["a", "1"], ["c", "1"]]
+    assert (rows.stats.processed, rows.stats.skipped) == (3, 1)
+
+
+def test_filter_rows_reports_errors_before_iteration(tmp_path: Path) -> None:
+    with pytest.raises(CsvFilterError, match="カラムが存在しません"):
+        filter_rows(
+            ["name\n", "Alice\n"],
+            filters=[
+                FilterBinding(column="city", condition=build_condition("contains", "o"))
+            ],
+        )
+    with pytest.raises(CsvFilterError, match="ヘッダー行が存在しません"):
+        filter_rows([], filters=CITY_O)
+    with pytest.raises(CsvFilterError, match="入力ファイルが見つかりません"):
+        filter_rows(tmp_path / "missing.csv", filters=CITY_O)
+    with pytest.raises(TypeError):
+        filter_rows("input.csv", filters=CITY_O)  # type: ignore[arg-type]
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from csvfilter_cli import parallel
+from csvfilter_cli.filters import build_condition
+from csvfilter_cli.io import FilterBinding, filter_csv
+
+QUOTED_CSV = (
+    "id,note,status\n"
+    '1,"multi\nline, ""quoted""",active\n'
+    "2,plain,inactive\n"
+    '3,"a\nb\nc",active\n'
+    "\n"
+    "4,short\n"
+    '5,"x""\ny",active\n'
+) * 20
+
+
+def test_find_record_boundaries_skip_quoted_newlines(tmp_path: Path) -> None:
+    src = tmp_path / "input.csv"
+    src.write_text('a,"x\ny"\nb,c\n"d\n",e\n', encoding="utf-8")
+    size = src.stat().st_size
+
+    boundaries = parallel.find_record_boundaries(src, 0, size, size, b'"')
+
+    assert boundaries == [0, 8, 12, size]
+
+
+@pytest.mark.parametrize("no_header", [False, True])
+@pytest.mark.parametrize("with_select", [False, True])
+def test_filter_csv_parallel_matches_serial_output(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, no_header: bool, with_select: bool
+) -> None:
+    monkeypatch.setattr(parallel, "SCAN_BLOCK_SIZE", 7)  # ブロック跨ぎも検証
+    src = tmp_path / "input.csv"
+    src.write_text(QUOTED_CSV, encoding="utf-8")
+    column: str | int = 2 if no_header else "status"
+    filters = [FilterBinding(column=column, condition=build_condition("regex", "^act"))]
+    select: list[str | int] | None = None
+    if with_select:
+        select = [column, 1 if no_header else "note"]
+    common = dict(
+        filters=filters,
+        delimiter=",",
+        quotechar='"',
+        no_header=no_header,
+        select=select,
+    )
+
+    serial_out = tmp_path / "serial.csv"
+    serial = filter_csv(input_path=src, output_path=serial_out, **common)
+    parallel_out = tmp_path / "parallel.csv"
+    result = parallel.filter_csv_parallel(
+        input_path=src, output_path=parallel_out, jobs=3, **common
+    )
+
+    assert result == serial
+    assert parallel_out.read_bytes() == serial_out.read_bytes()
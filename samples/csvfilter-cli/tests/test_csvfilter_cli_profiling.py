@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import io
+import time
+from pathlib import Path
+
+import pytest
+
+from csvfilter_cli.filters import build_condition
+from csvfilter_cli.io import FilterBinding, FilterStats, filter_csv
+from csvfilter_cli.profiling import FilterProfile, ProgressReporter
+
+CSV_TEXT = (
+    "id,name,score,city\n"
+    "1,Alice,90,Tokyo\n"
+    "2,Bob,85,Osaka\n"
+    "3,Carol\n"
+    "4,Dave,70,Tokyo\n"
+    "5,Eve,95,Kyoto\n"
+)
+
+
+def _run(tmp_path: Path, name: str, **kwargs: object) -> tuple[FilterStats, bytes]:
+    src = tmp_path / "input.csv"
+    src.write_text(CSV_TEXT, encoding="utf-8")
+    out = tmp_path / name
+    stats = filter_csv(
+        input_path=src,
+        output_path=out,
+        filters=[
+            FilterBinding(column="city", condition=build_condition("contains", "o")),
+            FilterBinding(column="score", condition=build_condition("ge", "80")),
+        ],
+        delimiter=",",
+        quotechar='"',
+        no_header=False,
+        **kwargs,  # type: ignore[arg-type]
+    )
+    return stats, out.read_bytes()
+
+
+def test_profile_counts_each_condition_without_changing_output(
+    tmp_path: Path,
+) -> None:
+    expected = _run(tmp_path, "plain.csv")
+    profile = FilterProfile()
+    stats, output = _run(tmp_path, "profiled.csv", profile=profile)
+
+    assert (stats, output) == expected
+    assert stats.bytes_read == len(CSV_TEXT.encode("utf-8"))
+
+    # 安い条件（contains）から評価し、一致した行だけ次の条件へ進む。
+    # Carol の行は city 列が無いので、どの条件も評価されずにスキップされる。
+    # contains は大文字小文字を区別するので Osaka は一致しない
+    counts = {
+        (c.column, c.condition): (c.evaluations, c.hits) for c in profile.conditions
+    }
+    assert counts == {
+        ("city", "contains:o"): (4, 3),
+        ("score", "ge.decimal:80"): (3, 2),
+    }
+
+    summary = profile.to_dict(stats)
+    assert summary["processed"] == 5
+    assert summary["matched"] == 2
+    assert summary["skipped"] == 1
+    assert set(summary["stages"]) == {"read", "parse", "evaluate", "write"}
+    assert all(sec >= 0 for sec in summary["stages"].values())
+    assert summary["conditions"][1]["hit_rate"] == pytest.approx(2 / 3)
+
+
+def test_profile_uses_column_numbers_without_header(tmp_path: Path) -> None:
+    src = tmp_path / "input.csv"
+    src.write_text("a,1\nb,2\n", encoding="utf-8")
+    profile = FilterProfile()
+
+    filter_csv(
+        input_path=src,
+        output_path=tmp_path / "out.csv",
+        filters=[FilterBinding(column=1, condition=build_condition("eq", "2"))],
+        delimiter=",",
+        quotechar='"',
+        no_header=True,
+        profile=profile,
+    )
+
+    [condition] = profile.conditions
+    assert (condition.column, condition.evaluations, condition.hits) == (2, 2, 1)
+
+
+def test_progress_reporter_prints_periodically() -> None:
+    stats = FilterStats(processed=10, matched=2)
+    stream = io.StringIO()
+
+    with ProgressReporter(stats, interval=0.01, stream=stream):
+        time.sleep(0.1)
+
+    lines = stream.getvalue().splitlines()
+    assert lines
+    assert lines[0].startswith("progress: ")
+    assert "processed=10" in lines[0]
+    assert "matched=2" in lines[0]
+
+
+def test_filter_csv_with_progress_matches_plain_run(tmp_path: Path) -> None:
+    expected = _run(tmp_path, "plain.csv")
+    stats, output = _run(tmp_path, "progress.csv", progress_interval=0.01)
+
+    assert (stats, output) == expected
+    assert stats.bytes_read == len(CSV_TEXT.encode("utf-8"))
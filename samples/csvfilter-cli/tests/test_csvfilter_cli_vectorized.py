@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from csvfilter_cli import vectorized
+from csvfilter_cli.filters import build_condition, compile_row_predicate
+from csvfilter_cli.io import FilterBinding, FilterStats, filter_csv
+
+HEADER_CSV = (
+    "id,name,score,city\n"
+    "1,Alice,90,Tokyo\n"
+    '2,Bob,85.5,"Osaka, Japan"\n'
+    "\n"
+    "3,Carol\n"
+    "4,Dave,,Tokyo,extra\n"
+    "5,Eve,1e2,Kyoto\n"
+    "6,Frank,sNaN,Tokyo\n"
+    "7,Grace,90.000000000000000001,Osaka\n"
+)
+NO_HEADER_CSV = "a,1\nc\n\nb,90,x\n90\n"
+
+# float64 では区別できない値や、Decimal と float で解釈が分かれうる値
+DECIMALS = [
+    "90",
+    "90.000000000000000001",
+    "89.99999999999999999",
+    "-0",
+    "0",
+    "1e-400",
+    "",
+    " 90 ",
+    "1_000",
+    "NaN",
+    "-nan",
+    "Infinity",
+    "-inf",
+    "abc",
+    "9" * 40,
+]
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+@pytest.mark.parametrize(
+    ("text", "no_header", "filters", "select"),
+    [
+        (HEADER_CSV, False, [("score", "ge", "90")], None),
+        (HEADER_CSV, False, [("city", "contains", "o"), ("score", "lt", "100")], None),
+        (HEADER_CSV, False, [("score", "between", "85,100")], ["name", "score"]),
+        (HEADER_CSV, False, [("name", "regex", "^[A-E]"), ("id", "ne.int", "2")], None),
+        (
+            HEADER_CSV,
+            False,
+            [("city", "in", "Tokyo,Kyoto"), ("score", "in", "90")],
+            None,
+        ),
+        # ヘッダーなしでは列を 0 始まりの番号で指定する
+        (NO_HEADER_CSV, True, [(1, "eq", "90"), (0, "contains", "")], None),
+        (NO_HEADER_CSV, True, [(0, "contains", "b")], [2, 0]),
+    ],
+)
+def test_vectorized_filter_matches_row_engine(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    use_numpy: bool,
+    text: str,
+    no_header: bool,
+    filters: list[tuple[str | int, str, str]],
+    select: list[str | int] | None,
+) -> None:
+    if use_numpy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(vectorized, "np", None)  # NumPy が無い環境を再現する
+    monkeypatch.setattr(vectorized, "CHUNK_ROWS", 3)  # チャンク跨ぎも検証
+
+    src = tmp_path / "input.csv"
+    src.write_text(text, encoding="utf-8")
+    bindings = [
+        FilterBinding(column=col, condition=build_condition(op, val))
+        for col, op, val in filters
+    ]
+    common = dict(
+        input_path=src,
+        filters=bindings,
+        delimiter=",",
+        quotechar='"',
+        no_header=no_header,
+        select=select,
+    )
+
+    expected = filter_csv(output_path=tmp_path / "rows.csv", **common)  # type: ignore[arg-type]
+    stats = filter_csv(
+        output_path=tmp_path / "vectorized.csv", vectorize=True, **common  # type: ignore[arg-type]
+    )
+
+    assert stats == expected
+    assert (tmp_path / "vectorized.csv").read_bytes() == (
+        tmp_path / "rows.csv"
+    ).read_bytes()
+
+
+@pytest.mark.parametrize(
+    ("op", "operand"),
+    [
+        ("eq", "90"),
+        ("ne", "90"),
+        ("gt", "90"),
+        ("ge", "90.000000000000000001"),
+        ("lt", "0"),
+        ("le", "-0"),
+        ("gt", "Infinity"),
+        ("between", "0,90"),
+        ("in", "90,0,1e-400"),
+    ],
+)
+def test_decimal_masks_agree_with_exact_comparison(op: str, operand: str) -> None:
+    pytest.importorskip("numpy")
+    bindings = [(0, build_condition(op, operand))]
+    predicate = compile_row_predicate(bindings)
+    rows = [[value] for value in DECIMALS]
+
+    stats = FilterStats()
+    matched = list(vectorized.iter_matches(rows, bindings, predicate, stats))
+
+    assert matched == [row for row in rows if predicate(row)]
+    assert stats == FilterStats(processed=len(rows), matched=len(matched))
+
+
+def test_decimal_mask_falls_back_for_values_float_cannot_parse() -> None:
+    pytest.importorskip("numpy")
+    bindings = [(0, build_condition("ge", "1"))]
+    rows = [["sNaN"], ["2"], ["0"]]  # sNaN は Decimal では読めるが float では読めない
+
+    stats = FilterStats()
+    matched = list(
+        vectorized.iter_matches(rows, bindings, compile_row_predicate(bindings), stats)
+    )
+
+    assert matched == [["2"]]
+
+
+def test_applicable_only_with_decimal_conditions(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    pytest.importorskip("numpy")
+    decimal_bindings = [
+        (0, build_condition("contains", "a")),
+        (1, build_condition("ge", "1")),
+    ]
+    assert vectorized.applicable(decimal_bindings)
+    # マスクにしても速くならない条件だけなら行単位で評価する
+    assert not vectorized.applicable([(0, build_condition("contains", "a"))])
+    assert not vectorized.applicable([(1, build_condition("ge.int", "1"))])
+
+    monkeypatch.setattr(vectorized, "np", None)
+    assert not vectorized.applicable(decimal_bindings)
@@ -0,0 +1,81 @@
+"""複数キーワードの照合方法ごとの 1 行あたりの所要時間を比較するベンチマーク。
+
+キーワード数を変えて、filters.keyword_matcher（行を 1 回小文字にして `in` で探し、
+多い場合は Aho-Corasick）と、re.IGNORECASE の正規表現で行を 1 回だけ走査する方法を比べる。
+いずれも any（いずれかを含む）で、大文字小文字を区別しない。
+
+実行例（samples/logfilter-cli/ で）:
+    PYTHONPATH=src python benchmarks/bench_keywords.py --lines 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import string
+import time
+from collections.abc import Callable
+
+from bench_memory import LEVELS
+
+from logfilter_cli import filters
+
+
+def make_lines(count: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    return [
+        f"2025-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d} "
+        f"{rng.randrange(24):02d}:00:00 {rng.choice(LEVELS)} host-{rng.randrange(100)} "
+        f"request {i} took {rng.randrange(1000)}ms path=/api/v1/items/{i}\n"
+        for i in range(count)
+    ]
+
+
+def measure(lines: list[str], matches: Callable[[str], bool]) -> tuple[float, int]:
+    """(1 行あたりの秒数, 一致した行数) を返す。"""
+
+    start = time.perf_counter()
+    matched = sum(1 for line in lines if matches(line))
+    return (time.perf_counter() - start) / len(lines), matched
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--lines", type=int, default=100_000)
+    ap.add_argument(
+        "--keywords",
+        type=int,
+        action="append",
+        help="キーワード数（複数指定可。デフォルト: 1, 4, 16, 64, 256）",
+    )
+    args = ap.parse_args()
+
+    lines = make_lines(args.lines)
+    rng = random.Random(1)
+    for count in args.keywords or [1, 4, 16, 64, 256]:
+        keywords = ["ERROR"] + [
+            "".join(rng.choices(string.ascii_lowercase, k=rng.randrange(5, 10)))
+            for _ in range(count - 1)
+        ]
+        pattern = re.compile(
+            "|".join(map(re.escape, sorted(keywords, key=len, reverse=True))),
+            re.IGNORECASE,
+        )
+        candidates: dict[str, Callable[[str], bool]] = {
+            "keyword_matcher": filters.keyword_matcher(keywords),
+            "re.IGNORECASE": lambda line: pattern.search(line) is not None,
+        }
+        results = {name: measure(lines, m) for name, m in candidates.items()}
+        if len({matched for _, matched in results.values()}) != 1:
+            raise SystemExit(f"keywords={count}: 一致件数が方法ごとに異なります")
+        print(
+            f"keywords={count:4d} "
+            + " ".join(
+                f"{name}={sec * 1e9:8.0f}ns" for name, (sec, _) in results.items()
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""ファイルサイズと最大メモリ使用量（RSS）の関係を確認するベンチマーク。
+
+行数を変えたログを生成し、CLI を子プロセスで実行して最大 RSS を計測する。
+比較のため、全行を LogEntry のリストに読み込んでからフィルタする旧実装も計測する。
+ストリーム処理の最大 RSS が入力サイズによらずほぼ一定であることを確認し、
+最小と最大の入力で --tolerance-mb を超えて増えた場合は終了コード 1 を返す。
+
+実行例（samples/logfilter-cli/ で）:
+    PYTHONPATH=src python benchmarks/bench_memory.py --lines 200000 --lines 2000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+LEVELS = ["INFO", "DEBUG", "WARN", "ERROR"]
+ARGS = ["--contains", "error", "--date-from", "2025-02-01"]
+
+
+def generate(path: Path, lines: int, seed: int = 0) -> None:
+    """行頭に日付の付いたログを lines 行書き出す（一部は日付なしの行）。"""
+
+    rng = random.Random(seed)
+    with path.open("w", encoding="utf-8") as f:
+        for i in range(lines):
+            if i % 50 == 49:
+                f.write(f"NoDateLine continuation of request {i}\n")
+                continue
+            month, day = rng.randrange(1, 13), rng.randrange(1, 29)
+            f.write(
+                f"2025-{month:02d}-{day:02d} {rng.randrange(24):02d}:00:00 "
+                f"{rng.choice(LEVELS)} host-{rng.randrange(100)} request {i} "
+                f"took {rng.randrange(1000)}ms\n"
+            )
+
+
+def legacy_main(path: Path) -> None:
+    """全行をリストに読み込んでからフィルタする旧実装（比較用）。"""
+
+    import datetime as dt
+
+    from logfilter_cli import filters, parser
+
+    with path.open("r", encoding="utf-8") as f:
+        entries = [parser.parse_line(line) for line in f]
+    filtered = filters.filter_entries(
+        entries, keyword="error", date_from=dt.date(2025, 2, 1), date_to=None
+    )
+    sys.stdout.writelines(
+        [e.raw if e.raw.endswith("\n") else f"{e.raw}\n" for e in filtered]
+    )
+
+
+def measure(mode: str, path: Path) -> tuple[float, int]:
+    """mode（stream / legacy）を子プロセスで実行し、(経過秒, 最大 RSS[KB]) を返す。"""
+
+    env = {**os.environ, "PYTHONPATH": str(SRC_DIR)}
+    if mode == "stream":
+        cmd = [sys.executable, "-m", "logfilter_cli.cli", str(path), *ARGS]
+    else:
+        cmd = [sys.executable, __file__, "--legacy-run", str(path)]
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, env=env)
+    # 子プロセスごとの rusage を取るため wait4 を使う（RUSAGE_CHILDREN は累計の最大）
+    _, status, usage = os.wait4(proc.pid, 0)
+    elapsed = time.perf_counter() - start
+    proc.returncode = code = os.waitstatus_to_exitcode(status)  # 回収済みと伝える
+    if code != 0:
+        raise SystemExit(f"{mode} failed with exit code {code}")
+    return elapsed, usage.ru_maxrss
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument(
+        "--lines",
+        type=int,
+        action="append",
+        help="生成する行数（複数指定可。デフォルト: 200000 と 2000000）",
+    )
+    ap.add_argument(
+        "--tolerance-mb",
+        type=float,
+        default=10.0,
+        help="ストリーム処理の最大 RSS の増加の許容量（MB）",
+    )
+    ap.add_argument("--skip-legacy", action="store_true", help="旧実装を計測しない")
+    ap.add_argument("--legacy-run", type=Path, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.legacy_run is not None:
+        legacy_main(args.legacy_run)
+        return 0
+
+    peaks: list[int] = []
+    for lines in sorted(args.lines or [200_000, 2_000_000]):
+        with tempfile.TemporaryDirectory() as tmp:
+            src = Path(tmp) / "input.log"
+            generate(src, lines)
+            size_mb = src.stat().st_size / 1e6
+            modes = ["stream"] if args.skip_legacy else ["stream", "legacy"]
+            for mode in modes:
+                elapsed, max_rss = measure(mode, src)
+                if mode == "stream":
+                    peaks.append(max_rss)
+                print(
+                    f"{mode:6s} lines={lines} size={size_mb:.1f}MB "
+                    f"elapsed={elapsed:.2f}s max_rss={max_rss / 1024:.1f}MB"
+                )
+
+    growth_mb = (peaks[-1] - peaks[0]) / 1024
+    print(f"stream max_rss growth: {growth_mb:+.1f}MB")
+    if growth_mb > args.tolerance_mb:
+        print(f"memory grows with input size (> {args.tolerance_mb:g}MB)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
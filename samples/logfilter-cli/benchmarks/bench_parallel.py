@@ -0,0 +1,85 @@
+"""`--jobs` による並列処理の所要時間を、プロセス数を変えて比較するベンチマーク。
+
+ローテーションされたログを想定した複数ファイル（サイズはまちまち）を生成し、
+CLI を子プロセスで実行して所要時間を表示する。全プロセス数で出力が一致することも確認する。
+
+実行例（samples/logfilter-cli/ で）:
+    PYTHONPATH=src python benchmarks/bench_parallel.py --lines 4000000 --jobs 1 --jobs 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from bench_memory import LEVELS, SRC_DIR
+
+FILES = 8
+ARGS = ["--contains", "error", "--date-from", "2020-01-10"]
+
+
+def generate(directory: Path, lines: int, seed: int = 0) -> list[Path]:
+    """合計 lines 行を、大きさの異なる FILES 個のファイルに書き出す（各ファイルは日付順）。"""
+
+    rng = random.Random(seed)
+    weights = [2**i for i in range(FILES)]  # 最大のファイルが全体の約半分
+    paths = []
+    for n, weight in enumerate(weights):
+        path = directory / f"app.log.{FILES - 1 - n}"
+        count = lines * weight // sum(weights)
+        with path.open("w", encoding="utf-8") as f:
+            for i in range(count):
+                day = dt.date(2020, 1, 1) + dt.timedelta(days=i * 30 // count)
+                f.write(
+                    f"{day.isoformat()} {i % 24:02d}:00:00 {rng.choice(LEVELS)} "
+                    f"host-{n} request {i} took {rng.randrange(1000)}ms\n"
+                )
+        paths.append(path)
+    return paths
+
+
+def run(paths: list[Path], extra: list[str]) -> tuple[float, bytes]:
+    env = {**os.environ, "PYTHONPATH": str(SRC_DIR)}
+    cmd = [sys.executable, "-m", "logfilter_cli.cli", *map(str, paths), *ARGS, *extra]
+    start = time.perf_counter()
+    out = subprocess.run(cmd, env=env, capture_output=True, check=True).stdout
+    return time.perf_counter() - start, out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--lines", type=int, default=4_000_000, help="全ファイルの合計行数")
+    ap.add_argument(
+        "--jobs",
+        type=int,
+        action="append",
+        help="比較するプロセス数（複数指定可。デフォルト: 1, 2, 4, CPU 数）",
+    )
+    ap.add_argument("--merge", action="store_true", help="--merge も指定して計測する")
+    args = ap.parse_args()
+    jobs_list = args.jobs or sorted({1, 2, 4, os.cpu_count() or 1})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = generate(Path(tmp), args.lines)
+        size_mb = sum(p.stat().st_size for p in paths) / 1e6
+        print(f"files={len(paths)} lines={args.lines} size={size_mb:.1f}MB")
+        expected = None
+        base = None
+        for jobs in jobs_list:
+            extra = ["--jobs", str(jobs), *(["--merge"] if args.merge else [])]
+            seconds, out = run(paths, extra)
+            if expected is None:
+                expected, base = out, seconds
+            assert out == expected, f"--jobs {jobs} の出力が異なります"
+            print(f"jobs={jobs:3d} {seconds:8.3f}s  speedup x{base / seconds:.2f}")
+
+
+if __name__ == "__main__":
+    main()
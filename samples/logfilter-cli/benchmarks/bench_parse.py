@@ -0,0 +1,99 @@
+"""LogEntry の作成コスト（1 行あたりの確保メモリと時間）のベンチマーク。
+
+毎行トークン分割と正規表現・fromisoformat による日付抽出を行い、dataclass に
+保持していた旧実装と、`__slots__` で日付・トークンを必要になるまで求めない
+現行実装を比べる。キーワードだけのフィルタ（日付もトークンも使わない）と、
+日付フィルタ（日付だけを使う）の 2 通りを計測する。
+
+実行例（samples/logfilter-cli/ で）:
+    PYTHONPATH=src python benchmarks/bench_parse.py --lines 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import datetime as dt
+import re
+import time
+import tracemalloc
+from collections.abc import Callable
+
+from bench_memory import LEVELS
+
+from logfilter_cli import parser
+
+DATE_PREFIX_PATTERN = re.compile(r"^(?P<date>\d{4}-\d{2}-\d{2})")
+
+
+@dataclasses.dataclass(frozen=True)
+class LegacyLogEntry:
+    date: dt.date | None
+    tokens: list[str]
+    raw: str
+
+
+def legacy_parse_line(line: str) -> LegacyLogEntry:
+    """毎行トークン分割と日付抽出を行う旧実装（比較用）。"""
+
+    tokens = line.strip("\n").split()
+    date = None
+    if tokens and DATE_PREFIX_PATTERN.match(tokens[0]):
+        try:
+            date = dt.date.fromisoformat(tokens[0])
+        except ValueError:
+            date = None
+    return LegacyLogEntry(date=date, tokens=tokens, raw=line)
+
+
+def sample_lines(count: int) -> list[str]:
+    return [
+        f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d} 12:00:00 {LEVELS[i % 4]} "
+        f"host-{i % 100} request {i} took {i % 1000}ms\n"
+        for i in range(count)
+    ]
+
+
+def per_line_bytes(
+    parse: Callable[[str], object], lines: list[str], use_date: bool
+) -> float:
+    """全行のエントリを保持したときの、1 行あたりの確保メモリ（バイト）。"""
+
+    tracemalloc.start()
+    entries = [parse(line) for line in lines]
+    if use_date:
+        for entry in entries:
+            entry.date  # type: ignore[attr-defined]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del entries
+    return size / len(lines)
+
+
+def seconds(parse: Callable[[str], object], lines: list[str], use_date: bool) -> float:
+    start = time.perf_counter()
+    for line in lines:
+        entry = parse(line)
+        if use_date:
+            entry.date  # type: ignore[attr-defined]
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--lines", type=int, default=1_000_000)
+    args = ap.parse_args()
+
+    lines = sample_lines(args.lines)
+    small = lines[: min(len(lines), 100_000)]  # tracemalloc は遅いので一部で測る
+    for label, use_date in (("keyword-only", False), ("date filter", True)):
+        for name, parse in (("legacy", legacy_parse_line), ("lazy", parser.parse_line)):
+            print(
+                f"{label:12s} {name:6s} "
+                f"{per_line_bytes(parse, small, use_date):7.1f} B/line "
+                f"{seconds(parse, lines, use_date):6.2f}s"
+            )
+
+
+if __name__ == "__main__":
+    main()
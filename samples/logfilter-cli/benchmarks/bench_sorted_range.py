@@ -0,0 +1,84 @@
+"""日付順のログで、`--sorted` の二分探索と全体の読み込みを比較するベンチマーク。
+
+日付順に並んだログを生成し、1 日分の範囲を全体の読み込みと `--sorted yes` で
+フィルタして所要時間を表示する（CLI を子プロセスで実行するので起動時間を含む）。
+両方の出力が一致することも確認する。
+
+実行例（samples/logfilter-cli/ で）:
+    PYTHONPATH=src python benchmarks/bench_sorted_range.py --lines 10000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from bench_memory import LEVELS, SRC_DIR
+
+LINES_PER_DAY = 20_000
+
+
+def generate(path: Path, lines: int, seed: int = 0) -> dt.date:
+    """LINES_PER_DAY 行ごとに日付が進むログを書き出し、中央の日付を返す。"""
+
+    rng = random.Random(seed)
+    start = dt.date(2020, 1, 1)
+    with path.open("w", encoding="utf-8") as f:
+        for i in range(lines):
+            day = start + dt.timedelta(days=i // LINES_PER_DAY)
+            if i % 50 == 49:
+                f.write(f"NoDateLine continuation of request {i}\n")
+                continue
+            f.write(
+                f"{day.isoformat()} {i % 86400 // 3600:02d}:00:00 "
+                f"{rng.choice(LEVELS)} host-{rng.randrange(100)} request {i}\n"
+            )
+    return start + dt.timedelta(days=lines // LINES_PER_DAY // 2)
+
+
+def run(path: Path, day: dt.date, extra: list[str]) -> tuple[float, bytes]:
+    env = {**os.environ, "PYTHONPATH": str(SRC_DIR)}
+    cmd = [
+        sys.executable,
+        "-m",
+        "logfilter_cli.cli",
+        str(path),
+        "--date-from",
+        day.isoformat(),
+        "--date-to",
+        day.isoformat(),
+        *extra,
+    ]
+    start = time.perf_counter()
+    out = subprocess.run(cmd, env=env, capture_output=True, check=True).stdout
+    return time.perf_counter() - start, out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--lines", type=int, default=10_000_000)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src = Path(tmp) / "sorted.log"
+        day = generate(src, args.lines)
+        print(f"lines={args.lines} size={src.stat().st_size / 1e6:.1f}MB window={day}")
+
+        full_sec, full_out = run(src, day, [])
+        seek_sec, seek_out = run(src, day, ["--sorted", "yes"])
+        auto_sec, auto_out = run(src, day, ["--sorted", "auto"])
+        assert full_out == seek_out == auto_out
+        print(f"full scan:     {full_sec:.3f}s ({len(full_out.splitlines())} lines)")
+        print(f"--sorted yes:  {seek_sec:.3f}s")
+        print(f"--sorted auto: {auto_sec:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""複数キーワードの部分一致を 1 回の走査で判定する Aho-Corasick オートマトン。
+
+標準ライブラリのみの純 Python 実装。判定コストは値の長さに比例し、
+キーワード数には依存しない。
+
+csvfilter-cli の `csvfilter_cli/ahocorasick.py` と同じ実装。各サンプルは互いに依存しない
+独立したパッケージなので、共有せずに複製している（直すときは両方を揃える）。
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Iterable
+
+
+class AhoCorasick:
+    """キーワード集合のいずれかを部分文字列として含むかを判定する。"""
+
+    def __init__(self, needles: Iterable[str]) -> None:
+        goto: list[dict[str, int]] = [{}]
+        out: list[bool] = [False]
+        count = 0
+        for needle in needles:
+            count += 1
+            state = 0
+            for ch in needle:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    out.append(False)
+                state = nxt
+            out[state] = True
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                target = goto[f].get(ch, 0)
+                fail[nxt] = target if target != nxt else 0
+                # 失敗遷移先が出力を持つなら、この状態でも一致とみなす
+                out[nxt] = out[nxt] or out[fail[nxt]]
+
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+        self._alphabet = frozenset(ch for edges in goto for ch in edges)
+        self.size = count
+
+    def search(self, text: str) -> bool:
+        """text がいずれかのキーワードを含めば True。"""
+
+        goto, fail, out, alphabet = self._goto, self._fail, self._out, self._alphabet
+        if out[0]:  # 空文字列のキーワードはすべてに一致する
+            return True
+        state = 0
+        for ch in text:
+            if ch not in alphabet:
+                # どのキーワードにも現れない文字で照合は必ず途切れる
+                state = 0
+                continue
+            while True:
+                nxt = goto[state].get(ch)
+                if nxt is not None:
+                    state = nxt
+                    break
+                if state == 0:
+                    break
+                state = fail[state]
+            if out[state]:
+                return True
+        return False
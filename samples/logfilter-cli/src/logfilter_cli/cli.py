@@ -3,11 +3,19 @@
 from __future__ import annotations
 
 import argparse
+import contextlib
 import datetime as dt
+import glob
+import itertools
+from collections.abc import Iterable, Iterator
 from pathlib import Path
 import sys
+import threading
+from typing import Any, TextIO
 
-from . import filters, parser
+from . import daterange, filters, follow, index, merge, parallel, parser
+
+WRITE_BATCH_LINES = 4096  # 出力時にまとめて書き出す行数
 
 
 def _parse_date(value: str) -> dt.date:
@@ -28,12 +36,29 @@ def build_parser() -> argparse.ArgumentParser:
     ap = argparse.ArgumentParser(
         prog="logfilter-cli",
         description="ログファイルをキーワードと日付範囲でフィルタします。",
+        epilog="日付の索引の作成・更新: logfilter-cli index <file>",
+    )
+    ap.add_argument(
+        "input",
+        nargs="+",
+        help="入力ログファイルのパス（複数指定可。glob パターンも展開する）",
     )
-    ap.add_argument("input", type=Path, help="入力ログファイルのパス")
     ap.add_argument(
         "--contains",
-        dest="keyword",
-        help="部分一致で探すキーワード（大文字小文字は無視）",
+        dest="keywords",
+        action="append",
+        help="部分一致で探すキーワード（大文字小文字は無視）。複数指定可",
+    )
+    ap.add_argument(
+        "--contains-file",
+        type=Path,
+        help="キーワードを 1 行に 1 つずつ書いたファイル（空行は無視）。--contains と併用可",
+    )
+    ap.add_argument(
+        "--match",
+        choices=["any", "all"],
+        default="any",
+        help="複数キーワードのいずれか（any, デフォルト）と全部（all）のどちらを含む行に一致するか",
     )
     ap.add_argument(
         "--date-from", type=_parse_date, help="YYYY-MM-DD 形式の開始日（含む）"
@@ -51,51 +76,293 @@ def build_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="キーワード検索で大文字小文字を区別する",
     )
+    ap.add_argument(
+        "--sorted",
+        choices=["auto", "yes"],
+        help=(
+            "ログが日付順に並んでいる場合、日付範囲の行を二分探索して該当部分だけを読む"
+            "（auto: 抜き取り検査で日付順でなければ全体を読む, yes: 日付順とみなす）"
+        ),
+    )
+    ap.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="N プロセスで並列にフィルタする（大きなファイルは行境界で分割。デフォルト 1）",
+    )
+    ap.add_argument(
+        "--merge",
+        action="store_true",
+        help="複数ファイルの結果を、ファイル順に連結する代わりに行頭の日時順にマージする",
+    )
+    ap.add_argument(
+        "-f",
+        "--follow",
+        action="store_true",
+        help=(
+            "ファイルを開いたまま、追記された行をフィルタしてすぐに出力する"
+            "（ローテーションと切り詰めに追従。Ctrl-C で終了）"
+        ),
+    )
+    return ap
+
+
+def build_index_parser() -> argparse.ArgumentParser:
+    """`index` サブコマンド用の ArgumentParser を生成する。"""
+
+    ap = argparse.ArgumentParser(
+        prog="logfilter-cli index",
+        description=(
+            "日付ごとのバイトオフセットの索引をログファイルの隣に作成します。"
+            "既存の索引があり、ファイルが追記されただけなら追記分だけを読んで更新します。"
+        ),
+    )
+    ap.add_argument("input", type=Path, help="入力ログファイルのパス")
+    ap.add_argument(
+        "--every",
+        type=int,
+        help="N 行ごとの行頭オフセットも記録する（既存の索引と異なる値なら作り直す）",
+    )
+    ap.add_argument(
+        "--rebuild", action="store_true", help="追記分だけでなく索引全体を作り直す"
+    )
     return ap
 
 
-def _load_entries(path: Path):
-    """ファイルを読み込み、LogEntry のリストを返す。
+def _iter_entries(
+    path: Path, byte_ranges: list[tuple[int, int]] | None = None
+) -> Iterator[parser.LogEntry]:
+    """ファイルを 1 行ずつ読み込み、LogEntry を順に返す。
+
+    ファイル全体を読み込まないため、数十 GB のログでもメモリ使用量は一定。
+    byte_ranges を指定した場合は、各バイト範囲 [start, end) の行だけを順に読む。
+    ファイルは最後まで読むか、ジェネレーターが閉じられた時点で閉じる。
+    """
+
+    if byte_ranges is None:
+        with path.open("r", encoding="utf-8") as f:
+            yield from parser.iter_entries(f)
+        return
+    for start, end in byte_ranges:
+        with daterange.open_range(path, start, end) as f:
+            yield from parser.iter_entries(f)
+
+
+def _expand_inputs(ap: argparse.ArgumentParser, patterns: list[str]) -> list[Path]:
+    """入力の指定をファイルの一覧にする。
+
+    存在しないパスに glob の記号（`*` `?` `[`）があれば、パターンとして展開して
+    名前順に並べる。一致するファイルが無い場合や、記号の無いパスが存在しない場合はエラー。
+    """
+
+    paths: list[Path] = []
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.exists():
+            paths.append(path)
+        elif any(c in pattern for c in "*?["):
+            matches = sorted(Path(m) for m in glob.glob(pattern) if Path(m).is_file())
+            if not matches:
+                ap.error(f"パターンに一致するファイルがありません: {pattern}")
+            paths.extend(matches)
+        else:
+            ap.error(f"入力ファイルが見つかりません: {pattern}")
+    return paths
+
+
+def _read_keywords(ap: argparse.ArgumentParser, path: Path) -> list[str]:
+    """キーワードファイルを読み、空行を除いたキーワードの一覧を返す。
 
-    単純な一括読み込み。ログは通常テキスト量が小さい想定のためメモリ優先。
+    行末の改行だけを取り除き、前後の空白はキーワードの一部として扱う。
     """
 
-    with path.open("r", encoding="utf-8") as f:
-        return [parser.parse_line(line) for line in f]
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            keywords = [line.rstrip("\r\n") for line in f]
+    except (OSError, UnicodeDecodeError) as exc:
+        ap.error(f"キーワードファイルを読み込めません: {path} ({exc})")
+    keywords = [keyword for keyword in keywords if keyword]
+    if not keywords:
+        ap.error(f"キーワードファイルにキーワードがありません: {path}")
+    return keywords
+
+
+def _filtered_lines(
+    path: Path,
+    byte_ranges: list[tuple[int, int]] | None,
+    **options: Any,
+) -> Iterator[str]:
+    """1 ファイル分のフィルタ結果を、改行で終わる出力行として順に返す。
+
+    options は filters.iter_filtered のキーワード引数。
+    """
+
+    entries = _iter_entries(path, byte_ranges)
+    for entry in filters.iter_filtered(entries, **options):
+        yield entry.raw if entry.raw.endswith("\n") else f"{entry.raw}\n"
+
+
+def _date_ranges(
+    path: Path,
+    sorted_mode: str | None,
+    date_from: dt.date | None,
+    date_to: dt.date | None,
+) -> list[tuple[int, int]] | None:
+    """日付範囲の行を含むバイト範囲の一覧を返す。None ならファイル全体を読む。
+
+    索引があればそれを使い、無ければ --sorted の指定に従って二分探索する。
+    """
 
+    log_index = index.load_index(path)
+    if log_index is not None:
+        return log_index.date_ranges(date_from, date_to, path.stat().st_size)
+    if sorted_mode is None:
+        return None
+    byte_range = _sorted_range(path, sorted_mode, date_from, date_to)
+    return None if byte_range is None else [byte_range]
 
-def _write_output(entries, output: Path | None):
-    """フィルタ結果を出力する。"""
 
-    lines = [
-        entry.raw if entry.raw.endswith("\n") else f"{entry.raw}\n" for entry in entries
-    ]
+def _sorted_range(
+    path: Path, mode: str, date_from: dt.date | None, date_to: dt.date | None
+) -> tuple[int, int] | None:
+    """日付順のファイルで日付範囲に当たるバイト範囲を返す。
+
+    mode が auto で日付順でなさそうな場合は、警告を出して None（全体を読む）を返す。
+    """
+
+    if mode == "auto" and not daterange.looks_sorted(path):
+        print(
+            f"日付順ではないため、ファイル全体を読み込みます: {path}",
+            file=sys.stderr,
+        )
+        return None
+    return daterange.find_range(path, date_from, date_to)
+
+
+def _write_output(lines: Iterable[str], output: Path | None) -> None:
+    """出力行を WRITE_BATCH_LINES 行ずつまとめて出力する。"""
+
     if output is None:
-        sys.stdout.writelines(lines)
+        _write_batches(sys.stdout, lines)
     else:
         output.parent.mkdir(parents=True, exist_ok=True)
         with output.open("w", encoding="utf-8") as f:
-            f.writelines(lines)
+            _write_batches(f, lines)
+
+
+def _write_batches(out: TextIO, lines: Iterable[str]) -> None:
+    """lines を一定行数ずつまとめ、書き込みの呼び出し回数を減らす。"""
+
+    it = iter(lines)
+    while batch := list(itertools.islice(it, WRITE_BATCH_LINES)):
+        out.writelines(batch)
 
 
 def main(argv: list[str] | None = None) -> int:
     """エントリーポイント。引数を解釈してフィルタ処理を実行する。"""
 
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["index"]:
+        return _index_main(argv[1:])
     ap = build_parser()
     args = ap.parse_args(argv)
 
+    if args.jobs < 1:
+        ap.error("--jobs は 1 以上で指定してください")
+    if args.follow and (args.jobs > 1 or args.merge or args.sorted is not None):
+        ap.error("--follow と --jobs / --merge / --sorted は同時に指定できません")
+    inputs = _expand_inputs(ap, args.input)
+    if args.follow and len(inputs) != 1:
+        ap.error("--follow では入力ファイルを 1 つだけ指定してください")
+    if args.output is not None and args.output.exists():
+        # 読みながら書き出すため、同じファイルだと読み終える前に中身が消える
+        for path in inputs:
+            if args.output.samefile(path):
+                ap.error(f"入力ファイルと出力先が同じです: {args.output}")
+
+    keywords = list(args.keywords or [])
+    if args.contains_file is not None:
+        keywords.extend(_read_keywords(ap, args.contains_file))
+    options: dict[str, Any] = {
+        "keyword": keywords or None,
+        "match_all": args.match == "all",
+        "date_from": args.date_from,
+        "date_to": args.date_to,
+        "case_sensitive": bool(args.case_sensitive),
+    }
+    if args.follow:
+        return _follow(inputs[0], args.output, options)
+
+    plans: list[parallel.Plan] = []
+    for path in inputs:
+        byte_ranges = None
+        if args.date_from is not None or args.date_to is not None:
+            byte_ranges = _date_ranges(path, args.sorted, args.date_from, args.date_to)
+        plans.append((path, byte_ranges))
+
+    if args.jobs > 1:
+        streams = parallel.filter_files(plans, jobs=args.jobs, **options)
+    else:
+        streams = contextlib.nullcontext(
+            [_filtered_lines(path, ranges, **options) for path, ranges in plans]
+        )
+    with streams as per_file:
+        if args.merge:
+            lines = merge.merge_by_date(per_file)
+        else:
+            lines = itertools.chain.from_iterable(per_file)
+        _write_output(lines, args.output)
+    return 0
+
+
+def _follow(path: Path, output: Path | None, options: dict[str, Any]) -> int:
+    """追記された行をブロックごとにフィルタし、一致した行をすぐに書き出す。
+
+    Ctrl-C（KeyboardInterrupt）で終了する。options は filters.filter_entries の
+    キーワード引数。
+    """
+
+    if output is None:
+        out: TextIO = sys.stdout
+    else:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        out = output.open("w", encoding="utf-8")
+    try:
+        for lines in follow.follow_lines(path, threading.Event()):
+            matched = filters.filter_entries(parser.iter_entries(lines), **options)
+            if matched:
+                out.writelines(entry.raw for entry in matched)
+                out.flush()  # 監視用途のため、一致した行はバッファに溜めない
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 0
+
+
+def _index_main(argv: list[str]) -> int:
+    """`index` サブコマンド。入力ログの隣に日付の索引を作成・更新する。"""
+
+    ap = build_index_parser()
+    args = ap.parse_args(argv)
+
     if not args.input.exists():
         ap.error(f"入力ファイルが見つかりません: {args.input}")
+    if args.every is not None and args.every < 0:
+        ap.error("--every は 0 以上で指定してください")
+    try:
+        log_index, added = index.update_index(
+            args.input, every=args.every, rebuild=args.rebuild
+        )
+    except OSError as exc:
+        ap.error(f"索引を書き込めません: {exc}")
 
-    entries = _load_entries(args.input)
-    filtered = filters.filter_entries(
-        entries,
-        keyword=args.keyword,
-        date_from=args.date_from,
-        date_to=args.date_to,
-        case_sensitive=bool(args.case_sensitive),
+    print(
+        f"{index.sidecar_path(args.input)}: {log_index.lines} 行, "
+        f"{len(log_index.dates)} 日付（今回読んだ行: {added}）"
     )
-    _write_output(filtered, args.output)
     return 0
 
 
@@ -0,0 +1,134 @@
+"""日付順に並んだログファイルから、日付範囲に当たる部分だけを読むためのモジュール。
+
+主な機能:
+- `find_range` でバイトオフセットを二分探索し、日付範囲に当たる行の範囲を求める。
+  探索位置は次の行頭に合わせ、日付の無い行は読み飛ばして次の日付のある行で判定する。
+- `looks_sorted` でファイル全体から抜き取った行の日付が昇順かを確かめる。
+- `open_range` で求めたバイト範囲だけをテキストとして読む。
+
+改行は LF（または CRLF）を前提とする。日付の判定は `parser.parse_line` と同じ。
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import io
+from collections.abc import Callable
+from pathlib import Path
+from typing import BinaryIO, TextIO
+
+from . import parser
+
+DEFAULT_SAMPLES = 64  # looks_sorted で日付を確かめる位置の数
+
+
+def find_range(
+    path: Path, date_from: dt.date | None, date_to: dt.date | None
+) -> tuple[int, int]:
+    """日付範囲の行を含むバイト範囲 [start, end) を返す。
+
+    start は date_from 以降の日付を持つ最初の行の先頭、end は date_to より後の日付を
+    持つ最初の行の先頭（無ければファイル末尾）。ファイルが日付順であることが前提で、
+    範囲内の日付の無い行も含む（日付フィルタで除外される）。
+    """
+
+    with path.open("rb") as f:
+        size = f.seek(0, io.SEEK_END)
+        start = 0
+        if date_from is not None:
+            start = _first_line(f, 0, size, lambda date: date >= date_from)
+        end = size
+        if date_to is not None:
+            end = _first_line(f, start, size, lambda date: date > date_to)
+    return start, end
+
+
+def looks_sorted(path: Path, samples: int = DEFAULT_SAMPLES) -> bool:
+    """ファイル内の samples 箇所から読んだ日付が昇順に並んでいるかを返す。
+
+    抜き取り検査のため、見なかった位置の並びまでは保証しない。
+    """
+
+    with path.open("rb") as f:
+        size = f.seek(0, io.SEEK_END)
+        previous: dt.date | None = None
+        for i in range(samples + 1):
+            found = _next_dated(f, size * i // samples)
+            if found is None:
+                break
+            date = found[1]
+            if previous is not None and date < previous:
+                return False
+            previous = date
+    return True
+
+
+def open_range(path: Path, start: int, end: int) -> TextIO:
+    """ファイルの [start, end) のバイト範囲だけを読む UTF-8 のテキストストリームを返す。"""
+
+    raw = path.open("rb", buffering=0)
+    raw.seek(start)
+    return io.TextIOWrapper(
+        io.BufferedReader(_Slice(raw, end - start)), encoding="utf-8"
+    )
+
+
+def _first_line(
+    f: BinaryIO, lo: int, hi: int, reached: Callable[[dt.date], bool]
+) -> int:
+    """[lo, hi) で、日付が reached を満たす最初の行の先頭を二分探索する（無ければ hi）。"""
+
+    size = hi
+    while lo < hi:
+        mid = (lo + hi) // 2
+        found = _next_dated(f, mid)
+        if found is None or reached(found[1]):
+            hi = mid
+        else:
+            lo = mid + 1
+    found = _next_dated(f, lo)
+    return size if found is None else found[0]
+
+
+def _next_dated(f: BinaryIO, pos: int) -> tuple[int, dt.date] | None:
+    """pos 以降に始まる行のうち、日付のある最初の行の (行頭のオフセット, 日付) を返す。"""
+
+    if pos > 0:
+        # pos が行の途中なら、その行の残りを読み飛ばして次の行頭に合わせる
+        f.seek(pos - 1)
+        f.readline()
+    else:
+        f.seek(0)
+    while True:
+        start = f.tell()
+        line = f.readline()
+        if not line:
+            return None
+        date = parser.parse_line(line.decode("utf-8", errors="replace")).date
+        if date is not None:
+            return start, date
+
+
+class _Slice(io.RawIOBase):
+    """ファイルの現在位置から length バイトだけを読めるストリーム。"""
+
+    def __init__(self, raw: BinaryIO, length: int) -> None:
+        super().__init__()
+        self._raw = raw
+        self._remaining = length
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: bytearray | memoryview) -> int:  # type: ignore[override]
+        if self._remaining <= 0:
+            return 0
+        view = memoryview(buffer)[: self._remaining]
+        n = self._raw.readinto(view)  # type: ignore[attr-defined]
+        self._remaining -= n
+        return n
+
+    def close(self) -> None:
+        if not self.closed:
+            self._raw.close()
+        super().close()
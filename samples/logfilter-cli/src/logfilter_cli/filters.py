@@ -3,25 +3,79 @@
 from __future__ import annotations
 
 import datetime as dt
-from collections.abc import Iterable
+import functools
+from collections.abc import Callable, Iterable, Iterator, Sequence
 
+from .ahocorasick import AhoCorasick
 from .parser import LogEntry
 
+# any でこれ以上のキーワードを探すときはオートマトンを使う
+AHO_CORASICK_MIN_KEYWORDS = 64
+
 
 def keyword_match(
     entry: LogEntry, keyword: str, *, case_sensitive: bool = False
 ) -> bool:
     """部分一致によるキーワードフィルタを評価する。
 
-    デフォルトは大文字小文字を区別しない。CLI の仕様に合わせ、1 キーワードのみを扱う。
+    デフォルトは大文字小文字を区別しない。1 キーワードだけを調べる場合のヘルパー。
+    """
+
+    return keyword_matcher([keyword], case_sensitive=case_sensitive)(entry.raw)
+
+
+def keyword_matcher(
+    keywords: Sequence[str], *, match_all: bool = False, case_sensitive: bool = False
+) -> Callable[[str], bool]:
+    """行が keywords のいずれか（match_all なら全部）を部分一致で含むかを返す関数を作る。
+
+    キーワードは作成時に 1 回だけ小文字にし、行は 1 回だけ小文字にしてから全キーワードを
+    探す。any でキーワードが AHO_CORASICK_MIN_KEYWORDS 個以上なら Aho-Corasick
+    オートマトンで行を 1 回だけ走査し、all は最初に見つからないキーワードで打ち切る。
+    同じ条件の関数は使い回す。
     """
 
-    haystack = entry.raw
-    needle = keyword
+    return _keyword_matcher(tuple(keywords), match_all, case_sensitive)
+
+
+@functools.lru_cache(maxsize=32)
+def _keyword_matcher(
+    keywords: tuple[str, ...], match_all: bool, case_sensitive: bool
+) -> Callable[[str], bool]:
+    # re.IGNORECASE の正規表現は、CPython では行を小文字にしたコピーを `in` で探すより
+    # 数倍遅い（キーワードが多いほど差が開く）ため使わない
     if not case_sensitive:
-        haystack = haystack.lower()
-        needle = keyword.lower()
-    return needle in haystack
+        keywords = tuple(keyword.lower() for keyword in keywords)
+    needles = tuple(dict.fromkeys(keywords))  # 重複を除く
+
+    found: Callable[[str], bool]
+    if match_all:
+
+        def found(text: str) -> bool:
+            for needle in needles:
+                if needle not in text:
+                    return False
+            return True
+
+    elif len(needles) >= AHO_CORASICK_MIN_KEYWORDS:
+        found = AhoCorasick(needles).search
+    elif len(needles) == 1:
+        needle = needles[0]
+
+        def found(text: str) -> bool:
+            return needle in text
+
+    else:
+
+        def found(text: str) -> bool:
+            for needle in needles:
+                if needle in text:
+                    return True
+            return False
+
+    if case_sensitive:
+        return found
+    return lambda raw: found(raw.lower())
 
 
 def date_in_range(
@@ -36,34 +90,68 @@ def date_in_range(
     if date_from is None and date_to is None:
         return True
 
-    if entry.date is None:
+    date = entry.date  # 初めて参照したときに行頭から求められる
+    if date is None:
         # 仕様: 日付フィルタ指定時、日付を持たない行は結果に含めない。
         return False
 
-    if date_from is not None and entry.date < date_from:
+    if date_from is not None and date < date_from:
         return False
-    if date_to is not None and entry.date > date_to:
+    if date_to is not None and date > date_to:
         return False
     return True
 
 
-def filter_entries(
+def iter_filtered(
     entries: Iterable[LogEntry],
     *,
-    keyword: str | None,
+    keyword: str | Sequence[str] | None,
     date_from: dt.date | None,
     date_to: dt.date | None,
     case_sensitive: bool = False,
-) -> list[LogEntry]:
-    """キーワードと日付の AND 条件でログをフィルタするヘルパー。"""
+    match_all: bool = False,
+) -> Iterator[LogEntry]:
+    """キーワードと日付の AND 条件に一致するログを、読み進めながら順に返す。
+
+    entries を 1 件ずつ評価して一致したものだけを返すため、結果をリストに溜めない。
+    keyword には複数のキーワードも指定でき、いずれか（match_all なら全部）を含む行が一致する。
+    """
 
-    filtered: list[LogEntry] = []
+    matches = None
+    if keyword is not None:
+        keywords = [keyword] if isinstance(keyword, str) else keyword
+        matches = keyword_matcher(
+            keywords, match_all=match_all, case_sensitive=case_sensitive
+        )
     for entry in entries:
-        if keyword is not None and not keyword_match(
-            entry, keyword, case_sensitive=case_sensitive
-        ):
+        if matches is not None and not matches(entry.raw):
             continue
         if not date_in_range(entry, date_from=date_from, date_to=date_to):
             continue
-        filtered.append(entry)
-    return filtered
+        yield entry
+
+
+def filter_entries(
+    entries: Iterable[LogEntry],
+    *,
+    keyword: str | Sequence[str] | None,
+    date_from: dt.date | None,
+    date_to: dt.date | None,
+    case_sensitive: bool = False,
+    match_all: bool = False,
+) -> list[LogEntry]:
+    """キーワードと日付の AND 条件でログをフィルタするヘルパー。
+
+    結果をリストで返す。大きな入力には `iter_filtered` を使う。
+    """
+
+    return list(
+        iter_filtered(
+            entries,
+            keyword=keyword,
+            date_from=date_from,
+            date_to=date_to,
+            case_sensitive=case_sensitive,
+            match_all=match_all,
+        )
+    )
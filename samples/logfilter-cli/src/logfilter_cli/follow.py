@@ -0,0 +1,108 @@
+"""追記されていくログファイルを追いかけて、新しい行を読むモジュール（`--follow`）。
+
+ファイルを開いたまま追記されたデータをブロック単位で読み、改行で終わった行を返す。
+新しいデータが無い間は、待ち時間を FOLLOW_MIN_INTERVAL から FOLLOW_MAX_INTERVAL まで
+倍々に延ばしながらブロックして待つため、アイドル時の CPU 使用量はほぼ 0 になる。
+
+パスの inode（とデバイス）が開いているファイルと変わればローテーションとみなし、
+古いファイルを読み切ってから新しいファイルを先頭から読む。サイズが読んだ位置より
+小さくなれば切り詰め（copytruncate）とみなして先頭から読み直す。
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+from typing import BinaryIO
+
+READ_BLOCK_SIZE = 1 << 16
+FOLLOW_MIN_INTERVAL = 0.01  # 秒。データが来た直後のポーリング間隔
+FOLLOW_MAX_INTERVAL = 0.25  # 秒。アイドル時のポーリング間隔の上限（遅延の上限にもなる）
+
+
+def follow_lines(
+    path: Path,
+    stop: threading.Event,
+    *,
+    from_start: bool = False,
+    min_interval: float = FOLLOW_MIN_INTERVAL,
+    max_interval: float = FOLLOW_MAX_INTERVAL,
+) -> Iterator[list[str]]:
+    """path に追記された行を、読めたブロックごとに改行付きの行のリストで返す。
+
+    from_start が偽なら開いた時点の末尾から読む。書きかけの行は改行が追記されるまで
+    返さない（ローテーション時に古いファイルの末尾に残った書きかけの行は、改行を補って返す）。
+    stop がセットされると、待機中でもすぐに終わる。
+    """
+
+    f = path.open("rb", buffering=0)
+    try:
+        if not from_start:
+            f.seek(0, io.SEEK_END)
+        pending = b""
+        interval = min_interval
+        while not stop.is_set():
+            data = f.read(READ_BLOCK_SIZE)
+            if data:
+                lines, pending = _split_lines(pending + data)
+                if lines:
+                    yield lines
+                interval = min_interval
+                continue
+
+            change = _detect_change(path, f)
+            if change == "rotated":
+                # 古いファイルは読み切った（read が空）ので、残りを出して新しいファイルに移る
+                if pending:
+                    yield _split_lines(pending + b"\n")[0]
+                    pending = b""
+                try:
+                    reopened = path.open("rb", buffering=0)
+                except FileNotFoundError:
+                    pass  # 新しいファイルがまだ作られていない
+                else:
+                    f.close()
+                    f = reopened
+                    interval = min_interval
+                    continue
+            elif change == "truncated":
+                f.seek(0)
+                pending = b""
+                interval = min_interval
+                continue
+
+            stop.wait(interval)
+            interval = min(interval * 2, max_interval)
+    finally:
+        f.close()
+
+
+def _detect_change(path: Path, f: BinaryIO) -> str | None:
+    """path が別のファイルに置き換わっていれば "rotated"、切り詰められていれば "truncated"。"""
+
+    try:
+        current = os.stat(path)
+    except FileNotFoundError:
+        return "rotated"  # 移動や削除の直後。新しいファイルができるまで待つ
+    opened = os.fstat(f.fileno())
+    if (current.st_dev, current.st_ino) != (opened.st_dev, opened.st_ino):
+        return "rotated"
+    if current.st_size < f.tell():
+        return "truncated"
+    return None
+
+
+def _split_lines(buffer: bytes) -> tuple[list[str], bytes]:
+    """buffer を改行で終わる行のリストと、残りの書きかけの行に分ける。
+
+    通常の読み込みと同じく CRLF は LF にそろえる。途中で切れた UTF-8 は置換文字にする。
+    """
+
+    cut = buffer.rfind(b"\n") + 1
+    if not cut:
+        return [], buffer
+    text = buffer[:cut].decode("utf-8", errors="replace").replace("\r\n", "\n")
+    return [f"{line}\n" for line in text.split("\n")[:-1]], buffer[cut:]
@@ -0,0 +1,222 @@
+"""ログファイルの日付からバイトオフセットを引くサイドカー索引。
+
+`logfilter-cli index <file>` でログの隣に `<ファイル名>.lfidx` を作成する。索引には
+日付ごとに、その日付の最初の行の先頭オフセットと行番号、最後の行の末尾オフセットを持ち、
+任意で N 行ごとの行頭オフセット（チェックポイント）も持つ。
+
+ファイルが追記で伸びた場合は、索引済みの末尾から続きだけを読んで索引を伸ばす。
+索引済みの部分の先頭と末尾のバイト列のハッシュが変わっていれば、ローテーションなどで
+書き換えられたとみなして作り直す（途中だけの書き換えは検出できないので `--rebuild` を使う）。
+索引は改行で終わる行までを対象とし、書きかけの最終行は次の更新に回す。
+
+ファイル形式:
+    マジック行 / メタデータ JSON の長さ（8 バイト LE）/ メタデータ JSON /
+    int64 のチェックポイント配列
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import hashlib
+import json
+import sys
+from array import array
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import BinaryIO
+
+from . import parser
+
+INDEX_SUFFIX = ".lfidx"
+FINGERPRINT_BYTES = 4096  # 追記かどうかの判定でハッシュを取る先頭・末尾のバイト数
+_MAGIC = b"LOGFILTER-INDEX 1\n"
+
+
+@dataclass
+class DateSpan:
+    """索引内の 1 日付分の位置。
+
+    Attributes:
+        start: その日付の最初の行の先頭オフセット。
+        line: その日付の最初の行の行番号（1 始まり）。
+        end: その日付の最後の行の末尾オフセット。
+    """
+
+    start: int
+    line: int
+    end: int
+
+
+@dataclass
+class LogIndex:
+    """ログファイル 1 つ分の索引。
+
+    Attributes:
+        size: 索引済みのバイト数（改行で終わる最後の行の末尾）。
+        lines: 索引済みの行数。
+        every: チェックポイントの間隔（0 なら持たない）。
+        dates: 日付 → DateSpan。
+        checkpoints: k 番目（0 始まり）が (k + 1) * every 行目の末尾のオフセット。
+        fingerprint: 索引済みの部分の先頭と末尾のハッシュ。
+    """
+
+    size: int = 0
+    lines: int = 0
+    every: int = 0
+    dates: dict[dt.date, DateSpan] = field(default_factory=dict)
+    checkpoints: array[int] = field(default_factory=lambda: array("q"))
+    fingerprint: str = ""
+
+    def date_ranges(
+        self, date_from: dt.date | None, date_to: dt.date | None, file_size: int
+    ) -> list[tuple[int, int]]:
+        """日付範囲の行を含むバイト範囲 [start, end) の一覧を返す。
+
+        索引済みの部分は範囲内の日付の DateSpan をすべて覆う 1 つの範囲に絞るため、
+        日付順でないファイルでも範囲内の行は漏れない。索引より後に追記された部分
+        （file_size まで）はそのまま読む。
+        """
+
+        spans = [
+            span
+            for date, span in self.dates.items()
+            if (date_from is None or date >= date_from)
+            and (date_to is None or date <= date_to)
+        ]
+        ranges: list[tuple[int, int]] = []
+        if spans:
+            ranges.append((min(s.start for s in spans), max(s.end for s in spans)))
+        if file_size > self.size:
+            if ranges and ranges[-1][1] == self.size:
+                ranges[-1] = (ranges[-1][0], file_size)
+            else:
+                ranges.append((self.size, file_size))
+        return ranges
+
+
+def sidecar_path(path: Path) -> Path:
+    """path に対応する索引ファイルのパス。"""
+    return path.with_name(path.name + INDEX_SUFFIX)
+
+
+def load_index(path: Path) -> LogIndex | None:
+    """path の索引を読み込む。索引が無い・壊れている・path が書き換えられた場合は None。
+
+    path が索引作成後に追記されただけなら、索引済みの部分の索引として返す。
+    """
+
+    try:
+        data = sidecar_path(path).read_bytes()
+        log_index = _decode(data)
+        with path.open("rb") as f:
+            fresh = _fingerprint(f, log_index.size) == log_index.fingerprint
+    except (OSError, ValueError, KeyError):
+        return None
+    return log_index if fresh else None
+
+
+def update_index(
+    path: Path, *, every: int | None = None, rebuild: bool = False
+) -> tuple[LogIndex, int]:
+    """path の索引を作成または追記分だけ更新して書き出し、(索引, 新たに読んだ行数) を返す。
+
+    every を指定しなければ既存の索引の間隔（新規なら 0）を使い、既存と異なる間隔を
+    指定した場合や rebuild が真の場合は作り直す。
+    """
+
+    log_index = None if rebuild else load_index(path)
+    if log_index is None or (every is not None and every != log_index.every):
+        log_index = LogIndex(every=every or 0)
+    before = log_index.lines
+    with path.open("rb") as f:
+        _extend(f, log_index)
+        log_index.fingerprint = _fingerprint(f, log_index.size)
+    _write(sidecar_path(path), log_index)
+    return log_index, log_index.lines - before
+
+
+def _extend(f: BinaryIO, log_index: LogIndex) -> None:
+    """索引済みの末尾から改行で終わる行を読み、log_index に追加する。"""
+
+    f.seek(log_index.size)
+    offset, lines, every = log_index.size, log_index.lines, log_index.every
+    dates, checkpoints = log_index.dates, log_index.checkpoints
+    for line in f:
+        if not line.endswith(b"\n"):
+            break  # 書きかけの行は次の更新で読む
+        lines += 1
+        end = offset + len(line)
+        date = parser.parse_line(line.decode("utf-8", errors="replace")).date
+        if date is not None:
+            span = dates.get(date)
+            if span is None:
+                dates[date] = DateSpan(offset, lines, end)
+            else:
+                span.end = end
+        if every and lines % every == 0:
+            checkpoints.append(end)
+        offset = end
+    log_index.size, log_index.lines = offset, lines
+
+
+def _fingerprint(f: BinaryIO, size: int) -> str:
+    """ファイルの [0, size) の先頭と末尾 FINGERPRINT_BYTES バイトのハッシュ。"""
+
+    if f.seek(0, 2) < size:
+        return ""  # 索引済みの部分より短い（切り詰められた）
+    hasher = hashlib.blake2b(digest_size=16)
+    f.seek(0)
+    hasher.update(f.read(min(size, FINGERPRINT_BYTES)))
+    tail = max(size - FINGERPRINT_BYTES, 0)
+    f.seek(tail)
+    hasher.update(f.read(size - tail))
+    return hasher.hexdigest()
+
+
+def _write(target: Path, log_index: LogIndex) -> None:
+    meta = {
+        "byteorder": sys.byteorder,
+        "size": log_index.size,
+        "lines": log_index.lines,
+        "every": log_index.every,
+        "fingerprint": log_index.fingerprint,
+        "dates": [
+            [date.isoformat(), span.start, span.line, span.end]
+            for date, span in sorted(log_index.dates.items())
+        ],
+    }
+    encoded = json.dumps(meta).encode("utf-8")
+    tmp = target.with_name(target.name + ".tmp")
+    try:
+        with tmp.open("wb") as out:
+            out.write(_MAGIC)
+            out.write(len(encoded).to_bytes(8, "little"))
+            out.write(encoded)
+            out.write(log_index.checkpoints.tobytes())
+        tmp.replace(target)  # 読み手が書きかけの索引を見ないよう、置き換えで公開する
+    except OSError:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def _decode(data: bytes) -> LogIndex:
+    if not data.startswith(_MAGIC):
+        raise ValueError("索引ファイルの形式が不正です")
+    start = len(_MAGIC) + 8
+    length = int.from_bytes(data[len(_MAGIC) : start], "little")
+    meta = json.loads(data[start : start + length].decode("utf-8"))
+    if meta["byteorder"] != sys.byteorder:
+        raise ValueError("索引ファイルのバイト順が異なります")
+    checkpoints = array("q")
+    checkpoints.frombytes(data[start + length :])
+    return LogIndex(
+        size=meta["size"],
+        lines=meta["lines"],
+        every=meta["every"],
+        dates={
+            dt.date.fromisoformat(date): DateSpan(begin, line, end)
+            for date, begin, line, end in meta["dates"]
+        },
+        checkpoints=checkpoints,
+        fingerprint=meta["fingerprint"],
+    )
@@ -0,0 +1,44 @@
+"""複数ファイルのフィルタ結果を、行頭の日時の順に 1 つにまとめるモジュール。"""
+
+from __future__ import annotations
+
+import datetime as dt
+import heapq
+from collections.abc import Iterable, Iterator, Sequence
+from operator import itemgetter
+
+from . import parser
+
+_Key = tuple[dt.date, str]
+
+
+def merge_by_date(streams: Sequence[Iterable[str]]) -> Iterator[str]:
+    """ファイルごとの出力行を、行頭の日時の順にヒープで k-way マージする。
+
+    日時は行頭の日付と、続くトークンが `HH:` で始まればその時刻の文字列で比べる。
+    各ファイルの中の順序はそのまま保ち、日時が同じ行は streams で先に指定した
+    ファイルの行を先に出す。日付の無い行（スタックトレースの続きなど）は、
+    同じファイルで直前に出力した行と同じ日時として扱う。
+    """
+
+    keyed = [_keyed(lines) for lines in streams]
+    return map(itemgetter(1), heapq.merge(*keyed, key=itemgetter(0)))
+
+
+def _keyed(lines: Iterable[str]) -> Iterator[tuple[_Key, str]]:
+    key: _Key = (dt.date.min, "")
+    for line in lines:
+        date = parser.parse_line(line).date
+        if date is not None:
+            key = (date, _time_of(line))
+        yield key, line
+
+
+def _time_of(line: str) -> str:
+    """日付の次のトークンが時刻（`HH:` で始まる）ならその文字列、でなければ空文字列。"""
+
+    parts = line.split(None, 2)
+    token = parts[1] if len(parts) > 1 else ""
+    if token[:2].isdigit() and token[2:3] == ":":
+        return token
+    return ""
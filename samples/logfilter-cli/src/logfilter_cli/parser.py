@@ -2,40 +2,102 @@
 
 主な機能:
 - `parse_line` で 1 行をパースし、日付やトークンを保持した `LogEntry` を返す。
+- `iter_entries` で行の iterable を 1 行ずつ遅延パースする。
 """
 
 from __future__ import annotations
 
-import dataclasses
 import datetime as dt
-import re
+import functools
+from collections.abc import Iterable, Iterator
+from typing import Any
 
-DATE_PREFIX_PATTERN = re.compile(r"^(?P<date>\d{4}-\d{2}-\d{2})")
+_UNPARSED: Any = object()  # 日付をまだ求めていないことを表す番兵
 
 
-@dataclasses.dataclass(frozen=True)
 class LogEntry:
     """ログ 1 行分の構造化データ。
 
+    1 行ごとに作られるため `__slots__` で小さく保ち、日付とトークンは初めて参照された
+    ときに raw から求めて保持する。フィルタが使わない値は計算もメモリ確保もしない。
+    以前のデータクラスと同じく `LogEntry(date=..., tokens=..., raw=...)` でも作れ、
+    指定した値はそのまま使う。等価性は全属性で比べ、ハッシュは raw で決まる。
+
     Attributes:
         date: 行頭に YYYY-MM-DD があればその日付。形式不正または欠如の場合は None。
         tokens: スペース区切りで分割したトークン一覧。
         raw: 元の行テキスト。
     """
 
-    date: dt.date | None
-    tokens: list[str]
-    raw: str
+    __slots__ = ("raw", "_date", "_tokens")
+
+    def __init__(
+        self,
+        raw: str,
+        date: dt.date | None = _UNPARSED,
+        tokens: list[str] | None = None,
+    ) -> None:
+        self.raw = raw
+        self._date = date
+        self._tokens = tokens
+
+    @property
+    def date(self) -> dt.date | None:
+        date = self._date
+        if date is _UNPARSED:
+            date = self._date = _date_prefix(self.raw)
+        return date
+
+    @property
+    def tokens(self) -> list[str]:
+        tokens = self._tokens
+        if tokens is None:
+            tokens = self._tokens = self.raw.split()
+        return tokens
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, LogEntry):
+            return NotImplemented
+        if self.raw != other.raw:
+            return False
+        return self.date == other.date and self.tokens == other.tokens
+
+    def __hash__(self) -> int:
+        return hash(self.raw)
+
+    def __repr__(self) -> str:
+        return f"LogEntry(date={self.date!r}, tokens={self.tokens!r}, raw={self.raw!r})"
+
+
+def _date_prefix(line: str) -> dt.date | None:
+    """先頭のトークンが YYYY-MM-DD ならその日付を返す。
+
+    先頭の空白は読み飛ばす。トークンが日付より長い場合（`2025-11-01T10:00` など）は None。
+    """
 
+    if line[:1].isspace():
+        line = line.lstrip()
+    after = line[10:11]
+    if after and not after.isspace():
+        return None
+    return _parse_date(line[:10])
 
-def _parse_date(token: str) -> dt.date | None:
-    """YYYY-MM-DD 形式の文字列を日付に変換する。
 
-    不正な値は None を返す。日付フィルタは行頭限定のため、単一トークンのみ扱う。
+@functools.lru_cache(maxsize=4096)
+def _parse_date(head: str) -> dt.date | None:
+    """10 文字の YYYY-MM-DD を日付に変換する。不正な値は None。
+
+    正規表現と fromisoformat の代わりに、区切りの `-` と数字の位置を固定オフセットで
+    確かめる。ログに現れる日付の種類は少ないため、変換結果をキャッシュする。
     """
 
+    if len(head) != 10 or head[4] != "-" or head[7] != "-" or not head.isascii():
+        return None
+    year, month, day = head[:4], head[5:7], head[8:]
+    if not (year.isdigit() and month.isdigit() and day.isdigit()):
+        return None
     try:
-        return dt.date.fromisoformat(token)
+        return dt.date(int(year), int(month), int(day))
     except ValueError:
         return None
 
@@ -43,15 +105,17 @@ def _parse_date(token: str) -> dt.date | None:
 def parse_line(line: str) -> LogEntry:
     """1 行のログ文字列をパースし、日付とトークンを返す。
 
-    行頭が YYYY-MM-DD で始まる場合のみ日付フィルタ対象とし、形式不正なら None を設定する。
+    行頭が YYYY-MM-DD で始まる場合のみ日付フィルタ対象とし、形式不正なら None とする。
+    日付とトークンは参照されたときに求める。
     """
 
-    tokens = line.strip("\\n").split()
+    return LogEntry(line)
+
 
-    date: dt.date | None = None
-    if tokens:
-        # 行頭が日付形式かだけ確認し、以降の時刻やメッセージはフィルタ対象外。
-        if DATE_PREFIX_PATTERN.match(tokens[0]):
-            date = _parse_date(tokens[0])
+def iter_entries(lines: Iterable[str]) -> Iterator[LogEntry]:
+    """行の iterable（開いたファイルなど）を、読み進めながら 1 行ずつパースする。
+
+    全行のリストを作らないため、メモリ使用量は入力の行数によらず一定。
+    """
 
-    return LogEntry(date=date, tokens=tokens, raw=line)
+    return map(LogEntry, lines)
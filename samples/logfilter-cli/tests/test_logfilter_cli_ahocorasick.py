@@ -0,0 +1,40 @@
+"""ahocorasick モジュールの挙動を検証する pytest テスト。
+
+想定インターフェイス:
+- ahocorasick.AhoCorasick(needles).search(text) -> bool
+  - text がいずれかのキーワードを部分文字列として含めば True
+"""
+
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from logfilter_cli.ahocorasick import AhoCorasick
+
+
+@pytest.mark.parametrize(
+    ("needles", "text", "expected"),
+    [
+        (["he", "she", "his", "hers"], "ushers", True),
+        (["abcd", "bce"], "abce", True),  # 失敗遷移を経由した一致
+        (["abcd", "bcx"], "abcx", True),
+        (["abc"], "ababab", False),
+        (["東京", "大阪"], "新大阪駅", True),
+        ([], "anything", False),
+        ([""], "", True),
+    ],
+)
+def test_search(needles, text, expected):
+    assert AhoCorasick(needles).search(text) is expected
+
+
+def test_search_agrees_with_naive_substring_check():
+    rng = random.Random(0)
+    needles = ["".join(rng.choices("abc", k=rng.randint(1, 5))) for _ in range(50)]
+    automaton = AhoCorasick(needles)
+
+    for _ in range(500):
+        text = "".join(rng.choices("abcd", k=rng.randint(0, 12)))
+        assert automaton.search(text) is any(n in text for n in needles)
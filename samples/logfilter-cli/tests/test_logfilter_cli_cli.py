@@ -103,3 +103,69 @@ def test_cli_filters_prepared_sample_data(capsys):
         "2025-01-09 ERROR release rollback triggered\n"
         "2025-01-12 error fraud detection alert\n"
     )
+
+
+def test_cli_writes_output_in_batches(tmp_path, monkeypatch):
+    input_path = tmp_path / "input.log"
+    output_path = tmp_path / "out.log"
+    lines = [f"2025-11-01 ERROR event {i}" for i in range(5)]
+    # 最終行に改行が無くても出力では改行を補う
+    input_path.write_text("\n".join(lines), encoding="utf-8")
+    monkeypatch.setattr(cli, "WRITE_BATCH_LINES", 2)  # バッチの境界をまたぐ
+
+    exit_code = cli.main(
+        [str(input_path), "--contains", "error", "--output", str(output_path)]
+    )
+
+    assert exit_code == 0
+    assert output_path.read_text(encoding="utf-8") == "".join(
+        f"{line}\n" for line in lines
+    )
+
+
+def test_cli_rejects_output_same_as_input(tmp_path):
+    input_path = tmp_path / "input.log"
+    input_path.write_text("2025-11-01 ERROR boot\n", encoding="utf-8")
+
+    with pytest.raises(SystemExit):
+        cli.main([str(input_path), "--contains", "ERROR", "--output", str(input_path)])
+
+    # 読み終える前に上書きされていない
+    assert input_path.read_text(encoding="utf-8") == "2025-11-01 ERROR boot\n"
+
+
+def test_cli_combines_repeated_contains_and_keyword_file(tmp_path, capsys):
+    input_path = tmp_path / "input.log"
+    input_path.write_text(
+        "2025-11-01 ERROR db timeout\n"
+        "2025-11-01 WARN disk Full\n"
+        "2025-11-01 INFO ok\n"
+        "2025-11-01 ERROR refused\n",
+        encoding="utf-8",
+    )
+    keyword_file = tmp_path / "keywords.txt"
+    keyword_file.write_text("full\r\n\nrefused\n", encoding="utf-8")
+
+    cli.main(
+        [str(input_path), "--contains", "timeout", "--contains-file", str(keyword_file)]
+    )
+    assert capsys.readouterr().out == (
+        "2025-11-01 ERROR db timeout\n"
+        "2025-11-01 WARN disk Full\n"
+        "2025-11-01 ERROR refused\n"
+    )
+
+    cli.main(
+        [str(input_path), "--contains", "error", "--contains", "db", "--match", "all"]
+    )
+    assert capsys.readouterr().out == "2025-11-01 ERROR db timeout\n"
+
+
+def test_cli_rejects_empty_keyword_file(tmp_path):
+    input_path = tmp_path / "input.log"
+    input_path.write_text("2025-11-01 ERROR boot\n", encoding="utf-8")
+    keyword_file = tmp_path / "keywords.txt"
+    keyword_file.write_text("\n\n", encoding="utf-8")
+
+    with pytest.raises(SystemExit):
+        cli.main([str(input_path), "--contains-file", str(keyword_file)])
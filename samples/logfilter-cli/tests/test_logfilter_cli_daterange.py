@@ -0,0 +1,129 @@
+"""daterange モジュールの挙動を検証する pytest テスト。
+
+想定インターフェイス:
+- daterange.find_range(path, date_from, date_to) -> tuple[int, int]
+  - 日付順のファイルで、日付範囲の行を含むバイト範囲 [start, end) を返す
+- daterange.looks_sorted(path, samples=64) -> bool
+- daterange.open_range(path, start, end) -> TextIO
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import random
+
+import pytest
+
+from logfilter_cli import cli, daterange, filters, parser
+
+
+def _write_sorted_log(path, seed, *, newline="\n", final_newline=True):
+    """日付順のログを書き出し、行のリストを返す（日付なしの行や空行を含む）。"""
+
+    rng = random.Random(seed)
+    day = dt.date(2025, 1, 1)
+    lines = []
+    for i in range(rng.randrange(1, 300)):
+        roll = rng.random()
+        if roll < 0.1:
+            lines.append(f"  continuation 続き {i}")
+        elif roll < 0.12:
+            lines.append("")
+        else:
+            day += dt.timedelta(days=rng.choice([0, 0, 0, 1, 3]))
+            lines.append(f"{day.isoformat()} {rng.choice(['INFO', 'ERROR'])} 処理 {i}")
+    text = newline.join(lines) + (newline if final_newline else "")
+    path.write_bytes(text.encode("utf-8"))
+    return lines
+
+
+def _full_scan(path, date_from, date_to):
+    with path.open("r", encoding="utf-8") as f:
+        return [
+            e.raw
+            for e in filters.iter_filtered(
+                parser.iter_entries(f),
+                keyword=None,
+                date_from=date_from,
+                date_to=date_to,
+            )
+        ]
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_find_range_matches_full_scan(tmp_path, seed):
+    path = tmp_path / "sorted.log"
+    newline = "\r\n" if seed % 3 == 0 else "\n"
+    _write_sorted_log(path, seed, newline=newline, final_newline=seed % 2 == 0)
+    rng = random.Random(seed)
+
+    for _ in range(20):
+        date_from = dt.date(2025, 1, 1) + dt.timedelta(days=rng.randrange(-5, 400))
+        date_to = date_from + dt.timedelta(days=rng.randrange(0, 30))
+        bounds = [(date_from, date_to), (date_from, None), (None, date_to)]
+        for low, high in bounds:
+            start, end = daterange.find_range(path, low, high)
+            with daterange.open_range(path, start, end) as f:
+                sliced = [
+                    e.raw
+                    for e in filters.iter_filtered(
+                        parser.iter_entries(f),
+                        keyword=None,
+                        date_from=low,
+                        date_to=high,
+                    )
+                ]
+            assert sliced == _full_scan(path, low, high)
+
+
+def test_find_range_reads_only_the_matching_lines(tmp_path):
+    path = tmp_path / "sorted.log"
+    path.write_text(
+        "2025-01-01 a\n2025-01-02 b\nno date\n2025-01-03 c\n2025-01-04 d\n",
+        encoding="utf-8",
+    )
+
+    start, end = daterange.find_range(path, dt.date(2025, 1, 2), dt.date(2025, 1, 3))
+
+    with daterange.open_range(path, start, end) as f:
+        assert f.read() == "2025-01-02 b\nno date\n2025-01-03 c\n"
+
+
+def test_looks_sorted_detects_out_of_order_dates(tmp_path):
+    path = tmp_path / "unsorted.log"
+    path.write_text(
+        "".join(f"2025-01-{d:02d} INFO x\n" for d in [1, 2, 3, 9, 4, 5, 6, 7]),
+        encoding="utf-8",
+    )
+    sorted_path = tmp_path / "sorted.log"
+    _write_sorted_log(sorted_path, 0)
+
+    assert not daterange.looks_sorted(path, samples=8)
+    assert daterange.looks_sorted(sorted_path)
+
+
+def test_cli_sorted_auto_falls_back_for_unsorted_file(tmp_path, capsys):
+    path = tmp_path / "unsorted.log"
+    path.write_text(
+        "2025-01-05 ERROR late\n2025-01-01 ERROR early\n2025-01-03 INFO mid\n",
+        encoding="utf-8",
+    )
+    args = [str(path), "--date-from", "2025-01-01", "--date-to", "2025-01-02"]
+
+    assert cli.main([*args, "--sorted", "auto"]) == 0
+    captured = capsys.readouterr()
+    assert captured.out == "2025-01-01 ERROR early\n"
+    assert "日付順ではない" in captured.err
+
+
+def test_cli_sorted_yes_matches_full_scan(tmp_path, capsys):
+    path = tmp_path / "sorted.log"
+    _write_sorted_log(path, 7)
+    args = [str(path), "--contains", "error", "--date-from", "2025-01-20"]
+
+    cli.main(args)
+    expected = capsys.readouterr().out
+    cli.main([*args, "--sorted", "yes"])
+
+    assert capsys.readouterr().out == expected
+    assert expected
@@ -4,11 +4,17 @@
 - filters.keyword_match(entry: LogEntry, keyword: str, *, case_sensitive: bool = False) -> bool
 - filters.date_in_range(entry: LogEntry, date_from: datetime.date | None, date_to: datetime.date | None) -> bool
 - filters.filter_entries(entries: Iterable[LogEntry], *, keyword: str | None, date_from: datetime.date | None, date_to: datetime.date | None, case_sensitive: bool = False) -> list[LogEntry]
+- filters.iter_filtered(...) -> Iterator[LogEntry]（filter_entries と同じ引数。一致したものを順に返す）
+  - keyword に複数のキーワードを渡すと、いずれか（match_all=True なら全部）を含む行が一致する
+- filters.keyword_matcher(keywords, *, match_all=False, case_sensitive=False) -> Callable[[str], bool]
 """
 
 from __future__ import annotations
 
 import datetime as dt
+import random
+
+import pytest
 
 from logfilter_cli import filters, parser
 
@@ -79,3 +85,67 @@ def test_filter_entries_combines_keyword_and_date_filters():
 
     assert len(filtered) == 1
     assert filtered[0].raw == "2025-11-02 ERROR database down"
+
+
+def test_iter_filtered_yields_matches_without_reading_ahead():
+    consumed = []
+
+    def entries():
+        for line in [
+            "2025-11-01 ERROR first",
+            "2025-11-02 INFO skipped",
+            "2025-11-03 ERROR second",
+        ]:
+            consumed.append(line)
+            yield parser.parse_line(line)
+
+    matches = filters.iter_filtered(
+        entries(), keyword="error", date_from=None, date_to=None
+    )
+
+    assert next(matches).raw == "2025-11-01 ERROR first"
+    assert len(consumed) == 1  # 一致した行を返した時点で止まる
+    assert [e.raw for e in matches] == ["2025-11-03 ERROR second"]
+
+
+def test_iter_filtered_with_multiple_keywords_any_and_all():
+    entries = [
+        parser.parse_line("2025-11-01 ERROR db timeout"),
+        parser.parse_line("2025-11-01 ERROR disk full"),
+        parser.parse_line("2025-11-01 WARN Timeout retry"),
+        parser.parse_line("2025-11-01 INFO ok"),
+    ]
+    options = {"date_from": None, "date_to": None}
+
+    any_match = filters.filter_entries(entries, keyword=["error", "timeout"], **options)
+    all_match = filters.filter_entries(
+        entries, keyword=["error", "timeout"], match_all=True, **options
+    )
+
+    assert [e.raw for e in any_match] == [e.raw for e in entries[:3]]
+    assert [e.raw for e in all_match] == ["2025-11-01 ERROR db timeout"]
+
+
+@pytest.mark.parametrize("count", [1, 3, filters.AHO_CORASICK_MIN_KEYWORDS + 10])
+@pytest.mark.parametrize("match_all", [False, True])
+@pytest.mark.parametrize("case_sensitive", [False, True])
+def test_keyword_matcher_agrees_with_naive_check(count, match_all, case_sensitive):
+    rng = random.Random(count)
+    keywords = ["".join(rng.choices("abAB", k=rng.randint(1, 4))) for _ in range(count)]
+    matches = filters.keyword_matcher(
+        keywords, match_all=match_all, case_sensitive=case_sensitive
+    )
+
+    for _ in range(300):
+        line = "".join(rng.choices("abcABC ", k=rng.randint(0, 30)))
+        text = line if case_sensitive else line.lower()
+        needles = keywords if case_sensitive else [k.lower() for k in keywords]
+        found = [needle in text for needle in needles]
+        assert matches(line) is (all(found) if match_all else any(found))
+
+
+def test_keyword_matcher_is_reused_for_same_keywords():
+    first = filters.keyword_matcher(["a", "b"], match_all=True)
+
+    assert filters.keyword_matcher(("a", "b"), match_all=True) is first
+    assert filters.keyword_matcher(["a", "b"]) is not first
@@ -0,0 +1,200 @@
+"""follow モジュールと `--follow` の挙動を検証する pytest テスト。
+
+想定インターフェイス:
+- follow.follow_lines(path, stop, from_start=False, min_interval=..., max_interval=...)
+  -> Iterator[list[str]]
+  - 追記された行をブロックごとに返し、ローテーションと切り詰めに追従する
+- cli.main([path, "--follow", ...]) で一致した行をすぐに出力する
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import select
+import signal
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from logfilter_cli import cli, follow
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+TIMEOUT = 10.0
+FAST = {"from_start": True, "min_interval": 0.001, "max_interval": 0.01}
+
+
+class _Follower:
+    """follow_lines を別スレッドで回し、受け取った行と受け取った時刻を記録する。"""
+
+    def __init__(self, path, **kwargs):
+        self.stop = threading.Event()
+        self.lines = queue.Queue()
+        self.cpu_seconds = 0.0
+        self.polls = 0
+        self._kwargs = kwargs
+        self._path = path
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop.set()
+        self._thread.join(TIMEOUT)
+
+    def _run(self):
+        wait = self.stop.wait
+
+        def counting_wait(timeout=None):
+            self.polls += 1
+            return wait(timeout)
+
+        self.stop.wait = counting_wait
+        cpu = time.thread_time()
+        for block in follow.follow_lines(self._path, self.stop, **self._kwargs):
+            received = time.perf_counter()
+            for line in block:
+                self.lines.put((received, line))
+            self.cpu_seconds = time.thread_time() - cpu
+        self.cpu_seconds = time.thread_time() - cpu
+
+    def take(self, count):
+        return [self.lines.get(timeout=TIMEOUT)[1] for _ in range(count)]
+
+
+def _append(path, text):
+    with path.open("a", encoding="utf-8") as f:
+        f.write(text)
+
+
+def test_follow_returns_appended_lines_only_when_complete(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_text("old line\n", encoding="utf-8")
+
+    with _Follower(path, **FAST) as follower:
+        assert follower.take(1) == ["old line\n"]
+        _append(path, "first\r\nsec")
+        assert follower.take(1) == ["first\n"]
+        _append(path, "ond\n")
+        assert follower.take(1) == ["second\n"]
+
+
+def test_follow_switches_to_new_file_after_rotation(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_text("before rotation\nunterminated", encoding="utf-8")
+
+    with _Follower(path, **FAST) as follower:
+        assert follower.take(1) == ["before rotation\n"]
+        path.rename(tmp_path / "app.log.1")
+        time.sleep(0.05)
+        path.write_text("after rotation\n", encoding="utf-8")
+        assert follower.take(2) == ["unterminated\n", "after rotation\n"]
+
+
+def test_follow_rereads_truncated_file(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_text("x" * 100 + "\n", encoding="utf-8")
+
+    with _Follower(path, **FAST) as follower:
+        assert follower.take(1) == ["x" * 100 + "\n"]
+        _append(path, "appended\n")
+        assert follower.take(1) == ["appended\n"]
+        with path.open("w", encoding="utf-8") as f:  # copytruncate と同じく切り詰める
+            f.write("after truncate\n")
+        assert follower.take(1) == ["after truncate\n"]
+
+
+def test_follow_idles_with_backoff(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_text("", encoding="utf-8")
+
+    with _Follower(path) as follower:
+        time.sleep(1.0)
+        polls = follower.polls
+
+    # 0.01 秒から 0.25 秒まで倍々に延ばすので、1 秒のアイドルで 10 回程度しか起きない
+    assert polls <= 12
+    assert follower.cpu_seconds < 0.1
+
+
+def test_follow_latency_per_line(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_text("", encoding="utf-8")
+    latencies = []
+
+    with _Follower(path, from_start=True) as follower:
+        for i in range(20):
+            time.sleep(0.03 if i % 5 else 0.5)  # 5 行ごとにアイドルを挟む
+            written = time.perf_counter()
+            _append(path, f"line {i}\n")
+            received, line = follower.lines.get(timeout=TIMEOUT)
+            assert line == f"line {i}\n"
+            latencies.append(received - written)
+
+    assert statistics.median(latencies) < 0.05
+    assert max(latencies) < follow.FOLLOW_MAX_INTERVAL + 0.1
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="SIGINT と select を使う")
+def test_cli_follow_flushes_matches_immediately(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_text("2025-01-01 ERROR old\n", encoding="utf-8")
+    proc = subprocess.Popen(
+        [
+            *(sys.executable, "-m", "logfilter_cli.cli", str(path)),
+            *("--follow", "--contains", "error"),
+        ],
+        stdout=subprocess.PIPE,
+        bufsize=0,  # select で待つため、読み取り側にバッファを持たない
+        env={**os.environ, "PYTHONPATH": str(SRC_DIR)},
+    )
+    try:
+
+        def read_line():
+            ready, _, _ = select.select([proc.stdout], [], [], 1.0)
+            return proc.stdout.readline().decode() if ready else None
+
+        # 起動して末尾に移動するまで、一致する行を書き続ける
+        deadline = time.monotonic() + TIMEOUT
+        while (line := read_line()) is None:
+            assert time.monotonic() < deadline
+            _append(path, "2025-01-02 ERROR ping\n")
+        assert line == "2025-01-02 ERROR ping\n"
+        while read_line() is not None:
+            pass  # 残りの ping を読み捨てる
+
+        latencies = []
+        for i in range(5):
+            _append(path, f"2025-01-03 INFO skip {i}\n")
+            written = time.perf_counter()
+            _append(path, f"2025-01-03 ERROR alert {i}\n")
+            assert read_line() == f"2025-01-03 ERROR alert {i}\n"
+            latencies.append(time.perf_counter() - written)
+        assert max(latencies) < 0.5
+
+        proc.send_signal(signal.SIGINT)
+        assert proc.wait(TIMEOUT) == 0
+    finally:
+        proc.kill()
+        proc.wait()
+
+
+@pytest.mark.parametrize(
+    "extra", [["--jobs", "2"], ["--merge"], ["--sorted", "yes"], ["{other}"]]
+)
+def test_cli_follow_rejects_conflicting_options(tmp_path, extra):
+    path = tmp_path / "app.log"
+    other = tmp_path / "other.log"
+    path.write_text("", encoding="utf-8")
+    other.write_text("", encoding="utf-8")
+
+    with pytest.raises(SystemExit) as exc:
+        cli.main([str(path), "--follow", *(a.format(other=other) for a in extra)])
+    assert exc.value.code == 2
@@ -0,0 +1,169 @@
+"""index モジュールと `index` サブコマンドの挙動を検証する pytest テスト。
+
+想定インターフェイス:
+- index.update_index(path, every=None, rebuild=False) -> tuple[LogIndex, int]
+  - 索引を作成、または追記分だけ読んで更新し、(索引, 新たに読んだ行数) を返す
+- index.load_index(path) -> LogIndex | None
+  - 索引が無い・ファイルが書き換えられた場合は None
+- LogIndex.date_ranges(date_from, date_to, file_size) -> list[tuple[int, int]]
+- cli.main(["index", path, ...]) で索引を作成し、日付範囲の検索で自動的に使う
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import random
+
+import pytest
+
+from logfilter_cli import cli, daterange, filters, index, parser
+
+
+def _log_lines(rng, count, day=dt.date(2025, 1, 1), shuffle=False):
+    lines = []
+    for i in range(count):
+        roll = rng.random()
+        if roll < 0.1:
+            lines.append(f"  continuation 続き {i}\n")
+        else:
+            day += dt.timedelta(days=rng.choice([0, 0, 0, 1, 2]))
+            lines.append(
+                f"{day.isoformat()} {rng.choice(['INFO', 'ERROR'])} 処理 {i}\n"
+            )
+    if shuffle:
+        rng.shuffle(lines)
+    return lines
+
+
+def _scan(path, date_from, date_to, byte_ranges=None):
+    entries = cli._iter_entries(path, byte_ranges)
+    return [
+        e.raw
+        for e in filters.iter_filtered(
+            entries, keyword=None, date_from=date_from, date_to=date_to
+        )
+    ]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_date_ranges_match_full_scan(tmp_path, seed):
+    rng = random.Random(seed)
+    path = tmp_path / "app.log"
+    path.write_text("".join(_log_lines(rng, 200, shuffle=seed % 4 == 0)), "utf-8")
+    log_index, _ = index.update_index(path)
+
+    for _ in range(20):
+        date_from = dt.date(2025, 1, 1) + dt.timedelta(days=rng.randrange(-5, 300))
+        date_to = date_from + dt.timedelta(days=rng.randrange(0, 20))
+        for low, high in [(date_from, date_to), (date_from, None), (None, date_to)]:
+            ranges = log_index.date_ranges(low, high, path.stat().st_size)
+            assert _scan(path, low, high, ranges) == _scan(path, low, high)
+
+
+def test_sorted_index_reads_only_the_matching_lines(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_text(
+        "2025-01-01 a\n2025-01-02 b\nno date\n2025-01-03 c\n2025-01-04 d\n",
+        encoding="utf-8",
+    )
+    log_index, added = index.update_index(path)
+
+    assert added == 5
+    assert log_index.dates[dt.date(2025, 1, 3)] == index.DateSpan(34, 4, 47)
+    ranges = log_index.date_ranges(
+        dt.date(2025, 1, 2), dt.date(2025, 1, 3), path.stat().st_size
+    )
+    assert ranges == [(13, 47)]
+    with daterange.open_range(path, *ranges[0]) as f:
+        assert f.read() == "2025-01-02 b\nno date\n2025-01-03 c\n"
+
+
+def test_appended_file_extends_index_incrementally(tmp_path):
+    rng = random.Random(1)
+    path = tmp_path / "app.log"
+    lines = _log_lines(rng, 500)
+    path.write_text("".join(lines[:300]) + lines[300][:5], encoding="utf-8")
+    first, added = index.update_index(path, every=7)
+    assert (first.lines, added) == (300, 300)  # 書きかけの行は索引に含めない
+
+    with path.open("a", encoding="utf-8") as f:
+        f.write(lines[300][5:] + "".join(lines[301:]))
+    extended, added = index.update_index(path)
+    assert added == 200
+
+    rebuilt, _ = index.update_index(path, rebuild=True, every=7)
+    assert extended == rebuilt
+    assert index.load_index(path) == rebuilt
+
+
+def test_query_reads_lines_appended_after_indexing(tmp_path):
+    rng = random.Random(2)
+    path = tmp_path / "app.log"
+    lines = _log_lines(rng, 300)
+    path.write_text("".join(lines[:200]), encoding="utf-8")
+    index.update_index(path)
+    with path.open("a", encoding="utf-8") as f:
+        f.write("".join(lines[200:]))
+
+    log_index = index.load_index(path)
+    assert log_index is not None and log_index.lines == 200
+    for low in [dt.date(2025, 1, 1), parser.parse_line(lines[250]).date]:
+        ranges = log_index.date_ranges(low, None, path.stat().st_size)
+        assert _scan(path, low, None, ranges) == _scan(path, low, None)
+
+
+def test_rewritten_file_invalidates_index(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_text("2025-01-01 old\n2025-01-02 old\n", encoding="utf-8")
+    index.update_index(path)
+
+    path.write_text("2025-02-01 rotated\n", encoding="utf-8")  # 切り詰め
+    assert index.load_index(path) is None
+    path.write_text("2025-02-01 rotated and longer\n" * 3, encoding="utf-8")
+    assert index.load_index(path) is None
+
+    log_index, added = index.update_index(path)
+    assert added == 3
+    assert list(log_index.dates) == [dt.date(2025, 2, 1)]
+
+
+def test_checkpoints_record_every_nth_line_end(tmp_path):
+    path = tmp_path / "app.log"
+    lines = [f"2025-01-01 line {i:02d}\n" for i in range(1, 26)]
+    path.write_text("".join(lines), encoding="utf-8")
+    log_index, _ = index.update_index(path, every=10)
+
+    assert list(log_index.checkpoints) == [
+        len("".join(lines[:10])),
+        len("".join(lines[:20])),
+    ]
+    assert index.load_index(path).checkpoints == log_index.checkpoints
+    with path.open("rb") as f:
+        f.seek(log_index.checkpoints[1])
+        assert f.readline().decode() == lines[20]
+
+
+def test_cli_index_and_query_use_sidecar(tmp_path, capsys, monkeypatch):
+    rng = random.Random(3)
+    path = tmp_path / "app.log"
+    path.write_text("".join(_log_lines(rng, 400)), encoding="utf-8")
+    args = [str(path), "--contains", "error", "--date-from", "2025-03-01"]
+    cli.main(args)
+    expected = capsys.readouterr().out
+
+    assert cli.main(["index", str(path), "--every", "100"]) == 0
+    assert "400 行" in capsys.readouterr().out
+    assert index.sidecar_path(path).exists()
+
+    seen = []
+    original = cli._iter_entries
+
+    def recording(p, byte_ranges=None):
+        seen.append(byte_ranges)
+        return original(p, byte_ranges)
+
+    monkeypatch.setattr(cli, "_iter_entries", recording)
+    cli.main(args)
+
+    assert capsys.readouterr().out == expected
+    assert seen[0] is not None and seen[0][0][0] > 0
@@ -0,0 +1,61 @@
+"""merge モジュールの挙動を検証する pytest テスト。
+
+想定インターフェイス:
+- merge.merge_by_date(streams) -> Iterator[str]
+  - ファイルごとの出力行を行頭の日時順にマージし、各ファイル内の順序は保つ
+"""
+
+from __future__ import annotations
+
+import random
+
+from logfilter_cli import merge
+
+
+def test_merge_orders_lines_by_date_and_time():
+    a = ["2025-01-01 10:00:00 a1\n", "2025-01-02 09:00:00 a2\n"]
+    b = ["2025-01-01 08:00:00 b1\n", "2025-01-01 11:00:00 b2\n", "2025-01-03 b3\n"]
+
+    assert list(merge.merge_by_date([a, b])) == [
+        "2025-01-01 08:00:00 b1\n",
+        "2025-01-01 10:00:00 a1\n",
+        "2025-01-01 11:00:00 b2\n",
+        "2025-01-02 09:00:00 a2\n",
+        "2025-01-03 b3\n",
+    ]
+
+
+def test_merge_keeps_undated_lines_with_previous_line():
+    a = ["2025-01-02 12:00:00 ERROR boom\n", "  at frame 1\n", "  at frame 2\n"]
+    b = ["2025-01-01 12:00:00 INFO x\n", "2025-01-03 12:00:00 INFO y\n"]
+
+    assert list(merge.merge_by_date([a, b])) == [
+        "2025-01-01 12:00:00 INFO x\n",
+        "2025-01-02 12:00:00 ERROR boom\n",
+        "  at frame 1\n",
+        "  at frame 2\n",
+        "2025-01-03 12:00:00 INFO y\n",
+    ]
+
+
+def test_merge_prefers_earlier_stream_on_ties():
+    older = ["2025-01-01 rotated 1\n", "2025-01-01 rotated 2\n"]
+    newer = ["2025-01-01 current 1\n"]
+
+    assert list(merge.merge_by_date([older, newer])) == [*older, *newer]
+
+
+def test_merge_of_sorted_streams_is_sorted():
+    rng = random.Random(0)
+    streams = [
+        sorted(
+            f"2025-01-{rng.randrange(1, 29):02d} {rng.randrange(24):02d}:00:00 s{s}\n"
+            for _ in range(50)
+        )
+        for s in range(5)
+    ]
+
+    merged = list(merge.merge_by_date(streams))
+
+    assert sorted(merged) == sorted(line for lines in streams for line in lines)
+    assert [line[:19] for line in merged] == sorted(line[:19] for line in merged)
@@ -0,0 +1,108 @@
+"""parallel モジュールと複数ファイル入力の挙動を検証する pytest テスト。
+
+想定インターフェイス:
+- parallel.split_ranges(path, ranges, chunk_size) -> list[tuple[int, int]]
+  - 各範囲をおよそ chunk_size バイトごとに行頭で区切る
+- parallel.filter_files(plans, jobs=..., keyword=..., ...) -> ContextManager
+  - ファイルごとの出力行の iterator を返す（シリアル処理と同じ行・同じ順序）
+- cli.main([...paths, "--jobs", N, "--merge"]) で複数ファイル・glob を扱う
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import random
+
+import pytest
+
+from logfilter_cli import cli, parallel
+
+
+def _write_log(path, seed, lines=300, start=dt.date(2025, 1, 1)):
+    rng = random.Random(seed)
+    day = start
+    out = []
+    for i in range(lines):
+        if rng.random() < 0.1:
+            out.append(f"  continuation 続き {i}\n")
+        else:
+            day += dt.timedelta(days=rng.choice([0, 0, 0, 0, 1]))
+            out.append(
+                f"{day.isoformat()} {rng.randrange(24):02d}:00:00 "
+                f"{rng.choice(['INFO', 'ERROR'])} 処理 {seed}-{i}\n"
+            )
+    path.write_text("".join(out), encoding="utf-8")
+
+
+def test_split_ranges_cuts_at_line_starts(tmp_path):
+    path = tmp_path / "app.log"
+    _write_log(path, 0)
+    data = path.read_bytes()
+
+    spans = parallel.split_ranges(path, [(0, len(data))], 500)
+
+    assert len(spans) > 5
+    assert spans[0][0] == 0 and spans[-1][1] == len(data)
+    for (_, end), (start, _) in zip(spans, spans[1:]):
+        assert end == start and data[start - 1 : start] == b"\n"
+
+
+def test_split_ranges_keeps_long_line_whole(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_bytes(b"a" * 100 + b"\n" + b"b\n")
+
+    assert parallel.split_ranges(path, [(0, 103)], 10) == [(0, 101), (101, 103)]
+
+
+@pytest.mark.parametrize("merge", [False, True])
+def test_cli_jobs_output_matches_serial(tmp_path, capsys, monkeypatch, merge):
+    monkeypatch.setattr(parallel, "SPLIT_MIN_BYTES", 256)
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"host{i}.log"
+        _write_log(path, i, lines=200 * (i + 1))
+        paths.append(str(path))
+    args = [*paths, "--contains", "error", "--date-from", "2025-01-03"]
+    if merge:
+        args.append("--merge")
+
+    cli.main(args)
+    expected = capsys.readouterr().out
+    cli.main([*args, "--jobs", "4"])
+
+    assert capsys.readouterr().out == expected
+    assert expected.count("\n") > 50
+
+
+def test_cli_merge_interleaves_files_chronologically(tmp_path, capsys):
+    old = tmp_path / "app.log.1"
+    new = tmp_path / "app.log"
+    old.write_text(
+        "2025-01-01 10:00:00 ERROR a\n2025-01-02 10:00:00 ERROR c\n", "utf-8"
+    )
+    new.write_text(
+        "2025-01-01 12:00:00 ERROR b\n2025-01-03 10:00:00 ERROR d\n", "utf-8"
+    )
+
+    cli.main([str(old), str(new), "--merge"])
+
+    assert [line[-2] for line in capsys.readouterr().out.splitlines(True)] == list(
+        "abcd"
+    )
+
+
+def test_cli_expands_glob_patterns(tmp_path, capsys):
+    for name, text in [("a.log", "x1\n"), ("b.log", "x2\n"), ("c.txt", "x3\n")]:
+        (tmp_path / name).write_text(text, encoding="utf-8")
+
+    cli.main([str(tmp_path / "*.log")])
+
+    assert capsys.readouterr().out == "x1\nx2\n"
+
+
+def test_cli_rejects_unmatched_glob_and_bad_jobs(tmp_path):
+    with pytest.raises(SystemExit):
+        cli.main([str(tmp_path / "*.log")])
+    (tmp_path / "a.log").write_text("x\n", encoding="utf-8")
+    with pytest.raises(SystemExit):
+        cli.main([str(tmp_path / "a.log"), "--jobs", "0"])
@@ -2,16 +2,20 @@
 
 想定インターフェイス:
 - parser.parse_line(line: str) -> LogEntry
-  - LogEntry は少なくとも以下の属性を持つ:
+  - LogEntry は少なくとも以下の属性を持つ（date と tokens は参照時に求める）:
     - date: datetime.date | None（先頭が YYYY-MM-DD 形式ならパース結果、それ以外は None）
     - tokens: list[str]（スペース区切りで分割したトークン）
     - raw: str（元の行テキスト）
+- parser.iter_entries(lines: Iterable[str]) -> Iterator[LogEntry]
+  - 行を読み進めながら 1 行ずつパースする
 """
 
 from __future__ import annotations
 
 import datetime as dt
 
+import pytest
+
 from logfilter_cli import parser
 
 
@@ -26,6 +30,20 @@ def test_parse_line_with_valid_date():
     assert entry.raw == line
 
 
+def test_log_entry_accepts_keyword_fields():
+    line = "2025-11-01 INFO ok"
+
+    entry = parser.LogEntry(date=None, tokens=["custom"], raw=line)
+
+    assert entry.date is None  # 指定した値は raw から求め直さない
+    assert entry.tokens == ["custom"]
+    assert entry.raw == line
+    assert entry != parser.parse_line(line)
+    assert parser.LogEntry(
+        date=dt.date(2025, 11, 1), tokens=line.split(), raw=line
+    ) == parser.parse_line(line)
+
+
 def test_parse_line_without_date_prefix():
     line = "NoDateLine This line does not start with a date"
 
@@ -45,3 +63,48 @@ def test_parse_line_with_malformed_date():
     # 日付が不正でもトークン化は行う前提
     assert entry.tokens[0] == "2025-99-99"
     assert entry.raw == line
+
+
+def test_iter_entries_parses_lazily():
+    consumed = []
+
+    def lines():
+        for line in ["2025-11-01 INFO a\n", "2025-11-02 INFO b\n"]:
+            consumed.append(line)
+            yield line
+
+    entries = parser.iter_entries(lines())
+    assert consumed == []  # 読み進めるまでは入力を読まない
+
+    first = next(entries)
+    assert first.date == dt.date(2025, 11, 1)
+    assert len(consumed) == 1
+
+
+@pytest.mark.parametrize(
+    ("line", "expected"),
+    [
+        ("2025-11-01", dt.date(2025, 11, 1)),
+        ("2025-11-01\n", dt.date(2025, 11, 1)),
+        ("  2025-11-01\tINFO indented", dt.date(2025, 11, 1)),
+        ("2025-11-01T10:00:00 INFO iso timestamp", None),
+        ("2025-11-1 INFO short day", None),
+        ("2025-02-30 INFO no such day", None),
+        ("0000-01-01 INFO year zero", None),
+        ("２０２５-11-01 INFO fullwidth digits", None),
+        ("2025/11/01 INFO slashes", None),
+        ("", None),
+    ],
+)
+def test_parse_line_date_prefix_edge_cases(line, expected):
+    assert parser.parse_line(line).date == expected
+
+
+def test_log_entry_is_compact_and_tokenizes_on_demand():
+    entry = parser.parse_line("2025-11-01 ERROR database down")
+
+    assert not hasattr(entry, "__dict__")  # __slots__ で 1 行あたりのメモリを抑える
+    # 改行の無い行でも末尾の n などを削らない
+    assert entry.tokens == ["2025-11-01", "ERROR", "database", "down"]
+    assert entry.tokens is entry.tokens  # 一度求めたトークンを使い回す
+    assert entry == parser.parse_line("2025-11-01 ERROR database down")